@@ -11,8 +11,8 @@ Feature: Admin Portal Production Data
   @auth @dev-login
   Scenario: Login to admin portal with dev credentials
     Given I am on the admin portal login page
-    When I click the "Development Login" button
-    Then I should be redirected to the dashboard
+    When I click the "Development Login" button in the admin portal
+    Then I should be redirected to the admin dashboard
     And the dashboard should display stats
 
   @api @servers
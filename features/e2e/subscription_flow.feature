@@ -1,3 +1,4 @@
+@no-browser
 Feature: End-to-End Subscription Flow
   As a customer
   I want to subscribe and get a game server automatically
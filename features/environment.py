@@ -1,13 +1,26 @@
 """
 Behave environment configuration and hooks for features directory
 """
+import json
 import os
-from playwright.sync_api import sync_playwright
+import sys
+import time
 from dotenv import load_dotenv
 
+# Make the step support packages importable from the hooks
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "steps"))
+from browser import BrowserSession, EventCapture, LazyPage, PageContentCache, SnapshotCache, SoftChecks, WebVitals
+from perf import (TimingHistory, ProvisioningMetrics, ScenarioApiTimings, SpanRecorder, WaitAccountant,
+                  scenario_key, wait_accounting_enabled)
+from api import FunctionsClient, ServerPool, TeardownReaper
+from mocks import MockOidcProvider, MockFunctionsApi
+
 # Load environment variables
 load_dotenv()
 
+# Scenarios carrying these tags never get a browser
+NO_BROWSER_TAGS = {"functions", "no-browser"}
+
 def before_all(context):
     """Setup before all tests"""
     # Load configuration
@@ -38,49 +51,187 @@ def before_all(context):
     context.headless = os.getenv("HEADLESS", "false").lower() == "true"
     context.slow_mo = int(os.getenv("SLOW_MO", "0"))
     context.browser_type = os.getenv("BROWSER", "chromium")
+    
+    # One Playwright driver and browser per process, started on first use.
+    # Parallel workers keep it alive across their Behave runs.
+    context.worker_id = os.getenv("BEHAVE_WORKER_ID")
+    context.browser_session = BrowserSession.shared(
+        browser_type=context.browser_type,
+        headless=context.headless,
+        slow_mo=context.slow_mo
+    )
+    
+    # Navigation timing and Web Vitals on every page visit (WEB_VITALS=false to skip)
+    context.web_vitals_enabled = os.getenv("WEB_VITALS", "true").lower() == "true"
+    
+    # Scenario wall times feed the parallel runner's scheduling
+    context.timing_history = TimingHistory()
+    
+    # Time to each pod phase of servers the scenarios provision
+    context.provisioning_metrics = ProvisioningMetrics()
+    
+    # Sleeps and timed-out waits per step and source line, when asked for
+    # (WAIT_REPORT=true, or WAIT_BUDGET_SECONDS to fail scenarios that wait
+    # longer); reuses the profiler's spans if it runs
+    recorder = SpanRecorder.active
+    if recorder is None and wait_accounting_enabled():
+        recorder = SpanRecorder(keep_tree=False).start()
+    context.wait_accountant = WaitAccountant(recorder)
+    
+    # Local identity provider in place of Azure AD (SSO_IDP=mock)
+    context.mock_idp = None
+    if os.getenv("SSO_IDP", "").lower() == "mock":
+        context.mock_idp = MockOidcProvider.from_env().start()
+        os.environ["SSO_IDP_URL"] = context.mock_idp.url
+        print(f"🔐 Mock identity provider: {context.mock_idp.issuer}")
+    
+    # In-process realm-functions API in place of FUNCTIONS_URL (TEST_MODE=mock)
+    context.functions_mock = None
+    if os.getenv("TEST_MODE", "").lower() == "mock":
+        context.functions_mock = MockFunctionsApi.from_env(idp=context.mock_idp).start()
+        context.functions_url = context.functions_mock.url
+        print(f"⚙️  Mock Functions API: {context.functions_mock.url}")
+    
+    # Keep-alive connections to the API, shared by every step of the worker
+    context.api = FunctionsClient.shared(context.functions_url)
+    
+    # Warm servers leased to lifecycle scenarios (SERVER_POOL=minecraft:small=2);
+    # mock servers vanish with the mock, so they are never kept for later runs
+    context.server_pool = ServerPool.shared(context.api, keep=False if context.functions_mock else None)
+    if context.server_pool.sizes:
+        context.server_pool.warm()
+    
+    # Servers and subscriptions the scenarios create, removed after the run
+    context.teardown = TeardownReaper(context.api)
+
+def open_page(context):
+    """Scenario context and page, observing Web Vitals on every navigation"""
+    options = {"viewport": context.viewport} if context.viewport else {}
+    browser_context, page = context.browser_session.new_page(**options)
+    if context.web_vitals_enabled:
+        context.web_vitals.install(browser_context)
+    context.events.attach(page)
+    
+    # A @read-only scenario that needs the live page after all continues
+    # from the page its snapshot was taken of
+    snapshot, context.snapshot = context.snapshot, None
+    if snapshot:
+        page.goto(snapshot.url)
+    return browser_context, page
 
 def before_scenario(context, scenario):
     """Setup before each scenario"""
-    # Start Playwright
-    context.playwright = sync_playwright().start()
-    
-    # Launch browser
-    if context.browser_type == "firefox":
-        browser = context.playwright.firefox.launch(
-            headless=context.headless,
-            slow_mo=context.slow_mo
-        )
-    elif context.browser_type == "webkit":
-        browser = context.playwright.webkit.launch(
-            headless=context.headless,
-            slow_mo=context.slow_mo
-        )
-    else:
-        browser = context.playwright.chromium.launch(
-            headless=context.headless,
-            slow_mo=context.slow_mo
-        )
-    
-    context.browser = browser
-    context.page = browser.new_page()
-    
-    # Set viewport
-    context.page.set_viewport_size({"width": 1920, "height": 1080})
+    context.scenario_started = time.perf_counter()
+    context.wait_accountant.begin_scenario(scenario.name)
+    
+    # Fresh, isolated context (cookies, storage) on the shared browser,
+    # opened only when a step first touches context.page
+    blocked = NO_BROWSER_TAGS.intersection(scenario.effective_tags)
+    reason = f"tagged @{sorted(blocked)[0]}" if blocked else None
+    context.web_vitals = WebVitals()
+    context.events = EventCapture()
+    context.page = LazyPage(lambda: open_page(context), blocked_reason=reason)
+    
+    # @read-only scenarios check text against a page snapshot shared by the worker
+    context.read_only = "read-only" in scenario.effective_tags
+    context.snapshot = None
+    context.viewport = None
+    
+    # Body text and HTML for content checks, re-read only when the page changes
+    context.page_content = PageContentCache(context.page)
+    
+    # Optional UI checks warn instead of failing and share one wait budget
+    context.soft_checks = SoftChecks()
+    
+    # API calls this scenario makes, for the latency steps and the JSON report
+    context.api_timings = ScenarioApiTimings(context.api).start()
+
+def before_step(context, step):
+    """Setup before each step"""
+    context.api_timings.mark_step()
+    context.wait_accountant.begin_step(f"{step.keyword} {step.name}")
+    context.soft_checks.begin_step(f"{step.keyword} {step.name}")
+    if step.step_type == "when":
+        context.page_content.invalidate()
+
+def after_step(context, step):
+    """Attach the step's API timings and page metrics to the JSON report"""
+    calls = context.api_timings.step_calls()
+    if calls:
+        summary = context.api_timings.summary(calls)
+        context.attach("application/json", json.dumps({"api_timings": summary}).encode())
+    
+    soft_failures = context.soft_checks.new_failures()
+    if soft_failures:
+        context.attach("application/json", json.dumps({"soft_checks": soft_failures}).encode())
+    
+    # Navigation timing and Web Vitals of a page the step navigated to
+    if context.web_vitals_enabled and context.page.is_open:
+        metrics = context.web_vitals.collect(context.page)
+        if metrics:
+            print(f"  📈 {metrics['url']}: {WebVitals.describe(metrics)}")
+            context.attach("application/json", json.dumps({"web_vitals": metrics}).encode())
+    
+    # Fails the step once the scenario has waited past its budget
+    context.wait_accountant.check_budget()
 
 def after_scenario(context, scenario):
     """Cleanup after each scenario"""
     # Take screenshot on failure
-    if scenario.status == "failed":
+    if scenario.status == "failed" and context.page.is_open and context.browser_session.is_connected:
         screenshot_dir = "reports/screenshots"
         os.makedirs(screenshot_dir, exist_ok=True)
         screenshot_path = f"{screenshot_dir}/{scenario.name.replace(' ', '_')}.png"
         context.page.screenshot(path=screenshot_path)
     
-    # Close browser
-    context.page.close()
-    context.browser.close()
-    context.playwright.stop()
+    # Console and network events of a failed scenario
+    if scenario.status == "failed":
+        events_path = context.events.flush(scenario.name)
+        if events_path:
+            print(f"📜 Events ({context.events.summary()}): {events_path}")
+    
+    context.api_timings.stop()
+    context.wait_accountant.end_scenario()
+    if context.soft_checks.failures:
+        print(f"⚠️  {scenario.name}: {context.soft_checks.summary()}")
+    
+    # Reset a leased server and hand it back to the pool
+    leased = getattr(context, "leased_server", None)
+    if leased:
+        context.server_pool.release(leased)
+    
+    # Stop polling for a server the scenario no longer waits on
+    readiness = getattr(context, "readiness", None)
+    if readiness:
+        readiness.cancel()
+    
+    # Close the scenario context; the browser stays up for the next scenario
+    context.browser_session.close_context(context.page.browser_context)
+    
+    if scenario.status in ("passed", "failed"):
+        key = scenario_key(scenario.location.filename, scenario.name)
+        context.timing_history.record(key, time.perf_counter() - context.scenario_started)
 
 def after_all(context):
     """Cleanup after all tests"""
-    pass
+    context.timing_history.save()
+    context.provisioning_metrics.print_summary()
+    context.wait_accountant.save()
+    context.teardown.run()
+    
+    if context.functions_mock:
+        # Each run's mock listens on a new port, so its client is never reused
+        ServerPool.close_shared(context.functions_mock.url)
+        FunctionsClient.close_shared(context.functions_url)
+        print(f"⚙️  Mock Functions API served {context.functions_mock.request_count} requests")
+        context.functions_mock.stop()
+    
+    if context.mock_idp:
+        context.mock_idp.stop()
+    
+    # Parallel workers close their browser when the worker exits
+    if not context.worker_id:
+        SnapshotCache.close_shared()
+        BrowserSession.close_shared()
+        ServerPool.close_shared()
+        FunctionsClient.close_shared()
@@ -48,6 +48,7 @@ Feature: Game Server Provisioning via Functions
     Then the response status should be 200
     And the response should contain "servers"
     And the servers list should not be empty
+    And the response time should be under 2000 ms
 
   @functions @provisioning
   Scenario: Get server details
@@ -57,11 +58,19 @@ Feature: Game Server Provisioning via Functions
     And the response should contain server configuration
     And the response should contain kubernetes status
     And the response should contain network information
+    And the response time should be under 1000 ms
+
+  @functions @provisioning @performance
+  Scenario: Server details latency
+    Given I have a server with ID "server-123"
+    When I call GET "/api/servers/server-123" 50 times
+    Then the response status should be 200
+    And the p95 latency should be under 1000 ms
 
   @functions @lifecycle
   Scenario: Stop a running server
-    Given I have a running server "server-123"
-    When I call POST "/api/servers/server-123/stop"
+    Given I lease a running minecraft server
+    When I call POST "/api/servers/{server_id}/stop"
     Then the response status should be 200
     And the server should be scaled to 0 replicas
 
@@ -74,16 +83,16 @@ Feature: Game Server Provisioning via Functions
 
   @functions @lifecycle
   Scenario: Execute RCON command
-    Given I have a running Minecraft server "server-123"
-    When I call POST "/api/servers/server-123/command" with:
+    Given I lease a running minecraft server
+    When I call POST "/api/servers/{server_id}/command" with:
       | command | say Hello World! |
     Then the response status should be 200
     And the response should contain "output"
 
   @functions @backup
   Scenario: Create a backup
-    Given I have a running server "server-123"
-    When I call POST "/api/servers/server-123/backup"
+    Given I lease a running minecraft server
+    When I call POST "/api/servers/{server_id}/backup"
     Then the response status should be 200
     And the response should contain "backupId"
     And the backup should be stored in Azure Blob Storage
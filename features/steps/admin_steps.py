@@ -65,10 +65,6 @@ def step_impl(context):
 def step_impl(context, message):
     assert context.page.locator(f'text="{message}"').is_visible()
 
-@then('the subscription status should be "{status}"')
-def step_impl(context, status):
-    assert context.page.locator(f'[data-status="{status}"]').is_visible()
-
 @when('I navigate to billing chargebacks')
 def step_impl(context):
     context.page.click('a[href="/billing/chargebacks"]')
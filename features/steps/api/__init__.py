@@ -0,0 +1,18 @@
+"""API package - pooled HTTP client for the realm-functions API"""
+import os
+import sys
+
+# Ensure this directory is in path
+_dir = os.path.dirname(__file__)
+if _dir not in sys.path:
+    sys.path.insert(0, _dir)
+
+from functions_client import FunctionsClient, ApiCall, endpoint_name, response_json, table_body
+from async_client import AsyncFunctionsClient, ApiRequest, ApiResult
+from readiness import ReadinessWatcher, ProvisionTimeline
+from server_pool import ServerPool, LeasedServer
+from teardown import TeardownReaper
+
+__all__ = ["FunctionsClient", "ApiCall", "endpoint_name", "response_json", "table_body", "AsyncFunctionsClient",
+           "ApiRequest", "ApiResult", "ReadinessWatcher", "ProvisionTimeline", "ServerPool", "LeasedServer",
+           "TeardownReaper"]
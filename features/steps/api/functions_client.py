@@ -0,0 +1,220 @@
+"""
+Pooled HTTP client for the realm-functions API.
+
+One requests.Session per worker process keeps connections alive across
+steps and scenarios, so each host pays its TCP/TLS handshake once. The
+client appends the function key, applies per-endpoint timeouts and records
+the wall time of every call.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Seconds per endpoint, first match wins; provisioning and backups run long
+ENDPOINT_TIMEOUTS = [
+    ("POST", re.compile(r"/api/servers/provision"), 120),
+    ("POST", re.compile(r"/api/servers/[^/]+/(backup|restore)"), 120),
+    ("POST", re.compile(r"/api/servers/[^/]+/(stop|start)"), 60),
+    ("PATCH", re.compile(r"/api/servers/[^/]+"), 60),
+    ("DELETE", re.compile(r"/api/servers/[^/]+"), 60),
+]
+DEFAULT_TIMEOUT = 30
+
+# Path segments after these collections are IDs, grouped into one endpoint
+ID_COLLECTIONS = {"servers", "subscriptions", "game-servers"}
+NAMED_ROUTES = {"provision"}
+
+# Connections kept open per host; parallel steps may use several at once
+DEFAULT_POOL_SIZE = 20
+
+# Calls kept for timing reports
+MAX_RECORDED_CALLS = 1000
+
+
+@dataclass
+class ApiCall:
+    """Timing of one API call"""
+    method: str
+    path: str
+    status: Optional[int]
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+def timeout_for(method: str, path: str) -> int:
+    path = path.split("?", 1)[0]
+    for endpoint_method, pattern, seconds in ENDPOINT_TIMEOUTS:
+        if endpoint_method == method and pattern.fullmatch(path):
+            return seconds
+    return DEFAULT_TIMEOUT
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """'POST', '/api/servers/srv-1/stop?code=x' -> 'POST /api/servers/{id}/stop'"""
+    path = re.sub(r"^https?://[^/]+", "", path.split("?", 1)[0])
+    segments = path.split("/")
+    for i in range(1, len(segments)):
+        if segments[i - 1] in ID_COLLECTIONS and segments[i] not in NAMED_ROUTES:
+            segments[i] = "{id}"
+    return f"{method} {'/'.join(segments)}"
+
+
+def response_json(response: requests.Response) -> Dict[str, Any]:
+    """Decoded JSON body, or {} when the body is not JSON"""
+    try:
+        return response.json()
+    except ValueError:
+        return {}
+
+
+def table_body(table) -> Dict[str, Any]:
+    """Request body from a headerless two-column step table ("true"/"false" become booleans)"""
+    # Behave reads the first row of every table as its headings
+    body: Dict[str, Any] = {}
+    for row in [table.headings, *table.rows]:
+        key, value = row[0], row[1]
+        body[key] = {"true": True, "false": False}.get(value.lower(), value)
+    return body
+
+
+class FunctionsClient:
+    """Functions API client on the worker's pooled HTTP session"""
+
+    # Process-wide HTTP session and clients, reused across Behave runs inside a parallel worker
+    _http: Optional[requests.Session] = None
+    _shared: Dict[str, "FunctionsClient"] = {}
+
+    @classmethod
+    def http(cls) -> requests.Session:
+        """The worker's pooled session, created on first use"""
+        if cls._http is None:
+            pool_size = int(os.getenv("API_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            cls._http = session
+        return cls._http
+
+    @classmethod
+    def shared(cls, base_url: Optional[str], function_key: Optional[str] = None) -> "FunctionsClient":
+        """Return the client for this base URL, creating it on first use"""
+        key = base_url or ""
+        if key not in cls._shared:
+            cls._shared[key] = cls(base_url, function_key)
+        return cls._shared[key]
+
+    @classmethod
+    def close_shared(cls, base_url: Optional[str] = None):
+        """Report on one client (by base URL), or on all of them and close the pooled session"""
+        if base_url is not None:
+            client = cls._shared.pop(base_url, None)
+            if client:
+                client.print_summary()
+            return
+        for client in cls._shared.values():
+            client.print_summary()
+        cls._shared.clear()
+        if cls._http is not None:
+            cls._http.close()
+            cls._http = None
+
+    def __init__(self, base_url: Optional[str], function_key: Optional[str] = None):
+        self.base_url = (base_url or "").rstrip("/")
+        self.function_key = function_key if function_key is not None else os.getenv("FUNCTIONS_KEY", "")
+        self.calls: Deque[ApiCall] = deque(maxlen=MAX_RECORDED_CALLS)
+        self.call_count = 0
+        # Called with every ApiCall, e.g. by the load tester
+        self.listeners: List[Callable[[ApiCall], None]] = []
+        # Load tests call from many threads while listeners come and go
+        self._lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        """Full URL for an API path, with the function key appended"""
+        if path.startswith(("http://", "https://")):
+            return path
+        if self.function_key:
+            separator = "&" if "?" in path else "?"
+            return f"{self.base_url}{path}{separator}code={self.function_key}"
+        return f"{self.base_url}{path}"
+
+    # ==================== REQUESTS ====================
+
+    def request(self, method: str, path: str, json: Any = None,
+                timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """Send a request on the pooled session and record its timing"""
+        method = method.upper()
+        url = self.url(path)
+        timeout = timeout or timeout_for(method, path)
+        started = time.perf_counter()
+        try:
+            response = self.http().request(method, url, json=json, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            self._record(ApiCall(method, path, None, (time.perf_counter() - started) * 1000, error=str(e)))
+            raise
+        response.elapsed_ms = (time.perf_counter() - started) * 1000
+        self._record(ApiCall(method, path, response.status_code, response.elapsed_ms))
+        return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, json: Any = None, **kwargs) -> requests.Response:
+        return self.request("POST", path, json=json, **kwargs)
+
+    def patch(self, path: str, json: Any = None, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, json=json, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def add_listener(self, listener: Callable[[ApiCall], None]):
+        with self._lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ApiCall], None]):
+        """Stop calling a listener; removing one that is not registered is a no-op"""
+        with self._lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def _record(self, call: ApiCall):
+        with self._lock:
+            self.calls.append(call)
+            self.call_count += 1
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(call)
+
+    # ==================== REPORTING ====================
+
+    @property
+    def last_call(self) -> Optional[ApiCall]:
+        return self.calls[-1] if self.calls else None
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+            call_count = self.call_count
+        timings = [call.elapsed_ms for call in calls]
+        return {
+            "calls": call_count,
+            "errors": sum(1 for call in calls if call.error or (call.status or 0) >= 500),
+            "mean_ms": sum(timings) / len(timings) if timings else 0.0,
+            "max_ms": max(timings, default=0.0),
+        }
+
+    def print_summary(self):
+        if not self.call_count:
+            return
+        s = self.summary()
+        print(f"🌐 API {self.base_url or '(absolute URLs)'}: {s['calls']} calls, "
+              f"mean {s['mean_ms']:.0f}ms, max {s['max_ms']:.0f}ms, {s['errors']} errors")
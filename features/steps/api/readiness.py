@@ -0,0 +1,174 @@
+"""
+Server readiness watcher.
+
+Starts a provision in a background thread, then polls /api/servers/{id}
+with exponential backoff and jitter until the pod reaches the target phase.
+The step that fired the provision returns immediately; the scenario only
+blocks at the step that needs the server, and the time to each pod phase
+is recorded for the provisioning-latency metrics.
+"""
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from functions_client import FunctionsClient, response_json
+
+
+TARGET_PHASE = "Running"
+FAILED_PHASES = {"Failed", "CrashLoopBackOff", "ErrImagePull", "ImagePullBackOff"}
+
+DEFAULT_READY_TIMEOUT = 300
+
+# Poll delay starts small (the mock and warm clusters are fast) and doubles
+# up to the cap; each delay is jittered by ±50% so watchers do not poll in step
+INITIAL_POLL_SECONDS = 0.5
+MAX_POLL_SECONDS = 10.0
+BACKOFF_FACTOR = 2.0
+
+
+@dataclass
+class ProvisionTimeline:
+    """What a watcher saw, in seconds since the provision started"""
+    server_id: Optional[str] = None
+    response: Optional[requests.Response] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    provision_seconds: Optional[float] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+    polls: int = 0
+    ready: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ready_seconds(self) -> Optional[float]:
+        return self.phases.get(TARGET_PHASE) if self.ready else None
+
+    def describe(self) -> str:
+        hops = [f"provision {self.provision_seconds:.1f}s"] if self.provision_seconds is not None else []
+        hops += [f"{phase} {seconds:.1f}s" for phase, seconds in self.phases.items()]
+        return " → ".join(hops) + f" ({self.polls} polls)"
+
+
+def observed_phase(details: Dict[str, Any]) -> Optional[str]:
+    """Pod phase from a server details payload, preferring the waiting reason"""
+    pod = details.get("kubernetes", {}).get("pod", {})
+    if pod.get("phase") == "Pending" and pod.get("reason"):
+        return pod["reason"]
+    return pod.get("phase")
+
+
+class ReadinessWatcher:
+    """Provisions a server and watches it come up without blocking the caller"""
+
+    def __init__(self, client: FunctionsClient, target_phase: str = TARGET_PHASE,
+                 timeout: Optional[float] = None):
+        self.client = client
+        self.target_phase = target_phase
+        self.timeout = timeout or float(os.getenv("SERVER_READY_TIMEOUT", str(DEFAULT_READY_TIMEOUT)))
+        self.timeline = ProvisionTimeline()
+        self._started = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._server_known = threading.Event()
+        self._cancelled = threading.Event()
+        self._on_server: Optional[Callable[[str], None]] = None
+
+    # ==================== CONTROL ====================
+
+    def provision(self, payload: Dict[str, Any],
+                  on_server: Optional[Callable[[str], None]] = None) -> "ReadinessWatcher":
+        """Fire the provision request and start watching in the background
+
+        on_server is called with the server ID as soon as the provision answers.
+        """
+        self._on_server = on_server
+        return self._start(self._provision_and_poll, payload)
+
+    def watch(self, server_id: str) -> "ReadinessWatcher":
+        """Watch an already provisioned server"""
+        self.timeline.server_id = server_id
+        self._server_known.set()
+        return self._start(self._poll, server_id)
+
+    def _start(self, target, *args) -> "ReadinessWatcher":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=target, args=args, name="readiness-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait_for_server(self, timeout: Optional[float] = None) -> ProvisionTimeline:
+        """Block until the provision call has answered"""
+        self._server_known.wait(timeout or self.timeout)
+        return self.timeline
+
+    def wait(self, timeout: Optional[float] = None) -> ProvisionTimeline:
+        """Block until the server is ready, failed or timed out (the watcher bounds itself)"""
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive() and not self.timeline.error:
+                self.timeline.error = f"Still waiting for {self.target_phase} after {timeout:.0f}s"
+        return self.timeline
+
+    # ==================== BACKGROUND ====================
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def _provision_and_poll(self, payload: Dict[str, Any]):
+        try:
+            response = self.client.post("/api/servers/provision", json=payload)
+        except requests.RequestException as e:
+            self.timeline.error = f"Provision request failed: {e}"
+            self._server_known.set()
+            return
+
+        self.timeline.response = response
+        self.timeline.data = response_json(response)
+        self.timeline.provision_seconds = self._elapsed()
+        if response.status_code != 200:
+            self.timeline.error = f"Provision returned {response.status_code}"
+            self._server_known.set()
+            return
+
+        self.timeline.server_id = self.timeline.data.get("data", {}).get("serverId")
+        self._server_known.set()
+        if self.timeline.server_id and self._on_server:
+            self._on_server(self.timeline.server_id)
+        if self.timeline.server_id:
+            self._poll(self.timeline.server_id)
+        else:
+            self.timeline.error = "Provision response has no serverId"
+
+    def _poll(self, server_id: str):
+        delay = INITIAL_POLL_SECONDS
+        while not self._cancelled.is_set():
+            phase = None
+            try:
+                response = self.client.get(f"/api/servers/{server_id}")
+                if response.status_code == 200:
+                    phase = observed_phase(response_json(response).get("data", {}))
+            except requests.RequestException:
+                pass  # Transient; the deadline bounds the retries
+            self.timeline.polls += 1
+
+            if phase and phase not in self.timeline.phases:
+                self.timeline.phases[phase] = self._elapsed()
+            if phase == self.target_phase:
+                self.timeline.ready = True
+                return
+            if phase in FAILED_PHASES:
+                self.timeline.error = f"Pod entered {phase}"
+                return
+
+            remaining = self.timeout - self._elapsed()
+            if remaining <= 0:
+                self.timeline.error = f"Not {self.target_phase} after {self.timeout:.0f}s (last phase: {phase})"
+                return
+            self._cancelled.wait(min(delay * random.uniform(0.5, 1.5), remaining))
+            delay = min(delay * BACKOFF_FACTOR, MAX_POLL_SECONDS)
@@ -0,0 +1,421 @@
+"""
+Warm pool of pre-provisioned game servers.
+
+Provisioning a real server takes minutes, so lifecycle scenarios lease a
+running server from a pool instead. The pool keeps SERVER_POOL servers per
+game type and tier warm (e.g. "minecraft:small=2"), provisions more on
+demand, and resets a server when its lease ends (start it if the scenario
+stopped it, restore the tier) before handing it to the next scenario.
+
+Pool servers belong to SERVER_POOL_USER, carry the provisioning run's tag in
+their name and are tracked in a registry file shared by parallel workers:
+idle servers a previous run kept are adopted (only when the registry is
+persisted, see SERVER_POOL_REGISTRY), and a background reaper deletes
+registered servers nobody owns once they have been idle for
+SERVER_POOL_IDLE_TTL seconds. Servers of other runs using the same pool user
+are never touched.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from functions_client import FunctionsClient, response_json
+from async_client import AsyncFunctionsClient, ApiRequest
+from readiness import ReadinessWatcher
+
+try:
+    import fcntl
+except ImportError:  # Windows: registry writes are not locked
+    fcntl = None
+
+
+DEFAULT_REGISTRY_FILE = ".server-pool.json"
+DEFAULT_POOL_USER = "e2e-pool"
+POOL_NAME_PREFIX = "pool-"
+DEFAULT_TIER = "small"
+DEFAULT_IDLE_TTL = 1800
+DEFAULT_REAP_INTERVAL = 60
+DEFAULT_CLOSE_TIMEOUT = 120
+DEFAULT_LEASE_TIMEOUT = 600
+
+PoolKey = Tuple[str, str]
+
+
+def parse_pool_spec(spec: str) -> Dict[PoolKey, int]:
+    """'minecraft:small=2,valheim=1' -> {("minecraft", "small"): 2, ("valheim", "small"): 1}"""
+    sizes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, count = item.partition("=")
+        game_type, _, tier = name.partition(":")
+        sizes[(game_type.lower(), (tier or DEFAULT_TIER).lower())] = int(count or 1)
+    return sizes
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@dataclass
+class LeasedServer:
+    """A running pool server handed to one scenario"""
+    id: str
+    gameType: str
+    tier: str
+    ip: Optional[str] = None
+    port: Optional[int] = None
+
+    @property
+    def key(self) -> PoolKey:
+        return self.gameType, self.tier
+
+
+class PoolRegistry:
+    """Pool servers of one API host, shared through a locked JSON file"""
+
+    def __init__(self, scope: str, path: Optional[str] = None):
+        self.scope = scope
+        self.path = path or os.getenv("SERVER_POOL_REGISTRY", DEFAULT_REGISTRY_FILE)
+
+    @contextmanager
+    def _locked(self):
+        with open(f"{self.path}.lock", "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def update(self, change: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Apply change() to this scope's entries ({server_id: entry}) under the lock"""
+        with self._locked():
+            registry = self._read()
+            entries = registry.setdefault(self.scope, {})
+            result = change(entries)
+            if not entries:
+                registry.pop(self.scope)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(registry, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            return result
+
+
+class ServerPool:
+    """Leases warm servers to scenarios and keeps the pool topped up"""
+
+    # Process-wide pools, reused across Behave runs inside a parallel worker
+    _shared: Dict[str, "ServerPool"] = {}
+
+    @classmethod
+    def shared(cls, client: FunctionsClient, **options: Any) -> "ServerPool":
+        """Return the pool for this API host, creating it on first use"""
+        if client.base_url not in cls._shared:
+            cls._shared[client.base_url] = cls(client, **options)
+        return cls._shared[client.base_url]
+
+    @classmethod
+    def close_shared(cls, base_url: Optional[str] = None):
+        """Close one pool (by API base URL) or all of them"""
+        for url in [base_url.rstrip("/")] if base_url else list(cls._shared):
+            pool = cls._shared.pop(url, None)
+            if pool:
+                pool.close()
+
+    def __init__(self, client: FunctionsClient, sizes: Optional[Dict[PoolKey, int]] = None,
+                 user_id: Optional[str] = None, keep: Optional[bool] = None,
+                 idle_ttl: Optional[float] = None, registry: Optional[PoolRegistry] = None):
+        self.client = client
+        self.sizes = sizes if sizes is not None else parse_pool_spec(os.getenv("SERVER_POOL", ""))
+        self.user_id = user_id or os.getenv("SERVER_POOL_USER", DEFAULT_POOL_USER)
+        # Kept servers are only found again through a registry that outlives the run
+        default_keep = "true" if os.getenv("SERVER_POOL_REGISTRY") else "false"
+        self.keep = keep if keep is not None else os.getenv("SERVER_POOL_KEEP", default_keep).lower() == "true"
+        # Names the servers this run provisions, so the reaper can tell them from other runs'
+        self.run_tag = os.getenv("SERVER_POOL_RUN_ID") or uuid.uuid4().hex[:8]
+        self.idle_ttl = idle_ttl or float(os.getenv("SERVER_POOL_IDLE_TTL", str(DEFAULT_IDLE_TTL)))
+        self.registry = registry or PoolRegistry(client.base_url)
+        self.leases = 0
+        self.provisioned = 0
+        self._idle: Dict[PoolKey, List[LeasedServer]] = {}
+        self._pending: Dict[PoolKey, List[ReadinessWatcher]] = {}
+        self._returning: Dict[PoolKey, int] = {}
+        self._cond = threading.Condition()
+        self._unknown_seen: Set[str] = set()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    # ==================== LEASING ====================
+
+    def warm(self) -> "ServerPool":
+        """Adopt idle pool servers and start provisioning up to SERVER_POOL"""
+        self._start_reaper()
+        self._adopt()
+        with self._cond:
+            for key, size in self.sizes.items():
+                missing = size - len(self._idle.get(key, [])) - len(self._pending.get(key, []))
+                for _ in range(max(0, missing)):
+                    self._provision(key)
+        return self
+
+    def lease(self, game_type: str, tier: str = DEFAULT_TIER, timeout: Optional[float] = None) -> LeasedServer:
+        """Hand out a running server, waiting for a warm one or provisioning a new one"""
+        key = (game_type.lower(), tier.lower())
+        timeout = timeout if timeout is not None else float(os.getenv("SERVER_POOL_LEASE_TIMEOUT",
+                                                                      str(DEFAULT_LEASE_TIMEOUT)))
+        deadline = time.monotonic() + timeout
+        self._start_reaper()
+        watcher = None
+        with self._cond:
+            while not self._idle.get(key) and self._returning.get(key):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(f"Could not lease a running {game_type} server: none came back "
+                                       f"to the pool within {timeout:g}s")
+                self._cond.wait(remaining)
+            if not self._idle.get(key):
+                self._cond.release()
+                try:
+                    self._adopt(key)
+                finally:
+                    self._cond.acquire()
+            if self._idle.get(key):
+                server = self._idle[key].pop(0)
+            else:
+                pending = self._pending.get(key)
+                watcher = pending.pop(0) if pending else self._provision(key, track=False)
+
+        if watcher is not None:
+            timeline = watcher.wait(max(0.0, deadline - time.monotonic()))
+            if not timeline.ready:
+                raise RuntimeError(f"Could not lease a running {game_type} server: {timeline.error}")
+            data = timeline.data.get("data", {})
+            server = LeasedServer(timeline.server_id, key[0], key[1], data.get("ip"), data.get("port"))
+
+        self._set_entry(server, leased=True)
+        self.leases += 1
+        return server
+
+    def release(self, server: LeasedServer):
+        """Reset the server in the background and return it to the pool"""
+        with self._cond:
+            self._returning[server.key] = self._returning.get(server.key, 0) + 1
+        threading.Thread(target=self._return, args=(server,), name="server-pool-reset", daemon=True).start()
+
+    def _return(self, server: LeasedServer):
+        try:
+            healthy = self._reset(server)
+        except Exception as e:
+            print(f"⚠️  Pool server {server.id} could not be reset: {e}")
+            healthy = False
+        with self._cond:
+            self._returning[server.key] -= 1
+            if healthy:
+                self._idle.setdefault(server.key, []).append(server)
+            elif len(self._idle.get(server.key, [])) + len(self._pending.get(server.key, [])) \
+                    < self.sizes.get(server.key, 0):
+                self._provision(server.key)
+            self._cond.notify_all()
+        if healthy:
+            self._set_entry(server, leased=False)
+        else:
+            self._discard(server.id)
+
+    def _reset(self, server: LeasedServer) -> bool:
+        """Bring a returned server back to a running server of its tier"""
+        response = self.client.get(f"/api/servers/{server.id}")
+        if response.status_code == 404:
+            return False  # The scenario deleted it
+        details = response_json(response).get("data", {})
+        current = details.get("server", {})
+        if (current.get("tier") or current.get("plan")) not in (None, server.tier):
+            self.client.patch(f"/api/servers/{server.id}", json={"tier": server.tier})
+        if details.get("kubernetes", {}).get("pod", {}).get("phase") != "Running":
+            self.client.post(f"/api/servers/{server.id}/start")
+            return ReadinessWatcher(self.client).watch(server.id).wait().ready
+        return True
+
+    def _provision(self, key: PoolKey, track: bool = True) -> ReadinessWatcher:
+        """Start provisioning a pool server (caller holds the lock)"""
+        # Registered as soon as it exists, so the reaper never takes it for a leak
+        watcher = ReadinessWatcher(self.client).provision({
+            "userId": self.user_id,
+            "gameType": key[0],
+            "tier": key[1],
+            "serverName": f"{POOL_NAME_PREFIX}{self.run_tag}-{key[0]}-{key[1]}",
+        }, on_server=lambda server_id: self._set_entry(LeasedServer(server_id, *key), leased=False))
+        if track:
+            self._pending.setdefault(key, []).append(watcher)
+            threading.Thread(target=self._promote, args=(key, watcher), daemon=True).start()
+        self.provisioned += 1
+        return watcher
+
+    def _promote(self, key: PoolKey, watcher: ReadinessWatcher):
+        """Move a warmed server from pending to idle once it is running"""
+        timeline = watcher.wait()
+        with self._cond:
+            if watcher not in self._pending.get(key, []):
+                return  # Already handed to a lease
+            self._pending[key].remove(watcher)
+            if timeline.ready:
+                data = timeline.data.get("data", {})
+                server = LeasedServer(timeline.server_id, key[0], key[1], data.get("ip"), data.get("port"))
+                self._idle.setdefault(key, []).append(server)
+            self._cond.notify_all()
+        if timeline.ready:
+            self._set_entry(server, leased=False)
+
+    # ==================== REGISTRY ====================
+
+    def _set_entry(self, server: LeasedServer, leased: bool):
+        def change(entries):
+            entries[server.id] = {
+                "gameType": server.gameType, "tier": server.tier, "ip": server.ip, "port": server.port,
+                "owner": os.getpid(), "leased": leased, "lastUsed": time.time(),
+            }
+        self.registry.update(change)
+
+    def _pool_servers(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """The pool user's servers by ID, or None if the API could not list them"""
+        response = self.client.get(f"/api/servers?userId={self.user_id}")
+        if response.status_code != 200:
+            print(f"⚠️  Server pool: listing servers returned {response.status_code}, registry left as is")
+            return None
+        servers = response_json(response).get("data", {}).get("servers", [])
+        return {server["id"]: server for server in servers if server.get("id")}
+
+    def _adopt(self, key: Optional[PoolKey] = None):
+        """Claim running pool servers that no live process owns"""
+        live = self._pool_servers()
+        if live is None:
+            return  # Without the list, every entry would look deleted and be pruned
+        wanted = set(self.sizes) | set(self._idle) | ({key} if key else set())
+
+        def change(entries):
+            adopted = []
+            for server_id in list(entries):
+                entry = entries[server_id]
+                if server_id not in live:
+                    del entries[server_id]  # Deleted elsewhere
+                    continue
+                entry_key = (entry["gameType"], entry["tier"])
+                if entry_key in wanted and not _pid_alive(entry.get("owner")) \
+                        and live[server_id].get("status") == "running":
+                    entry.update(owner=os.getpid(), leased=False, lastUsed=time.time())
+                    adopted.append(LeasedServer(server_id, *entry_key, entry.get("ip"), entry.get("port")))
+            return adopted
+
+        adopted = self.registry.update(change)
+        with self._cond:
+            for server in adopted:
+                self._idle.setdefault(server.key, []).append(server)
+            self._cond.notify_all()
+
+    def _provisioned_here(self, server: Dict[str, Any]) -> bool:
+        name = server.get("name") or server.get("serverName") or ""
+        return name.startswith(f"{POOL_NAME_PREFIX}{self.run_tag}-")
+
+    def _discard(self, server_id: str):
+        self.registry.update(lambda entries: entries.pop(server_id, None))
+        self.client.delete(f"/api/servers/{server_id}")
+
+    # ==================== REAPER ====================
+
+    def _start_reaper(self):
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="server-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = float(os.getenv("SERVER_POOL_REAP_INTERVAL", str(DEFAULT_REAP_INTERVAL)))
+        while not self._stop.wait(interval):
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"⚠️  Server pool reaper: {e}")
+
+    def reap(self) -> List[str]:
+        """Delete registered servers nobody owns that are idle past the TTL, and this run's unregistered ones"""
+        live = self._pool_servers()
+        if live is None:
+            return []
+        now = time.time()
+
+        def change(entries):
+            leaked = []
+            for server_id in live:
+                entry = entries.get(server_id)
+                if entry is None:
+                    # Servers of other runs (another job or developer on the same
+                    # environment) are theirs to clean up. Ours, unknown for two
+                    # passes in a row, are not a provision about to register.
+                    if self._provisioned_here(live[server_id]) and server_id in self._unknown_seen:
+                        leaked.append(server_id)
+                    continue
+                if not _pid_alive(entry.get("owner")) and now - entry.get("lastUsed", 0) > self.idle_ttl:
+                    leaked.append(server_id)
+            for server_id in leaked:
+                entries.pop(server_id, None)
+            self._unknown_seen = {server_id for server_id, server in live.items()
+                                  if server_id not in entries and self._provisioned_here(server)} - set(leaked)
+            return leaked
+
+        leaked = self.registry.update(change)
+        if leaked:
+            AsyncFunctionsClient(self.client).run_batch(ApiRequest("DELETE", f"/api/servers/{server_id}")
+                                                        for server_id in leaked)
+            print(f"🧹 Reaped {len(leaked)} leaked pool servers: {', '.join(leaked)}")
+        return leaked
+
+    # ==================== SHUTDOWN ====================
+
+    def close(self):
+        """Stop background work; keep idle servers for the next run or delete them"""
+        self._stop.set()
+        with self._cond:
+            # Let servers released by the last scenarios finish their reset
+            self._cond.wait_for(lambda: not any(self._returning.values()), timeout=DEFAULT_CLOSE_TIMEOUT)
+            ids = {server.id for servers in self._idle.values() for server in servers}
+            for watchers in self._pending.values():
+                for watcher in watchers:
+                    watcher.cancel()
+                    if watcher.timeline.server_id:
+                        ids.add(watcher.timeline.server_id)
+            self._idle.clear()
+            self._pending.clear()
+        if not (self.leases or self.provisioned or ids):
+            return
+
+        if self.keep:
+            def change(entries):
+                for server_id in ids:
+                    if server_id in entries:
+                        entries[server_id].update(owner=None, leased=False, lastUsed=time.time())
+            self.registry.update(change)
+        else:
+            self.registry.update(lambda entries: [entries.pop(server_id, None) for server_id in ids])
+            AsyncFunctionsClient(self.client).run_batch(ApiRequest("DELETE", f"/api/servers/{server_id}")
+                                                        for server_id in ids)
+        action = "kept warm" if self.keep else "deleted"
+        print(f"🏊 Server pool: {self.leases} leases, {self.provisioned} provisioned, {len(ids)} idle servers {action}")
@@ -0,0 +1,128 @@
+"""
+Teardown reaper for resources created during a run.
+
+Steps register the servers and checkout sessions they create; at the end of
+the run the reaper cancels the subscriptions and deletes the servers that
+are still around, concurrently and with retries, so a scenario that fails
+half-way no longer leaks a server. Anything it cannot remove is written to
+a report for manual cleanup.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from functions_client import FunctionsClient
+from async_client import AsyncFunctionsClient, ApiRequest, ApiResult
+
+
+DEFAULT_REPORT_FILE = "reports/teardown.json"
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+
+
+def _removed(result: ApiResult) -> bool:
+    """Removed now, or already gone"""
+    return result.ok or result.status == 404
+
+
+class TeardownReaper:
+    """Tracks created resources and removes leftovers at the end of the run"""
+
+    def __init__(self, client: FunctionsClient, retries: Optional[int] = None,
+                 report_path: Optional[str] = None):
+        self.client = client
+        self.enabled = os.getenv("TEARDOWN_REAPER", "true").lower() == "true"
+        retries = retries if retries is not None else int(os.getenv("TEARDOWN_RETRIES", str(DEFAULT_RETRIES)))
+        # Every resource gets at least one attempt
+        self.retries = max(1, retries)
+        self.report_path = report_path or os.getenv("TEARDOWN_REPORT_FILE", DEFAULT_REPORT_FILE)
+        self.servers: Dict[str, str] = {}
+        self.subscriptions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # ==================== TRACKING ====================
+
+    def track_server(self, server_id: Optional[str], source: str = ""):
+        if server_id:
+            with self._lock:
+                self.servers[server_id] = source
+
+    def track_subscription(self, subscription_id: Optional[str], source: str = ""):
+        if subscription_id:
+            with self._lock:
+                self.subscriptions[subscription_id] = source
+
+    def forget_server(self, server_id: Optional[str]):
+        with self._lock:
+            self.servers.pop(server_id, None)
+
+    def forget_subscription(self, subscription_id: Optional[str]):
+        with self._lock:
+            self.subscriptions.pop(subscription_id, None)
+
+    # ==================== REAPING ====================
+
+    def run(self) -> List[Dict[str, Any]]:
+        """Cancel tracked subscriptions, then delete tracked servers; returns the failures"""
+        if not self.enabled:
+            return []
+        if not (self.servers or self.subscriptions):
+            self._write_report([])
+            return []
+        with self._lock:
+            subscriptions = dict(self.subscriptions)
+            servers = dict(self.servers)
+            self.subscriptions.clear()
+            self.servers.clear()
+
+        started = time.perf_counter()
+        # Cancelling first stops billing before the server behind it goes
+        failures = self._remove("subscription", subscriptions, lambda subscription_id: ApiRequest(
+            "POST", f"/api/subscriptions/{subscription_id}/cancel", json={"immediate": True}))
+        failures += self._remove("server", servers, lambda server_id: ApiRequest(
+            "DELETE", f"/api/servers/{server_id}"))
+
+        removed = len(subscriptions) + len(servers) - len(failures)
+        print(f"🧹 Teardown: removed {removed} of {len(subscriptions) + len(servers)} resources "
+              f"in {time.perf_counter() - started:.1f}s")
+        self._write_report(failures)
+        if failures:
+            print(f"⚠️  {len(failures)} resources left behind, see {self.report_path}")
+        return failures
+
+    def _remove(self, kind: str, resources: Dict[str, str], make_request) -> List[Dict[str, Any]]:
+        """Remove resources concurrently, retrying failures with backoff"""
+        remaining = {resource_id: None for resource_id in resources}
+        batch = AsyncFunctionsClient(self.client)
+        for attempt in range(1, self.retries + 1):
+            ids = list(remaining)
+            for resource_id, result in zip(ids, batch.run_batch(make_request(i) for i in ids)):
+                if _removed(result):
+                    del remaining[resource_id]
+                else:
+                    remaining[resource_id] = (attempt, result)
+            if not remaining or attempt == self.retries:
+                break
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+        return [{
+            "kind": kind,
+            "id": resource_id,
+            "source": resources[resource_id],
+            "attempts": attempts,
+            "status": result.status,
+            "error": result.error or (result.response.text[:500] if result.response is not None else None),
+        } for resource_id, (attempts, result) in remaining.items()]
+
+    def _write_report(self, failures: List[Dict[str, Any]]):
+        """Write what was left behind; a clean run removes an earlier run's report"""
+        if not failures:
+            if os.path.exists(self.report_path):
+                os.remove(self.report_path)
+            return
+        os.makedirs(os.path.dirname(self.report_path) or ".", exist_ok=True)
+        report = {"functions_url": self.client.base_url, "timestamp": time.time(), "failures": failures}
+        with open(self.report_path, "w") as f:
+            json.dump(report, f, indent=2)
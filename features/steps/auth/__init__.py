@@ -8,8 +8,9 @@ if _dir not in sys.path:
     sys.path.insert(0, _dir)
 
 from base import BaseAuthProvider, AuthResult, AuthUser, AuthManager
+from storage_cache import StorageStateCache
 
 # Import providers to register them
 import providers
 
-__all__ = ["BaseAuthProvider", "AuthResult", "AuthUser", "AuthManager"]
+__all__ = ["BaseAuthProvider", "AuthResult", "AuthUser", "AuthManager", "StorageStateCache"]
@@ -4,11 +4,13 @@ Extend BaseAuthProvider for new authentication providers.
 """
 import os
 import time
-import json
 from abc import ABC, abstractmethod
 from urllib.parse import urlparse, parse_qs
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple
+
+from browser import SeedProfile, StorageSeeder
+from storage_cache import StorageStateCache
 
 
 @dataclass
@@ -30,6 +32,8 @@ class AuthResult:
     user: Optional[AuthUser] = None
     error: Optional[str] = None
     redirect_url: Optional[str] = None
+    cached: bool = False
+    hops: List[Tuple[str, float]] = field(default_factory=list)
 
 
 class BaseAuthProvider(ABC):
@@ -63,6 +67,40 @@ class BaseAuthProvider(ABC):
         self.page.goto(url)
         return True
     
+    def login_cached(self, redirect_uri: Optional[str] = None) -> AuthResult:
+        """Restore a cached session for this provider and user, or log in and cache it"""
+        cache = StorageStateCache(scope=f"{self.context.environment} {self.functions_url}")
+        user = self.get_credentials()["email"]
+        entry = cache.load(self.provider_name, user)
+        if entry:
+            self.restore_storage_state(entry["storage_state"])
+            result = self.validate_token(entry["token"])
+            if result.success:
+                result.cached = True
+                return result
+            # Session was revoked or expired server-side - fall back to a fresh login
+            cache.evict(self.provider_name, user)
+            # The restored localStorage is seeded by an init script on this context,
+            # so log in on a clean context rather than clearing cookies on this one
+            self.context.browser_session.close_context(self.page.reset())
+        
+        result = self.login(redirect_uri)
+        if result.success:
+            cache.save(self.provider_name, user, result.token, result.user,
+                       self.page.context.storage_state())
+        return result
+    
+    def restore_storage_state(self, state: Dict[str, Any]):
+        """Apply saved cookies and localStorage to the current browser context"""
+        if state.get("cookies"):
+            self.page.context.add_cookies(state["cookies"])
+        for origin in state.get("origins", []):
+            items = {item["name"]: item["value"] for item in origin.get("localStorage", [])}
+            if items:
+                # Seeded once per tab, so a later logout is not undone by the next navigation
+                StorageSeeder(origin["origin"]).apply_profile(
+                    self.page, f"auth:{self.provider_name}", SeedProfile(local_storage=items))
+    
     def validate_token(self, token: str) -> AuthResult:
         """Validate token via /auth/me endpoint"""
         response = self.page.request.get(
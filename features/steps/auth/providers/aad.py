@@ -3,15 +3,38 @@ Azure AD (Entra ID) authentication provider
 """
 import os
 import sys
-import time
 from typing import Optional, Dict
+from urllib.parse import urlparse
 
-# Add parent auth directory to path
+# Add parent auth directory (and the steps directory above it) to path
 _auth_dir = os.path.dirname(os.path.dirname(__file__))
 if _auth_dir not in sys.path:
     sys.path.insert(0, _auth_dir)
+_steps_dir = os.path.dirname(_auth_dir)
+if _steps_dir not in sys.path:
+    sys.path.insert(0, _steps_dir)
 
 from base import BaseAuthProvider, AuthResult, AuthManager
+from browser import PageWaiter
+
+
+# Identity provider the Functions app redirects to; point SSO_IDP_URL at a
+# local stand-in (see mocks/oidc_provider.py) to run SSO scenarios offline
+DEFAULT_IDP_URL = "https://login.microsoftonline.com"
+
+# Prompts Azure AD may show after the password is accepted
+POST_LOGIN_PROMPTS = {
+    "stay_signed_in": 'text="Stay signed in?"',
+    "consent": 'input[value="Accept"]',
+}
+
+
+def idp_host() -> str:
+    return urlparse(os.getenv("SSO_IDP_URL", DEFAULT_IDP_URL)).netloc
+
+
+def is_azure_login(url: str) -> bool:
+    return urlparse(url).netloc == idp_host()
 
 
 class AzureADProvider(BaseAuthProvider):
@@ -45,24 +68,18 @@ class AzureADProvider(BaseAuthProvider):
         self.page.on("response", on_response)
         
         try:
-            self.page.goto(login_url, wait_until="networkidle")
+            with PageWaiter(self.page) as waiter:
+                self.page.goto(login_url, wait_until="domcontentloaded")
+                waiter.hop("login redirect")
             
-            # Handle Azure AD login if redirected
-            if "login.microsoftonline.com" in self.page.url:
-                self._complete_azure_login()
+                # Handle Azure AD login if redirected
+                if is_azure_login(self.page.url):
+                    self._complete_azure_login(waiter)
             
-            # Wait for callback to complete (it returns a 302 redirect)
-            # Give it time to follow redirects
-            for _ in range(10):
-                time.sleep(0.5)
-                current_url = self.page.url
-                # If we're no longer at the callback URL (redirected to final destination)
-                if "auth/callback" not in current_url:
-                    break
-                # Check if we're still at callback - page might show error
-                if "auth/callback" in current_url and "auth_token" not in current_url:
-                    # Callback might have returned an error - check page content
-                    pass
+                # The callback answers with a 302 to the final destination
+                waiter.response(lambda r: "auth/callback" in r.url, "callback", timeout_ms=5000)
+                waiter.until_url(lambda url: "auth/callback" not in url, "final redirect", timeout_ms=5000)
+                print(f"⏱️  SSO login: {waiter.report()}")
             
             # Get token from final URL if not captured
             if not captured_token:
@@ -71,6 +88,7 @@ class AzureADProvider(BaseAuthProvider):
             if captured_token:
                 result = self.validate_token(captured_token)
                 result.redirect_url = self.page.url
+                result.hops = waiter.hops
                 return result
             
             # If still at callback URL, grab the page content for debugging
@@ -87,13 +105,20 @@ class AzureADProvider(BaseAuthProvider):
             
             return AuthResult(
                 success=False,
-                error=error_msg
+                error=error_msg,
+                hops=waiter.hops
             )
         finally:
             self.page.remove_listener("response", on_response)
     
-    def _complete_azure_login(self):
+    def _complete_azure_login(self, waiter: PageWaiter):
         """Complete the Azure AD login form"""
+        self.enter_credentials()
+        waiter.hop("credentials")
+        self.complete_post_login(waiter)
+
+    def enter_credentials(self):
+        """Fill the email and password pages of the Azure AD form"""
         creds = self.get_credentials()
         
         # Enter email
@@ -101,38 +126,34 @@ class AzureADProvider(BaseAuthProvider):
         self.page.fill('input[type="email"]', creds["email"])
         self.page.click('input[type="submit"]')
         
-        # Enter password
-        time.sleep(2)
-        self.page.wait_for_selector('input[type="password"]', timeout=15000)
+        # Enter password once the password page is shown
+        self.page.wait_for_selector('input[type="password"]', state="visible", timeout=15000)
         self.page.fill('input[type="password"]', creds["password"])
         self.page.click('input[type="submit"]')
         
-        time.sleep(3)
-        self._handle_post_login_prompts()
-        self._wait_for_redirect()
-    
-    def _handle_post_login_prompts(self):
-        """Handle 'Stay signed in?' and consent prompts"""
-        # Stay signed in prompt
-        try:
-            if self.page.locator('text="Stay signed in?"').is_visible(timeout=3000):
-                self.page.click('input[value="No"]')
-        except:
-            pass
-        
-        # Consent prompt
-        try:
-            if self.page.locator('input[value="Accept"]').is_visible(timeout=3000):
+    def complete_post_login(self, waiter: PageWaiter, timeout_ms: int = 15000):
+        """Answer 'Stay signed in?' and consent prompts, then wait to leave Azure AD"""
+        handled = set()
+        while len(handled) < len(POST_LOGIN_PROMPTS):
+            prompt = waiter.first_of(
+                {k: v for k, v in POST_LOGIN_PROMPTS.items() if k not in handled},
+                "post-login prompt",
+                until_url=lambda url: not is_azure_login(url),
+                timeout_ms=timeout_ms
+            )
+            if prompt == "stay_signed_in":
+                no_button = self.page.locator('input[value="No"]')
+                if no_button.is_visible():
+                    no_button.click()
+                else:
+                    self.page.locator('#idBtn_Back').click()
+            elif prompt == "consent":
                 self.page.click('input[value="Accept"]')
-        except:
-            pass
-    
-    def _wait_for_redirect(self, max_seconds: int = 15):
-        """Wait for redirect away from Azure AD"""
-        for _ in range(max_seconds):
-            time.sleep(1)
-            if "login.microsoftonline.com" not in self.page.url:
+            else:
                 break
+            handled.add(prompt)
+        
+        waiter.until_url(lambda url: not is_azure_login(url), "leave Azure AD", timeout_ms=timeout_ms)
 
 
 # Register provider
@@ -0,0 +1,97 @@
+"""
+Authenticated storage-state cache.
+
+After a successful login the browser context's cookies and localStorage are
+saved per environment, provider and user, together with the auth token.
+Later scenarios restore them into their own context instead of repeating the
+interactive login. Entries are evicted shortly before the token's JWT `exp`
+claim.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict
+from typing import Optional, Dict, Any
+
+
+DEFAULT_CACHE_DIR = ".auth-cache"
+
+# Tokens without an exp claim are trusted for this long
+DEFAULT_TTL_SECONDS = 3600
+
+# Evict this long before expiry so a scenario never starts with a dying token
+EXPIRY_MARGIN_SECONDS = 120
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """Read the `exp` claim of a JWT without verifying its signature"""
+    parts = token.split(".") if token else []
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class StorageStateCache:
+    """Per-provider, per-user cache of authenticated browser storage state"""
+
+    def __init__(self, cache_dir: Optional[str] = None, scope: str = ""):
+        self.cache_dir = cache_dir or os.getenv("AUTH_CACHE_DIR", DEFAULT_CACHE_DIR)
+        # Environment and API the sessions belong to; a dev token is no use against test
+        self.scope = scope
+        self.enabled = os.getenv("AUTH_CACHE", "true").lower() == "true"
+        self.ttl = int(os.getenv("AUTH_CACHE_TTL", str(DEFAULT_TTL_SECONDS)))
+
+    def _path(self, provider: str, user: str) -> str:
+        digest = hashlib.sha256(f"{self.scope}\n{user.lower()}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{provider}-{digest}.json")
+
+    def load(self, provider: str, user: str) -> Optional[Dict[str, Any]]:
+        """Return a non-expired entry, evicting it if it is about to expire"""
+        if not self.enabled:
+            return None
+        path = self._path(provider, user)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if entry.get("expires_at", 0) - EXPIRY_MARGIN_SECONDS <= time.time():
+            self.evict(provider, user)
+            return None
+        return entry
+
+    def save(self, provider: str, user: str, token: str, auth_user: Any,
+             storage_state: Dict[str, Any]):
+        """Store the storage state and token of a successful login"""
+        if not self.enabled or not token:
+            return
+        expires_at = token_expiry(token) or time.time() + self.ttl
+        entry = {
+            "provider": provider,
+            "token": token,
+            "user": asdict(auth_user) if auth_user else None,
+            "storage_state": storage_state,
+            "saved_at": time.time(),
+            "expires_at": expires_at,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(provider, user)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def evict(self, provider: str, user: str):
+        try:
+            os.remove(self._path(provider, user))
+        except FileNotFoundError:
+            pass
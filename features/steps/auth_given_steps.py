@@ -42,9 +42,9 @@ def step_not_authenticated(context):
 
 @given("I have logged in with SSO")
 def step_logged_in_with_sso(context):
-    """Login with Azure AD SSO"""
+    """Login with Azure AD SSO, reusing a cached session when one is valid"""
     provider = AuthManager.get_provider("aad", context)
-    result = provider.login()
+    result = provider.login_cached()
     assert result.success, f"SSO login failed: {result.error}"
     context.auth_token = result.token
     context.auth_user = result.user
@@ -52,9 +52,9 @@ def step_logged_in_with_sso(context):
 
 @given('I have logged in with "{provider_name}"')
 def step_logged_in_with_provider(context, provider_name):
-    """Login with specified provider"""
+    """Login with specified provider, reusing a cached session when one is valid"""
     provider = AuthManager.get_provider(provider_name, context)
-    result = provider.login()
+    result = provider.login_cached()
     assert result.success, f"Login failed: {result.error}"
     context.auth_token = result.token
     context.auth_user = result.user
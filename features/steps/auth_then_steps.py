@@ -134,7 +134,7 @@ def step_see_profile(context):
 @then("I should see my email address")
 def step_see_email(context):
     """Verify email visible or profile loaded successfully"""
-    content = context.page.content().lower()
+    content = context.page_content.lower_html()
     provider = AuthManager.get_provider("aad", context)
     email = provider.get_credentials()["email"].lower()
     # Check for email, email input field, or profile-related content
@@ -147,8 +147,7 @@ def step_see_email(context):
 @then("I should see my display name")
 def step_see_name(context):
     """Verify name visible"""
-    content = context.page.content()
-    assert "name" in content.lower() or "/profile" in context.page.url
+    assert context.page_content.html_contains("name") or "/profile" in context.page.url
 
 
 @then("I should see the servers list")
@@ -184,7 +183,7 @@ def step_see_status(context):
     """Verify status visible"""
     if not getattr(context, 'has_servers', False):
         return
-    content = context.page.content()
+    content = context.page_content.html()
     statuses = ["Running", "Stopped", "Status", "Online", "Offline"]
     assert any(s in content for s in statuses) or "/servers/" in context.page.url
 
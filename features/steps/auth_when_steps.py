@@ -9,6 +9,7 @@ from behave import when
 # Add steps directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 from auth import AuthManager
+from browser import PageWaiter
 
 
 @when('I request "{endpoint}" without authentication')
@@ -68,50 +69,16 @@ def step_click_sso_button(context):
 def step_enter_sso_credentials(context):
     """Enter Azure AD credentials"""
     provider = AuthManager.get_provider("aad", context)
-    creds = provider.get_credentials()
-    
-    context.page.wait_for_selector('input[type="email"]', timeout=15000)
-    context.page.fill('input[type="email"]', creds["email"])
-    context.page.click('input[type="submit"]')
-    
-    time.sleep(2)
-    context.page.wait_for_selector('input[type="password"]', timeout=15000)
-    context.page.fill('input[type="password"]', creds["password"])
-    context.page.click('input[type="submit"]')
+    provider.enter_credentials()
 
 
 @when("I complete the Azure AD login flow")
 def step_complete_sso_flow(context):
     """Handle post-login prompts and wait for redirect"""
-    time.sleep(3)
-    
-    # Stay signed in prompt
-    try:
-        stay_signed_in = context.page.locator('text="Stay signed in?"')
-        if stay_signed_in.is_visible(timeout=5000):
-            no_button = context.page.locator('input[value="No"]')
-            if no_button.is_visible():
-                no_button.click()
-            else:
-                # Try alternative "No" button
-                context.page.locator('#idBtn_Back').click()
-    except:
-        pass
-    
-    # Consent prompt
-    try:
-        accept_button = context.page.locator('input[value="Accept"]')
-        if accept_button.is_visible(timeout=3000):
-            accept_button.click()
-    except:
-        pass
-    
-    # Wait for redirect away from Azure AD
-    for _ in range(20):
-        time.sleep(1)
-        current_url = context.page.url
-        if "login.microsoftonline.com" not in current_url:
-            break
+    provider = AuthManager.get_provider("aad", context)
+    with PageWaiter(context.page) as waiter:
+        provider.complete_post_login(waiter, timeout_ms=20000)
+    print(f"⏱️  SSO prompts: {waiter.report()}")
     
     context.final_url = context.page.url
 
@@ -0,0 +1,23 @@
+"""Browser package - shared Playwright driver, per-scenario contexts and page helpers"""
+import os
+import sys
+
+# Ensure this directory is in path
+_dir = os.path.dirname(__file__)
+if _dir not in sys.path:
+    sys.path.insert(0, _dir)
+
+from browser_session import BrowserSession
+from event_capture import EventCapture
+from lazy_page import LazyPage
+from page_content import PageContentCache
+from page_snapshot import PageSnapshot, SnapshotCache
+from page_waiter import PageWaiter
+from response_store import ResponseStore, StoredResponse
+from soft_checks import SoftChecks, SoftFailure
+from storage_seed import SEED_PROFILES, SeedProfile, StorageSeeder
+from web_vitals import WebVitals
+
+__all__ = ["BrowserSession", "EventCapture", "LazyPage", "PageContentCache", "PageSnapshot", "PageWaiter", "ResponseStore",
+           "SnapshotCache", "SoftChecks", "SoftFailure", "StoredResponse", "SEED_PROFILES", "SeedProfile",
+           "StorageSeeder", "WebVitals"]
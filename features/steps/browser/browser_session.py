@@ -0,0 +1,156 @@
+"""
+Shared Playwright driver and browser for a test worker.
+
+The driver and browser are started once per worker, on the first page request;
+every scenario gets its own BrowserContext (cookies, storage and cache are
+isolated per context).
+If the browser process dies, it is relaunched on the next context request.
+"""
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from playwright.sync_api import sync_playwright, Error as PlaywrightError
+
+
+DEFAULT_VIEWPORT = {"width": 1920, "height": 1080}
+
+
+class BrowserSession:
+    """One Playwright driver and browser, shared by all scenarios of a worker"""
+
+    # Process-wide sessions, reused across Behave runs inside a parallel worker
+    _shared: Dict[Tuple[str, bool, int], "BrowserSession"] = {}
+
+    @classmethod
+    def shared(cls, browser_type: str = "chromium", headless: bool = True, slow_mo: int = 0) -> "BrowserSession":
+        """Return the session for these settings, creating it on first use"""
+        key = (browser_type, headless, slow_mo)
+        if key not in cls._shared:
+            cls._shared[key] = cls(browser_type=browser_type, headless=headless, slow_mo=slow_mo)
+        return cls._shared[key]
+
+    @classmethod
+    def close_shared(cls):
+        """Report on and close every process-wide session"""
+        for session in cls._shared.values():
+            session.print_summary()
+            session.close()
+        cls._shared.clear()
+
+    def __init__(self, browser_type: str = "chromium", headless: bool = True,
+                 slow_mo: int = 0, viewport: Optional[Dict[str, int]] = None):
+        self.browser_type = browser_type
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.viewport = viewport or DEFAULT_VIEWPORT
+        self.playwright = None
+        self.browser = None
+        self.launch_seconds = 0.0
+        self.relaunches = 0
+        self.setup_timings: List[float] = []
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self) -> "BrowserSession":
+        """Start the Playwright driver and launch the browser"""
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        self._launch()
+        return self
+
+    def close(self):
+        """Close the browser and stop the driver"""
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except PlaywrightError:
+                pass
+            self.browser = None
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    def ensure_browser(self):
+        """Relaunch the browser if it has crashed or been disconnected"""
+        if self.playwright is None:
+            self.start()
+        elif not self.is_connected:
+            self.relaunches += 1
+            print(f"⚠️  Browser disconnected - relaunching {self.browser_type} (#{self.relaunches})")
+            self._launch()
+
+    def _launch(self):
+        """Launch the configured browser engine"""
+        started = time.perf_counter()
+        if self.browser_type == "firefox":
+            engine = self.playwright.firefox
+        elif self.browser_type == "webkit":
+            engine = self.playwright.webkit
+        else:
+            engine = self.playwright.chromium
+        self.browser = engine.launch(headless=self.headless, slow_mo=self.slow_mo)
+        self.launch_seconds += time.perf_counter() - started
+
+    # ==================== CONTEXTS ====================
+
+    def new_context(self, **options: Any):
+        """Create an isolated BrowserContext, relaunching the browser once on failure"""
+        options.setdefault("viewport", self.viewport)
+        self.ensure_browser()
+        try:
+            return self.browser.new_context(**options)
+        except PlaywrightError:
+            if self.is_connected:
+                raise
+            self.ensure_browser()
+            return self.browser.new_context(**options)
+
+    def new_page(self, **options: Any) -> Tuple[Any, Any]:
+        """Create a context and a page in it, recording the setup cost"""
+        started = time.perf_counter()
+        browser_context = self.new_context(**options)
+        page = browser_context.new_page()
+        self.setup_timings.append(time.perf_counter() - started)
+        return browser_context, page
+
+    @staticmethod
+    def close_context(browser_context):
+        """Close a scenario context, ignoring errors from a dead browser"""
+        if browser_context is None:
+            return
+        try:
+            browser_context.close()
+        except PlaywrightError:
+            pass
+
+    # ==================== REPORTING ====================
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-scenario setup cost and launch statistics"""
+        timings = sorted(self.setup_timings)
+        count = len(timings)
+        return {
+            "browser": self.browser_type,
+            "scenarios": count,
+            "launch_ms": round(self.launch_seconds * 1000, 1),
+            "relaunches": self.relaunches,
+            "setup_mean_ms": round(sum(timings) / count * 1000, 1) if count else 0.0,
+            "setup_p95_ms": round(timings[min(count - 1, int(count * 0.95))] * 1000, 1) if count else 0.0,
+            "setup_max_ms": round(timings[-1] * 1000, 1) if count else 0.0,
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        if not s["scenarios"]:
+            print(f"🧭 Browser setup ({s['browser']}): not started - no scenario used the browser")
+            return
+        print(
+            f"🧭 Browser setup ({s['browser']}): launch {s['launch_ms']} ms, "
+            f"{s['scenarios']} contexts, mean {s['setup_mean_ms']} ms, "
+            f"p95 {s['setup_p95_ms']} ms, max {s['setup_max_ms']} ms, "
+            f"relaunches {s['relaunches']}"
+        )
@@ -0,0 +1,108 @@
+"""
+Bounded capture of a page's console and network events.
+
+Every console message, page error, matching response and failed request is
+counted; the ones that pass the level and URL filters are kept in ring
+buffers, so a long session holds at most the last few hundred events and
+nothing is printed while the page runs. The buffers are written to an NDJSON
+artifact only when the scenario fails.
+"""
+import json
+import os
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from playwright.sync_api import ConsoleMessage, Request, Response
+
+from response_store import api_response
+
+
+DEFAULT_BUFFER_SIZE = 200
+DEFAULT_CONSOLE_LEVELS = ("error", "warning")
+DEFAULT_ARTIFACT_DIR = os.path.join("reports", "events")
+
+
+class EventCapture:
+    """Console and network events of a scenario's page, filtered and bounded"""
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 console_levels: Optional[Iterable[str]] = None,
+                 url_filter: Callable[[Any], bool] = api_response):
+        if console_levels is None:
+            console_levels = os.getenv("CAPTURE_CONSOLE_LEVELS", ",".join(DEFAULT_CONSOLE_LEVELS)).split(",")
+        self.console_levels = {level.strip() for level in console_levels if level.strip()}
+        self.url_filter = url_filter
+        self.console: deque = deque(maxlen=buffer_size)
+        self.network: deque = deque(maxlen=buffer_size)
+        self.counts: Counter = Counter()
+
+    def attach(self, page) -> "EventCapture":
+        page.on("console", self._on_console)
+        page.on("pageerror", self._on_page_error)
+        page.on("response", self._on_response)
+        page.on("requestfailed", self._on_request_failed)
+        return self
+
+    # ==================== LISTENERS ====================
+
+    def _on_console(self, message: ConsoleMessage):
+        self.counts[f"console.{message.type}"] += 1
+        if message.type in self.console_levels:
+            location = message.location or {}
+            self.console.append({"time": time.time(), "kind": "console", "level": message.type,
+                                 "text": message.text, "url": location.get("url")})
+
+    def _on_page_error(self, error):
+        self.counts["pageerror"] += 1
+        self.console.append({"time": time.time(), "kind": "pageerror", "level": "error", "text": str(error)})
+
+    def _on_response(self, response: Response):
+        status_class = f"{response.status // 100}xx"
+        self.counts[f"response.{status_class}"] += 1
+        if self.url_filter(response):
+            self.network.append({"time": time.time(), "kind": "response", "method": response.request.method,
+                                 "url": response.url, "status": response.status})
+
+    def _on_request_failed(self, request: Request):
+        self.counts["requestfailed"] += 1
+        if self.url_filter(request):
+            self.network.append({"time": time.time(), "kind": "requestfailed", "method": request.method,
+                                 "url": request.url, "failure": request.failure})
+
+    # ==================== QUERIES ====================
+
+    def errors(self) -> List[Dict[str, Any]]:
+        """Console errors and uncaught page errors still in the buffer"""
+        return [event for event in self.console if event["level"] == "error"]
+
+    @property
+    def error_count(self) -> int:
+        """Console errors and page errors seen, including ones the buffer dropped"""
+        return self.counts["console.error"] + self.counts["pageerror"]
+
+    def calls(self, endpoint: str = "") -> List[Dict[str, Any]]:
+        """Captured responses and failed requests whose URL contains the endpoint"""
+        return [event for event in self.network if endpoint in event["url"]]
+
+    def failed_calls(self) -> List[Dict[str, Any]]:
+        return [event for event in self.network
+                if event["kind"] == "requestfailed" or event["status"] >= 400]
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {count}" for name, count in sorted(self.counts.items())) or "no events"
+
+    # ==================== ARTIFACT ====================
+
+    def flush(self, name: str, directory: str = DEFAULT_ARTIFACT_DIR) -> Optional[str]:
+        """Write the buffered events, oldest first, as NDJSON; None if there are none"""
+        events = sorted([*self.console, *self.network], key=lambda event: event["time"])
+        if not events:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name.replace(' ', '_').replace('/', '_')}.ndjson")
+        with open(path, "w") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.write(json.dumps({"kind": "counts", **self.counts}) + "\n")
+        return path
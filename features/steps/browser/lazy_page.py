@@ -0,0 +1,66 @@
+"""
+Lazy stand-in for context.page.
+
+API-only scenarios never touch the browser, so the real context and page are
+only opened when a step first uses context.page.
+"""
+from typing import Callable, Optional, Tuple, Any
+
+from playwright.sync_api import Page
+
+
+_OWN_ATTRIBUTES = {"_opener", "_blocked_reason", "_page", "_browser_context"}
+
+
+class LazyPage:
+    """Placeholder for context.page that opens the real page on first use"""
+
+    def __init__(self, opener: Callable[[], Tuple[Any, Page]], blocked_reason: Optional[str] = None):
+        self._opener = opener
+        self._blocked_reason = blocked_reason
+        self._page = None
+        self._browser_context = None
+
+    @property
+    def __class__(self):
+        # Lets playwright's expect(context.page) treat the proxy as a Page
+        return Page
+
+    @property
+    def is_open(self) -> bool:
+        return self._page is not None
+
+    @property
+    def is_blocked(self) -> bool:
+        """True for scenarios that opted out of the browser"""
+        return self._blocked_reason is not None
+
+    @property
+    def browser_context(self):
+        return self._browser_context
+
+    def resolve(self) -> Page:
+        """Open the real context and page if needed and return the page"""
+        if self._page is None:
+            if self._blocked_reason:
+                raise RuntimeError(f"Browser used by a scenario that opted out of it: {self._blocked_reason}")
+            self._browser_context, self._page = self._opener()
+        return self._page
+
+    def reset(self):
+        """Forget the open context and page, returning the context for the caller to close
+
+        The next use of the page opens a fresh context.
+        """
+        browser_context = self._browser_context
+        self._browser_context, self._page = None, None
+        return browser_context
+
+    def __getattr__(self, name: str):
+        if name in _OWN_ATTRIBUTES:
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        state = "open" if self.is_open else "not opened"
+        return f"<LazyPage {state}>"
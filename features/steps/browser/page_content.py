@@ -0,0 +1,102 @@
+"""
+Per-document cache of the page's text and HTML for content assertions.
+
+text_content('body') and content() serialise the whole DOM across the
+driver on every call, and content checks tend to make several in a row. The
+cache keeps the last result until the page changes: each lookup first asks
+the page for its document and a mutation counter (kept by a MutationObserver
+the cache installs), which is one small round trip, and only re-reads the
+DOM when either has moved. Action steps drop the cache outright. Lowercased
+forms are kept alongside, and substring checks are memoised per version.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+
+# Structure/text mutations invalidate the text; any mutation invalidates the HTML
+VERSION_SCRIPT = """() => {
+    if (window.__contentVersion === undefined) {
+        window.__contentVersion = {text: 0, html: 0};
+        new MutationObserver(mutations => {
+            window.__contentVersion.html++;
+            if (mutations.some(m => m.type !== 'attributes')) window.__contentVersion.text++;
+        }).observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+    }
+    return [performance.timeOrigin, location.href,
+            window.__contentVersion.text, window.__contentVersion.html];
+}"""
+
+
+class _Entry:
+    """One cached form of the page and the substring checks made against it"""
+
+    def __init__(self, version: Tuple[Any, ...], value: str):
+        self.version = version
+        self.value = value
+        self.lower = value.lower()
+        self.checks: Dict[str, bool] = {}
+
+    def contains(self, needle: str) -> bool:
+        needle = needle.lower()
+        if needle not in self.checks:
+            self.checks[needle] = needle in self.lower
+        return self.checks[needle]
+
+
+class PageContentCache:
+    """Body text and HTML of the current document, re-read only after it changes"""
+
+    def __init__(self, page):
+        self.page = page
+        self._text: Optional[_Entry] = None
+        self._html: Optional[_Entry] = None
+        self.reads = 0
+        self.hits = 0
+
+    def invalidate(self):
+        """Forget everything, e.g. before an action step"""
+        self._text = None
+        self._html = None
+
+    def _versions(self) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+        time_origin, url, text_version, html_version = self.page.evaluate(VERSION_SCRIPT)
+        return (time_origin, url, text_version), (time_origin, url, html_version)
+
+    def _text_entry(self) -> _Entry:
+        version, _ = self._versions()
+        if self._text is None or self._text.version != version:
+            self.reads += 1
+            self._text = _Entry(version, self.page.text_content("body") or "")
+        else:
+            self.hits += 1
+        return self._text
+
+    def _html_entry(self) -> _Entry:
+        _, version = self._versions()
+        if self._html is None or self._html.version != version:
+            self.reads += 1
+            self._html = _Entry(version, self.page.content())
+        else:
+            self.hits += 1
+        return self._html
+
+    # ==================== LOOKUPS ====================
+
+    def text(self) -> str:
+        return self._text_entry().value
+
+    def lower_text(self) -> str:
+        return self._text_entry().lower
+
+    def html(self) -> str:
+        return self._html_entry().value
+
+    def lower_html(self) -> str:
+        return self._html_entry().lower
+
+    def text_contains(self, needle: str) -> bool:
+        """Case-insensitive substring check against the body text"""
+        return self._text_entry().contains(needle)
+
+    def html_contains(self, needle: str) -> bool:
+        """Case-insensitive substring check against the HTML"""
+        return self._html_entry().contains(needle)
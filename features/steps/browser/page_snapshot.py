@@ -0,0 +1,116 @@
+"""
+Shared read-only page snapshots.
+
+Scenarios tagged @read-only only look at a page, so they do not need a page
+of their own: the first one to visit a URL loads it once in a throwaway
+context and captures the rendered DOM, its visible text and the accessibility
+tree; every later visit of that URL at that viewport, in the same worker,
+reads the same snapshot. Text checks run against the snapshot; a step that
+needs the live page still gets one, opened on the snapshot's URL.
+"""
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from browser_session import BrowserSession, DEFAULT_VIEWPORT
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Milliseconds to wait for the network to settle before capturing; a page
+# that keeps polling is captured once this runs out
+SETTLE_TIMEOUT_MS = 5000
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-collapsed, case-folded text, as get_by_text() compares it"""
+    return _WHITESPACE.sub(" ", text or "").strip().casefold()
+
+
+@dataclass
+class PageSnapshot:
+    """Rendered state of one URL at one viewport"""
+    url: str
+    viewport: Tuple[int, int]
+    html: str
+    text: str
+    aria: str
+    capture_ms: float
+
+    def __post_init__(self):
+        self._text = normalize_text(self.text)
+        self._aria = normalize_text(self.aria)
+
+    def has_text(self, text: str) -> bool:
+        """Substring match against the visible text, then the accessible names"""
+        needle = normalize_text(text)
+        return needle in self._text or needle in self._aria
+
+
+class SnapshotCache:
+    """Snapshots of the worker, keyed by URL and viewport"""
+
+    # Process-wide cache, reused across Behave runs inside a parallel worker
+    _shared: Optional["SnapshotCache"] = None
+
+    @classmethod
+    def shared(cls) -> "SnapshotCache":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def close_shared(cls):
+        if cls._shared is not None:
+            cls._shared.print_summary()
+        cls._shared = None
+
+    def __init__(self):
+        self.snapshots: Dict[Tuple[str, Tuple[int, int]], PageSnapshot] = {}
+        self.hits = 0
+
+    def get(self, session: BrowserSession, url: str,
+            viewport: Optional[Dict[str, int]] = None) -> PageSnapshot:
+        """The snapshot of a URL at a viewport, loading the page on first use"""
+        size = viewport or session.viewport or DEFAULT_VIEWPORT
+        key = (url, (size["width"], size["height"]))
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+        snapshot = self.snapshots[key] = self.capture(session, url, size)
+        return snapshot
+
+    @staticmethod
+    def capture(session: BrowserSession, url: str, viewport: Dict[str, int]) -> PageSnapshot:
+        started = time.perf_counter()
+        browser_context, page = session.new_page(viewport=viewport)
+        try:
+            page.goto(url)
+            try:
+                page.wait_for_load_state("networkidle", timeout=SETTLE_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                pass  # Still polling: capture what has rendered
+            body = page.locator("body")
+            snapshot = PageSnapshot(
+                url=url,
+                viewport=(viewport["width"], viewport["height"]),
+                html=page.content(),
+                text=body.inner_text(),
+                aria=body.aria_snapshot(),
+                capture_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+        finally:
+            session.close_context(browser_context)
+        return snapshot
+
+    def print_summary(self):
+        if not self.snapshots:
+            return
+        loads = len(self.snapshots)
+        load_ms = sum(snapshot.capture_ms for snapshot in self.snapshots.values())
+        print(f"📸 Read-only snapshots: {loads} page loads ({load_ms / 1000:.1f}s) "
+              f"served {loads + self.hits} visits")
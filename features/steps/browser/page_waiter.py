@@ -0,0 +1,122 @@
+"""
+Event-driven waits for multi-hop browser flows (SSO redirects, prompts).
+
+Each wait returns as soon as its condition holds instead of sleeping for a
+fixed worst case, and the time spent on every hop is recorded so a flow can
+report where its latency goes.
+"""
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from playwright.sync_api import Page, Response, TimeoutError as PlaywrightTimeoutError
+
+
+DEFAULT_TIMEOUT_MS = 15000
+
+# Playwright's sync API cannot race a locator wait against a navigation, so
+# prompt waits are sliced and the navigation flag checked between slices.
+PROMPT_SLICE_MS = 100
+
+# Responses kept for late waiters; a login flow makes far fewer than this
+MAX_RECORDED_RESPONSES = 200
+
+
+class PageWaiter:
+    """Waits on URL, prompt and response events of a page, timing each hop"""
+
+    def __init__(self, page: Page, timeout_ms: int = DEFAULT_TIMEOUT_MS):
+        self.page = page
+        self.timeout_ms = timeout_ms
+        self.hops: List[Tuple[str, float]] = []
+        self._responses: List[Response] = []
+        self._last_hop = time.perf_counter()
+
+    def __enter__(self) -> "PageWaiter":
+        self.page.on("response", self._on_response)
+        self._last_hop = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.page.remove_listener("response", self._on_response)
+
+    def _on_response(self, response: Response):
+        self._responses.append(response)
+        if len(self._responses) > MAX_RECORDED_RESPONSES:
+            del self._responses[0]
+
+    def hop(self, name: str):
+        """Close the current hop: time since the previous hop ended"""
+        now = time.perf_counter()
+        self.hops.append((name, (now - self._last_hop) * 1000))
+        self._last_hop = now
+
+    # ==================== WAITS ====================
+
+    def until_url(self, predicate: Callable[[str], bool], name: str,
+                  timeout_ms: Optional[int] = None) -> Optional[str]:
+        """Wait until the page URL satisfies the predicate; None on timeout"""
+        if not predicate(self.page.url):
+            try:
+                self.page.wait_for_url(predicate, wait_until="commit", timeout=timeout_ms or self.timeout_ms)
+            except PlaywrightTimeoutError:
+                self.hop(f"{name} (timeout)")
+                return None
+        self.hop(name)
+        return self.page.url
+
+    def first_of(self, prompts: Dict[str, str], name: str,
+                 until_url: Optional[Callable[[str], bool]] = None,
+                 timeout_ms: Optional[int] = None) -> Optional[str]:
+        """
+        Wait for the first of several prompts to become visible.
+
+        Returns the key of the visible prompt, "url" if until_url matched
+        first (the flow moved on without prompting), or None on timeout.
+        """
+        combined = None
+        for selector in prompts.values():
+            locator = self.page.locator(selector)
+            combined = locator if combined is None else combined.or_(locator)
+
+        deadline = time.perf_counter() + (timeout_ms or self.timeout_ms) / 1000
+        while True:
+            if until_url and until_url(self.page.url):
+                self.hop(f"{name}: url")
+                return "url"
+            for key, selector in prompts.items():
+                if self.page.locator(selector).first.is_visible():
+                    self.hop(f"{name}: {key}")
+                    return key
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if remaining_ms <= 0:
+                self.hop(f"{name} (timeout)")
+                return None
+            try:
+                combined.first.wait_for(state="visible", timeout=min(remaining_ms, PROMPT_SLICE_MS))
+            except PlaywrightTimeoutError:
+                pass
+
+    def response(self, predicate: Callable[[Response], bool], name: str,
+                 timeout_ms: Optional[int] = None) -> Optional[Response]:
+        """Wait for a response matching the predicate, including ones already seen"""
+        for response in self._responses:
+            if predicate(response):
+                self.hop(name)
+                return response
+        try:
+            response = self.page.wait_for_event("response", predicate, timeout=timeout_ms or self.timeout_ms)
+        except PlaywrightTimeoutError:
+            self.hop(f"{name} (timeout)")
+            return None
+        self.hop(name)
+        return response
+
+    # ==================== REPORTING ====================
+
+    @property
+    def total_ms(self) -> float:
+        return sum(ms for _, ms in self.hops)
+
+    def report(self) -> str:
+        hops = " → ".join(f"{name} {ms:.0f}ms" for name, ms in self.hops)
+        return f"{hops} (total {self.total_ms:.0f}ms)"
@@ -0,0 +1,119 @@
+"""
+Bounded store of intercepted API responses.
+
+Listens to a page's responses and keeps the JSON bodies of the ones whose URL
+matches, indexed by endpoint path, so steps can assert on the data the app
+actually received instead of scraping it back out of the DOM. The store is
+an LRU over paths (the most recent response per path is kept) and bodies over
+a size cap are recorded without their content.
+"""
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Error as PlaywrightError, Request, Response
+
+
+DEFAULT_MAX_PATHS = 100
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+
+# Keys that wrap the list of records in paged or enveloped responses
+LIST_KEYS = ("items", "data", "value", "results", "servers", "subscriptions", "users", "customers")
+
+
+def api_response(response: Union[Request, Response]) -> bool:
+    """Calls to the Functions APIs, as the admin portal makes them"""
+    return "azurewebsites.net" in response.url or "/api/" in response.url
+
+
+@dataclass
+class StoredResponse:
+    """The latest response of one endpoint path"""
+    method: str
+    url: str
+    path: str
+    status: int
+    size: int
+    body: Any = None
+    truncated: bool = False
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """The records of a list response, unwrapping a common envelope"""
+        body = self.body
+        if isinstance(body, dict):
+            body = next((body[key] for key in LIST_KEYS if isinstance(body.get(key), list)), None)
+        if not isinstance(body, list):
+            return []
+        return [record for record in body if isinstance(record, dict)]
+
+
+class ResponseStore:
+    """JSON bodies of matching responses, by path, least recently seen evicted first"""
+
+    def __init__(self, match: Callable[[Response], bool] = api_response,
+                 max_paths: int = DEFAULT_MAX_PATHS, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES):
+        self.match = match
+        self.max_paths = max_paths
+        self.max_body_bytes = max_body_bytes
+        self.responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self.evicted = 0
+
+    def attach(self, page) -> "ResponseStore":
+        page.on("response", self.record)
+        return self
+
+    def record(self, response: Response):
+        if not self.match(response):
+            return
+        path = urlsplit(response.url).path
+        stored = StoredResponse(response.request.method, response.url, path, response.status, 0)
+        headers = response.headers
+        declared = int(headers.get("content-length") or 0)
+        if declared > self.max_body_bytes:
+            stored.size, stored.truncated = declared, True
+        elif "json" in (headers.get("content-type") or ""):
+            try:
+                body = response.body()
+            except PlaywrightError:
+                body = b""  # Redirect or body already discarded
+            stored.size = len(body)
+            if stored.size > self.max_body_bytes:
+                stored.truncated = True
+            elif body:
+                try:
+                    stored.body = json.loads(body)
+                except ValueError:
+                    pass
+        self.responses[path] = stored
+        self.responses.move_to_end(path)
+        while len(self.responses) > self.max_paths:
+            self.responses.popitem(last=False)
+            self.evicted += 1
+
+    # ==================== QUERIES ====================
+
+    def find(self, endpoint: str) -> Optional[StoredResponse]:
+        """Most recent response whose path contains the endpoint"""
+        for path in reversed(self.responses):
+            if endpoint in path:
+                return self.responses[path]
+        return None
+
+    def records(self, endpoint: str) -> List[Dict[str, Any]]:
+        """Records of the most recent list response of an endpoint"""
+        stored = self.find(endpoint)
+        if stored is None:
+            raise AssertionError(f"No response from {endpoint} captured "
+                                 f"(captured: {', '.join(self.responses) or 'none'})")
+        if stored.truncated:
+            raise AssertionError(f"Response from {stored.path} was {stored.size} bytes, "
+                                 f"over the {self.max_body_bytes} byte capture limit")
+        return stored.records
+
+    def count_where(self, endpoint: str, field: str, value: str) -> int:
+        """Records of an endpoint whose field equals the value (case-insensitive)"""
+        return sum(1 for record in self.records(endpoint)
+                   if str(record.get(field, "")).lower() == value.lower())
@@ -0,0 +1,88 @@
+"""
+Soft checks: optional UI expectations that warn instead of failing.
+
+A soft check waits for its condition like expect() does, but a failure is
+recorded as a warning on the scenario rather than raised. All soft checks of
+a scenario share one wait budget: each check may wait only for what is left
+of it, so a page missing several optional elements costs the budget once
+instead of a full timeout per element. Once the budget is spent, checks still
+look at the page but no longer wait.
+"""
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.sync_api import Locator, expect
+
+
+DEFAULT_BUDGET_MS = 5000
+DEFAULT_CHECK_TIMEOUT_MS = 5000
+
+
+@dataclass
+class SoftFailure:
+    """One soft check that did not hold"""
+    check: str
+    step: str
+    reason: str
+    waited_ms: float
+
+
+class SoftChecks:
+    """Non-fatal checks of one scenario, sharing a shrinking wait budget"""
+
+    def __init__(self, budget_ms: Optional[int] = None):
+        self.budget_ms = budget_ms if budget_ms is not None else int(
+            os.getenv("SOFT_CHECK_BUDGET_MS", DEFAULT_BUDGET_MS))
+        self.spent_ms = 0.0
+        self.step = ""
+        self.failures: List[SoftFailure] = []
+        self._reported = 0
+
+    @property
+    def remaining_ms(self) -> float:
+        return max(0.0, self.budget_ms - self.spent_ms)
+
+    def begin_step(self, name: str):
+        self.step = name
+
+    # ==================== CHECKS ====================
+
+    def check(self, description: str, assertion: Callable[[int], Any],
+              timeout_ms: int = DEFAULT_CHECK_TIMEOUT_MS) -> bool:
+        """Run an assertion that takes a timeout in ms; record a warning if it fails"""
+        # Playwright treats 0 as "no timeout"; 1 ms still checks once
+        timeout = max(1, int(min(timeout_ms, self.remaining_ms)))
+        started = time.perf_counter()
+        try:
+            assertion(timeout)
+            return True
+        except AssertionError as e:
+            reason = str(e).splitlines()[0] if str(e) else "assertion failed"
+            if timeout < timeout_ms:
+                reason += f" (waited {timeout} of {timeout_ms} ms, limited by the soft check budget)"
+            waited = (time.perf_counter() - started) * 1000
+            self.failures.append(SoftFailure(description, self.step, reason, round(waited, 1)))
+            print(f"  ⚠️  Soft check failed: {description} - {reason}")
+            return False
+        finally:
+            self.spent_ms += (time.perf_counter() - started) * 1000
+
+    def visible(self, locator: Locator, description: str,
+                timeout_ms: int = DEFAULT_CHECK_TIMEOUT_MS) -> bool:
+        """Soft expect(locator).to_be_visible()"""
+        return self.check(f"{description} is visible",
+                          lambda timeout: expect(locator).to_be_visible(timeout=timeout), timeout_ms)
+
+    # ==================== REPORTING ====================
+
+    def new_failures(self) -> List[Dict[str, Any]]:
+        """Failures recorded since the last call, for the step's report entry"""
+        failures = self.failures[self._reported:]
+        self._reported = len(self.failures)
+        return [asdict(failure) for failure in failures]
+
+    def summary(self) -> str:
+        return (f"{len(self.failures)} soft checks failed, "
+                f"{self.spent_ms / 1000:.1f}s of {self.budget_ms / 1000:g}s budget spent")
@@ -0,0 +1,97 @@
+"""
+Seeded browser state for scenarios that start logged in.
+
+Named profiles describe the localStorage, sessionStorage and cookies a
+scenario starts with (a role's session, servers the user already has). The
+StorageSeeder applies them to the browser context before the first navigation,
+as cookies and an init script, so the app renders the seeded state on its
+first load instead of being loaded once to write storage and again to read it.
+"""
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Union
+from urllib.parse import urlsplit
+
+
+def mock_token() -> str:
+    return f"mock_token_{int(time.time() * 1000)}"
+
+
+# Values may be callables, evaluated when the profile is applied
+StorageValue = Union[Any, Callable[[], Any]]
+
+
+@dataclass
+class SeedProfile:
+    """Storage and cookies a scenario starts with"""
+    local_storage: Dict[str, StorageValue] = field(default_factory=dict)
+    session_storage: Dict[str, StorageValue] = field(default_factory=dict)
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _user(email: str, username: str, role: str) -> SeedProfile:
+    return SeedProfile(local_storage={
+        "auth_token": mock_token,
+        "user": {"email": email, "username": username, "role": role},
+    })
+
+
+SEED_PROFILES: Dict[str, SeedProfile] = {
+    "user": _user("test@realmgrid.com", "TestUser", "user"),
+    "admin": _user("admin@realmgrid.com", "AdminUser", "admin"),
+    "team-owner": _user("owner@realmgrid.com", "TeamOwner", "user"),
+    "has-servers": SeedProfile(local_storage={"servers": [{
+        "id": "1",
+        "name": "My Minecraft Server",
+        "game": "Minecraft",
+        "status": "online",
+        "ram": 4,
+        "slots": 20,
+    }]}),
+    "no-servers": SeedProfile(local_storage={"servers": []}),
+}
+
+
+def _storage_items(values: Dict[str, StorageValue]) -> List[List[str]]:
+    items = []
+    for key, value in values.items():
+        value = value() if callable(value) else value
+        items.append([key, value if isinstance(value, str) else json.dumps(value)])
+    return items
+
+
+class StorageSeeder:
+    """Applies seed profiles to the browser context of a page, for one origin"""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url or "")
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+
+    def script(self, name: str, profile: SeedProfile) -> str:
+        """Init script writing the profile's storage once per tab, on the seeded origin only"""
+        # The marker keeps later navigations from undoing a logout or other storage changes
+        marker = json.dumps(f"__seed:{name}")
+        return (
+            f"if (location.origin === {json.dumps(self.origin)} && !sessionStorage.getItem({marker})) {{"
+            f" for (const [k, v] of {json.dumps(_storage_items(profile.local_storage))}) localStorage.setItem(k, v);"
+            f" for (const [k, v] of {json.dumps(_storage_items(profile.session_storage))}) sessionStorage.setItem(k, v);"
+            f" sessionStorage.setItem({marker}, '1'); }}"
+        )
+
+    def apply(self, page, *names: str):
+        """Seed the page's context before its next navigation (and the current document if on the origin)"""
+        for name in names:
+            if name not in SEED_PROFILES:
+                raise KeyError(f"Unknown seed profile '{name}' (known: {', '.join(sorted(SEED_PROFILES))})")
+            self.apply_profile(page, name, SEED_PROFILES[name])
+
+    def apply_profile(self, page, name: str, profile: SeedProfile):
+        """Seed an unregistered profile (e.g. restored state) under the given name"""
+        browser_context = page.context
+        if profile.cookies:
+            browser_context.add_cookies([{"url": self.origin, **cookie} for cookie in profile.cookies])
+        script = self.script(name, profile)
+        browser_context.add_init_script(script)
+        if page.url.startswith(self.origin + "/"):
+            page.evaluate(script)
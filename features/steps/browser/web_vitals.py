@@ -0,0 +1,102 @@
+"""
+Core Web Vitals and navigation timing for browser scenarios.
+
+An init script on every scenario context starts buffered PerformanceObservers
+(paint, LCP, layout shift, long tasks) before the page's own scripts run.
+After each step the current document's metrics are read; a document seen for
+the first time is a new navigation and its metrics are reported once. TBT is
+the lab approximation: blocking time of long tasks after FCP, up to now.
+"""
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import Error as PlaywrightError
+
+
+VITALS_INIT_SCRIPT = """
+(() => {
+  if (window.__webVitals) return;
+  const vitals = window.__webVitals = { fcp: null, lcp: null, cls: 0, longTasks: [] };
+  const observe = (type, callback) => {
+    try {
+      new PerformanceObserver(list => list.getEntries().forEach(callback)).observe({ type, buffered: true });
+    } catch (e) { /* entry type not supported by this engine */ }
+  };
+  observe('paint', e => { if (e.name === 'first-contentful-paint') vitals.fcp = e.startTime; });
+  observe('largest-contentful-paint', e => { vitals.lcp = e.renderTime || e.loadTime || e.startTime; });
+  observe('layout-shift', e => { if (!e.hadRecentInput) vitals.cls += e.value; });
+  observe('longtask', e => vitals.longTasks.push([e.startTime, e.duration]));
+})();
+"""
+
+COLLECT_SCRIPT = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const vitals = window.__webVitals || { fcp: null, lcp: null, cls: null, longTasks: [] };
+  const fcp = vitals.fcp;
+  const blocking = vitals.longTasks
+    .filter(([start]) => fcp !== null && start >= fcp)
+    .reduce((total, [, duration]) => total + Math.max(0, duration - 50), 0);
+  return {
+    url: location.href,
+    timeOrigin: performance.timeOrigin,
+    ttfb: nav ? nav.responseStart : null,
+    domContentLoaded: nav ? nav.domContentLoadedEventEnd : null,
+    load: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+    transferSize: nav ? nav.transferSize : null,
+    fcp: fcp,
+    lcp: vitals.lcp,
+    cls: vitals.cls,
+    longTasks: vitals.longTasks.length,
+    tbt: fcp !== null ? blocking : null,
+  };
+}
+"""
+
+# Step names for the metrics, as used in "the page LCP should be under 2500 ms"
+METRIC_KEYS = {"TTFB": "ttfb", "FCP": "fcp", "LCP": "lcp", "CLS": "cls", "TBT": "tbt"}
+
+
+class WebVitals:
+    """Navigation timing and Web Vitals of the pages one scenario visits"""
+
+    def __init__(self):
+        self.navigations: List[Dict[str, Any]] = []
+
+    def install(self, browser_context):
+        """Observe every document this context loads"""
+        browser_context.add_init_script(VITALS_INIT_SCRIPT)
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self.navigations[-1] if self.navigations else None
+
+    def collect(self, page) -> Optional[Dict[str, Any]]:
+        """Read the current document's metrics; returns them only for a new navigation"""
+        try:
+            metrics = page.evaluate(COLLECT_SCRIPT)
+        except PlaywrightError:
+            return None  # Page closed or mid-navigation
+        if not metrics or metrics["url"].startswith("about:"):
+            return None
+        metrics = {key: round(value, 4 if key == "cls" else 1) if isinstance(value, float) else value
+                   for key, value in metrics.items()}
+        if self.latest and self.latest["timeOrigin"] == metrics["timeOrigin"]:
+            # Same document: LCP, CLS and long tasks keep growing until input
+            self.navigations[-1] = metrics
+            return None
+        self.navigations.append(metrics)
+        return metrics
+
+    def metric(self, name: str) -> Optional[float]:
+        """Latest value of a metric by its step name (TTFB, FCP, LCP, CLS, TBT)"""
+        if name.upper() not in METRIC_KEYS:
+            raise KeyError(f"Unknown page metric {name}, expected one of {', '.join(METRIC_KEYS)}")
+        return self.latest.get(METRIC_KEYS[name.upper()]) if self.latest else None
+
+    @staticmethod
+    def describe(metrics: Dict[str, Any]) -> str:
+        def ms(key):
+            return f"{metrics[key]:.0f}ms" if metrics.get(key) is not None else "-"
+        cls = f"{metrics['cls']:.3f}" if metrics.get("cls") is not None else "-"
+        return (f"TTFB {ms('ttfb')}, FCP {ms('fcp')}, LCP {ms('lcp')}, CLS {cls}, "
+                f"TBT {ms('tbt')} ({metrics.get('longTasks', 0)} long tasks)")
@@ -3,21 +3,14 @@ Step definitions for end-to-end flow tests.
 These test the complete customer journey from subscription to playing.
 """
 from behave import given, when, then
-import requests
 import os
+import sys
 import json
 import time
 
-
-def get_function_url(context, path):
-    """Build the full function URL with auth"""
-    base_url = context.functions_url
-    function_key = os.getenv("FUNCTIONS_KEY", "")
-    
-    if function_key:
-        separator = "&" if "?" in path else "?"
-        return f"{base_url}{path}{separator}code={function_key}"
-    return f"{base_url}{path}"
+# Add steps directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+from api import ReadinessWatcher, table_body
 
 
 # ============================================================================
@@ -33,6 +26,10 @@ def step_save_field(context, field):
     if not hasattr(context, "saved_values"):
         context.saved_values = {}
     context.saved_values[field] = value
+    
+    # The checkout session becomes the subscription; cancel it if the scenario does not
+    if field == "sessionId":
+        context.teardown.track_subscription(value, source=context.scenario.name)
 
 
 @when('I simulate Stripe webhook "checkout.session.completed" for the session')
@@ -41,38 +38,34 @@ def step_simulate_checkout_webhook(context):
     session_id = context.saved_values.get("sessionId")
     assert session_id, "No session ID saved"
     
-    # In test mode, directly call the provision endpoint
-    # In integration mode, this would be a real webhook simulation
-    if os.getenv("TEST_MODE") == "mock":
-        context.server_provisioned = True
-        context.server_ip = "1.2.3.4"
-        context.server_port = 25565
-    else:
-        # Call provision directly as webhook would
-        url = get_function_url(context, "/api/servers/provision")
-        response = requests.post(url, json={
-            "userId": context.user_id,
-            "subscriptionId": session_id,
-            "gameType": "minecraft",
-            "tier": "small",
-            "serverName": "E2E Test Server",
-        }, timeout=120)  # Provisioning can take time
-        
-        context.response = response
-        context.response_data = response.json()
-        
-        if response.status_code == 200:
-            data = context.response_data.get("data", {})
-            context.server_id = data.get("serverId")
-            context.server_ip = data.get("ip")
-            context.server_port = data.get("port")
-            context.server_provisioned = True
+    # Call provision as the webhook would and watch the pod come up in the
+    # background; the scenario only blocks once it needs the server
+    scenario_name = context.scenario.name
+    context.provision_labels = {"gameType": "minecraft", "tier": "small"}
+    context.readiness = ReadinessWatcher(context.api).provision({
+        "userId": context.user_id,
+        "subscriptionId": session_id,
+        "gameType": "minecraft",
+        "tier": "small",
+        "serverName": "E2E Test Server",
+    }, on_server=lambda server_id: context.teardown.track_server(server_id, source=scenario_name))
 
 
 @then('the server should be provisioned')
 def step_server_provisioned(context):
-    assert hasattr(context, "server_provisioned") and context.server_provisioned, \
-        "Server was not provisioned"
+    timeline = context.readiness.wait()
+    context.response = timeline.response
+    context.response_data = timeline.data
+    context.provisioning_metrics.record(timeline, **context.provision_labels)
+    print(f"⏱️  Provisioning {timeline.server_id}: {timeline.describe()}")
+    
+    assert timeline.response is not None, timeline.error
+    data = timeline.data.get("data", {})
+    context.server_id = data.get("serverId")
+    context.server_ip = data.get("ip")
+    context.server_port = data.get("port")
+    context.server_provisioned = timeline.ready
+    assert context.server_provisioned, f"Server was not provisioned: {timeline.error}"
 
 
 @then('I should receive the server IP and port')
@@ -104,8 +97,7 @@ def step_get_first_server(context):
     server_id = context.server_id
     assert server_id, "No server ID available"
     
-    url = get_function_url(context, f"/api/servers/{server_id}")
-    context.response = requests.get(url, timeout=30)
+    context.response = context.api.get(f"/api/servers/{server_id}")
     context.response_data = context.response.json()
 
 
@@ -125,36 +117,33 @@ def step_k8s_pod_phase(context, phase):
 
 
 @when('I call POST the server command endpoint with')
+@when('I call POST the server command endpoint with:')
 def step_call_server_command(context):
     server_id = context.server_id
-    params = {row[0]: row[1] for row in context.table}
+    params = table_body(context.table)
     
-    url = get_function_url(context, f"/api/servers/{server_id}/command")
-    context.response = requests.post(url, json=params, timeout=30)
+    context.response = context.api.post(f"/api/servers/{server_id}/command", json=params)
     context.response_data = context.response.json()
 
 
 @when('I call POST the server stop endpoint')
 def step_call_server_stop(context):
     server_id = context.server_id
-    url = get_function_url(context, f"/api/servers/{server_id}/stop")
-    context.response = requests.post(url, timeout=60)
+    context.response = context.api.post(f"/api/servers/{server_id}/stop")
     context.response_data = context.response.json()
 
 
 @when('I call POST the server start endpoint')
 def step_call_server_start(context):
     server_id = context.server_id
-    url = get_function_url(context, f"/api/servers/{server_id}/start")
-    context.response = requests.post(url, timeout=60)
+    context.response = context.api.post(f"/api/servers/{server_id}/start")
     context.response_data = context.response.json()
 
 
 @when('I call POST the server backup endpoint')
 def step_call_server_backup(context):
     server_id = context.server_id
-    url = get_function_url(context, f"/api/servers/{server_id}/backup")
-    context.response = requests.post(url, timeout=120)
+    context.response = context.api.post(f"/api/servers/{server_id}/backup")
     context.response_data = context.response.json()
 
 
@@ -163,9 +152,10 @@ def step_cancel_subscription(context, immediate):
     subscription_id = context.saved_values.get("sessionId") or context.subscription_id
     immediate_bool = immediate.lower() == "true"
     
-    url = get_function_url(context, f"/api/subscriptions/{subscription_id}/cancel")
-    context.response = requests.post(url, json={"immediate": immediate_bool}, timeout=30)
+    context.response = context.api.post(f"/api/subscriptions/{subscription_id}/cancel", json={"immediate": immediate_bool})
     context.response_data = context.response.json()
+    if immediate_bool and context.response.status_code == 200:
+        context.teardown.forget_subscription(subscription_id)
 
 
 @when('I delete the test server')
@@ -174,9 +164,10 @@ def step_delete_test_server(context):
     if not server_id:
         return  # Nothing to delete
     
-    url = get_function_url(context, f"/api/servers/{server_id}")
-    context.response = requests.delete(url, timeout=60)
+    context.response = context.api.delete(f"/api/servers/{server_id}")
     context.response_data = context.response.json()
+    if context.response.status_code in (200, 404):
+        context.teardown.forget_server(server_id)
 
 
 @then('the server should be removed from Kubernetes')
@@ -186,8 +177,7 @@ def step_server_removed(context):
     if not server_id:
         return
     
-    url = get_function_url(context, f"/api/servers/{server_id}")
-    response = requests.get(url, timeout=30)
+    response = context.api.get(f"/api/servers/{server_id}")
     # Should be 404 or have deleted status
     assert response.status_code in [404, 200]
 
@@ -196,49 +186,93 @@ def step_server_removed(context):
 # BILLING WEBHOOKS
 # ============================================================================
 
+def _seed_mock_subscription(context, user_id, status="active"):
+    """Put the user's first mock server on a subscription, as checkout would have"""
+    state = context.functions_mock.state
+    server = state.ensure_user_servers(user_id)[0]
+    context.server_id = server.id
+    context.subscription_id = f"sub-{user_id}"
+    state.ensure_subscription(context.subscription_id, user_id=user_id, status=status, server_id=server.id)
+
+
+def _server_replicas(context):
+    """Replicas of the scenario's server, found through its subscription if need be"""
+    server_id = getattr(context, "server_id", None)
+    if not server_id:
+        subscription_id = getattr(context, "subscription_id", None)
+        assert subscription_id, "No server or subscription in this scenario"
+        response = context.api.get(f"/api/subscriptions/{subscription_id}")
+        server_id = response.json().get("data", {}).get("subscription", {}).get("serverId")
+        assert server_id, f"Subscription {subscription_id} has no server"
+    
+    response = context.api.get(f"/api/servers/{server_id}")
+    assert response.status_code == 200, f"GET server {server_id} returned {response.status_code}"
+    return response.json().get("data", {}).get("kubernetes", {}).get("replicas", 0)
+
+
 @given('I have a running server for user "{user_id}"')
 def step_have_running_server_for_user(context, user_id):
     context.user_id = user_id
-    # In test mode, assume server exists
+    if context.functions_mock:
+        _seed_mock_subscription(context, user_id)
 
 
 @given('I have a suspended server for user "{user_id}"')
 def step_have_suspended_server(context, user_id):
     context.user_id = user_id
     context.server_state = "suspended"
+    if context.functions_mock:
+        for server in context.functions_mock.state.ensure_user_servers(user_id):
+            context.functions_mock.state.ensure_server(server.id, user_id=user_id, status="suspended")
+        _seed_mock_subscription(context, user_id, status="past_due")
 
 
 @given('I have a small tier server for user "{user_id}"')
 def step_have_small_tier_server(context, user_id):
     context.user_id = user_id
     context.current_tier = "small"
+    if context.functions_mock:
+        for server in context.functions_mock.state.ensure_user_servers(user_id):
+            context.functions_mock.state.ensure_server(server.id, user_id=user_id, plan="small")
+            context.server_id = server.id
 
 
 @when('I simulate Stripe webhook "invoice.payment_failed" with {attempts:d} attempts')
 def step_simulate_payment_failed(context, attempts):
-    # In test mode, just mark as failed
+    # In test mode, just mark as failed; the mock applies it as the webhook handler would
     context.payment_failed = True
     context.payment_attempts = attempts
+    if context.functions_mock:
+        context.functions_mock.state.invoice(context.subscription_id, paid=False)
 
 
 @when('I simulate Stripe webhook "invoice.paid"')
 def step_simulate_payment_success(context):
     context.payment_success = True
+    if context.functions_mock:
+        context.functions_mock.state.invoice(context.subscription_id, paid=True)
 
 
 @then('the server should be started')
+@then('the server should still be running')
 def step_verify_server_started(context):
-    # Would verify via API
-    pass
+    replicas = _server_replicas(context)
+    assert replicas >= 1, f"Server is scaled to {replicas} replicas"
+
+
+@then('the server should be stopped')
+def step_verify_server_stopped(context):
+    replicas = _server_replicas(context)
+    assert replicas == 0, f"Server is still scaled to {replicas} replicas"
 
 
 @when('I call PATCH the server with')
+@when('I call PATCH the server with:')
 def step_patch_server(context):
     server_id = context.server_id
-    params = {row[0]: row[1] for row in context.table}
+    params = table_body(context.table)
     
-    url = get_function_url(context, f"/api/servers/{server_id}")
-    context.response = requests.patch(url, json=params, timeout=60)
+    context.response = context.api.patch(f"/api/servers/{server_id}", json=params)
     context.response_data = context.response.json()
 
 
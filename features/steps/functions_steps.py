@@ -3,10 +3,16 @@ Step definitions for Azure Functions API tests.
 These test the realm-functions backend API.
 """
 from behave import given, when, then
-import requests
 import os
+import re
+import sys
 import json
 
+# Add steps directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+from api import response_json, table_body
+from perf import percentile
+
 
 # ============================================================================
 # CONTEXT SETUP
@@ -31,103 +37,128 @@ def step_have_k8s_credentials(context):
 @given('I have servers for user "{user_id}"')
 def step_have_servers_for_user(context, user_id):
     context.user_id = user_id
-    # In test mode, we assume test data exists
+    if context.functions_mock:
+        context.functions_mock.state.ensure_user_servers(user_id)
 
 
 @given('I have a server with ID "{server_id}"')
 def step_have_server(context, server_id):
     context.server_id = server_id
+    if context.functions_mock:
+        context.functions_mock.state.ensure_server(server_id)
 
 
 @given('I have a running server "{server_id}"')
 def step_have_running_server(context, server_id):
     context.server_id = server_id
     context.server_state = "running"
+    if context.functions_mock:
+        context.functions_mock.state.ensure_server(server_id, status="running")
 
 
 @given('I have a stopped server "{server_id}"')
 def step_have_stopped_server(context, server_id):
     context.server_id = server_id
     context.server_state = "stopped"
+    if context.functions_mock:
+        context.functions_mock.state.ensure_server(server_id, status="stopped")
 
 
 @given('I have a running Minecraft server "{server_id}"')
 def step_have_minecraft_server(context, server_id):
     context.server_id = server_id
     context.game_type = "minecraft"
+    if context.functions_mock:
+        context.functions_mock.state.ensure_server(server_id, game_type="minecraft")
 
 
 @given('I have a server "{server_id}" with backup "{backup_id}"')
 def step_have_server_with_backup(context, server_id, backup_id):
     context.server_id = server_id
     context.backup_id = backup_id
+    if context.functions_mock:
+        context.functions_mock.state.ensure_backup(server_id, backup_id)
+
+
+@given('I lease a running {game_type} server')
+def step_lease_server(context, game_type):
+    """Take a warm server from the pool; it is reset and returned after the scenario"""
+    server = context.server_pool.lease(game_type)
+    context.leased_server = server
+    context.server_id = server.id
+    context.game_type = server.gameType
+    context.server_ip = server.ip
+    context.server_port = server.port
 
 
 @given('I have an active subscription "{subscription_id}"')
 def step_have_subscription(context, subscription_id):
     context.subscription_id = subscription_id
+    if context.functions_mock:
+        context.functions_mock.state.ensure_subscription(subscription_id)
 
 
 # ============================================================================
 # API CALLS
 # ============================================================================
 
-def get_function_url(context, path):
-    """Build the full function URL with auth"""
-    base_url = context.functions_url
-    function_key = os.getenv("FUNCTIONS_KEY", "")
-    
-    if function_key:
-        separator = "&" if "?" in path else "?"
-        return f"{base_url}{path}{separator}code={function_key}"
-    return f"{base_url}{path}"
+def expand_path(context, path):
+    """Fill {server_id}-style placeholders from the scenario context"""
+    return re.sub(r"\{(\w+)\}", lambda m: str(getattr(context, m.group(1), m.group(0))), path)
+
+
+def track_created(context, path):
+    """Register servers a call provisioned with the teardown reaper"""
+    if path.startswith("/api/servers/provision") and context.response.status_code == 200:
+        data = context.response_data.get("data", {})
+        context.teardown.track_server(data.get("serverId"), source=context.scenario.name)
 
 
 @when('I call POST "{path}" with')
+@when('I call POST "{path}" with:')
 def step_call_post_with_table(context, path):
     """Call a POST endpoint with parameters from table"""
-    params = {}
-    for row in context.table:
-        key = row[0]
-        value = row[1]
-        # Convert boolean strings
-        if value.lower() == "true":
-            value = True
-        elif value.lower() == "false":
-            value = False
-        params[key] = value
-    
-    url = get_function_url(context, path)
-    context.response = requests.post(url, json=params, timeout=30)
-    
-    try:
-        context.response_data = context.response.json()
-    except:
-        context.response_data = {}
+    context.response = context.api.post(expand_path(context, path), json=table_body(context.table))
+    context.response_data = response_json(context.response)
+    track_created(context, path)
+
+
+@when('I call POST "{path}"')
+def step_call_post(context, path):
+    """Call a POST endpoint without a body"""
+    context.response = context.api.post(expand_path(context, path))
+    context.response_data = response_json(context.response)
+    track_created(context, path)
 
 
 @when('I call GET "{path}"')
 def step_call_get(context, path):
     """Call a GET endpoint"""
-    url = get_function_url(context, path)
-    context.response = requests.get(url, timeout=30)
-    
-    try:
-        context.response_data = context.response.json()
-    except:
-        context.response_data = {}
+    context.response = context.api.get(expand_path(context, path))
+    context.response_data = response_json(context.response)
+
+
+@when('I call GET "{path}" {count:d} times')
+def step_call_get_repeatedly(context, path, count):
+    """Call a GET endpoint sequentially, keeping each response time"""
+    path = expand_path(context, path)
+    context.latency_samples = []
+    for _ in range(count):
+        context.response = context.api.get(path)
+        context.latency_samples.append(context.response.elapsed_ms)
+    context.response_data = response_json(context.response)
+    print(f"  ⏱️  {count}× GET {path}: p50 {percentile(context.latency_samples, 50):.0f}ms, "
+          f"p95 {percentile(context.latency_samples, 95):.0f}ms")
 
 
 @when('I call DELETE "{path}"')
 def step_call_delete(context, path):
     """Call a DELETE endpoint"""
-    url = get_function_url(context, path)
-    context.response = requests.delete(url, timeout=30)
-    
-    try:
-        context.response_data = context.response.json()
-    except:
-        context.response_data = {}
+    path = expand_path(context, path)
+    context.response = context.api.delete(path)
+    context.response_data = response_json(context.response)
+    if path.startswith("/api/servers/") and context.response.status_code in (200, 404):
+        context.teardown.forget_server(path.split("/")[3].split("?")[0])
 
 
 # ============================================================================
@@ -177,6 +208,29 @@ def step_contains_network(context):
     assert "network" in data, "Response does not contain 'network'"
 
 
+# ============================================================================
+# LATENCY ASSERTIONS
+# ============================================================================
+
+@then('the response time should be under {limit_ms:d} ms')
+def step_check_response_time(context, limit_ms):
+    elapsed_ms = context.response.elapsed_ms
+    assert elapsed_ms < limit_ms, \
+        f"{context.response.request.method} took {elapsed_ms:.0f}ms, budget {limit_ms}ms"
+
+
+@then('the p{pct:d} latency should be under {limit_ms:d} ms')
+def step_check_latency_percentile(context, pct, limit_ms):
+    """Percentile of the last repeated call, or of every API call in the scenario"""
+    samples = getattr(context, "latency_samples", None)
+    if not samples and getattr(context, "api_timings", None):
+        samples = context.api_timings.timings()
+    assert samples, "No API calls have been timed in this scenario"
+    value = percentile(samples, pct)
+    assert value < limit_ms, \
+        f"p{pct} latency {value:.0f}ms over {len(samples)} calls, budget {limit_ms}ms"
+
+
 # ============================================================================
 # KUBERNETES ASSERTIONS
 # ============================================================================
@@ -230,7 +284,37 @@ def step_server_restored(context):
 
 
 # ============================================================================
-# SUBSCRIPTION ASSERTIONS (handled in web_steps.py)
+# SUBSCRIPTION ASSERTIONS
 # ============================================================================
-# Note: Subscription status assertions are defined in web_steps.py
-# to avoid duplication with admin_steps.py
+# Shared with the admin features, so it lives here where the load test
+# (which loads only the API step modules) can find it
+
+@then('the subscription status should be "{status}"')
+def step_subscription_status(context, status):
+    page = getattr(context, "page", None)
+    if page is not None and not page.is_blocked:
+        assert page.locator(f'[data-status="{status}"]').is_visible()
+        return
+    
+    # API scenarios have no portal to look at. Subscription calls (e.g. cancel)
+    # return the subscription with its new status, so check that first.
+    subscription_id = getattr(context, "saved_values", {}).get("sessionId") or getattr(context, "subscription_id", None)
+    assert subscription_id, "No subscription in this scenario"
+    data = (getattr(context, "response_data", None) or {}).get("data", {})
+    returned = data.get("subscription") or {}
+    if returned.get("id") == subscription_id:
+        actual = returned.get("status", data.get("status"))
+        assert actual == status, f"Expected subscription status '{status}', got '{actual}'"
+        return
+    
+    # Otherwise look it up. Only the mock serves GET /api/subscriptions/{id};
+    # realm-functions has no subscription lookup endpoint yet.
+    response = context.api.get(f"/api/subscriptions/{subscription_id}")
+    if response.status_code in (404, 405) and not context.functions_mock:
+        raise AssertionError(
+            f"Cannot check subscription {subscription_id}: realm-functions has no "
+            f"GET /api/subscriptions/{{id}} endpoint (only TEST_MODE=mock serves it), "
+            f"and the last response did not include the subscription")
+    assert response.status_code == 200, f"GET subscription {subscription_id} returned {response.status_code}"
+    actual = response_json(response).get("data", {}).get("subscription", {}).get("status")
+    assert actual == status, f"Expected subscription status '{status}', got '{actual}'"
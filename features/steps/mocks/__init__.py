@@ -0,0 +1,13 @@
+"""Mocks package - local stand-ins for external services used by the suite"""
+import os
+import sys
+
+# Ensure this directory is in path
+_dir = os.path.dirname(__file__)
+if _dir not in sys.path:
+    sys.path.insert(0, _dir)
+
+from oidc_provider import MockOidcProvider, IdpUser
+from functions_api import MockFunctionsApi, FunctionsState
+
+__all__ = ["MockOidcProvider", "IdpUser", "MockFunctionsApi", "FunctionsState"]
@@ -0,0 +1,699 @@
+"""
+In-process stand-in for the realm-functions API (TEST_MODE=mock).
+
+Keeps servers, subscriptions, backups, checkout sessions and auth sessions in
+memory and serves the endpoints the step definitions call, using the same
+{"success": ..., "data": ...} envelope as the real Functions app. Latency and
+an error rate can be injected to exercise retries and to benchmark the
+harness itself; over HTTP/1.1 keep-alive a call takes about a millisecond.
+
+Run standalone:
+    python features/steps/mocks/functions_api.py --port 7072
+"""
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+# Game types the provisioner knows, with their default server port
+GAME_PORTS = {
+    "minecraft": 25565,
+    "valheim": 2456,
+    "rust": 28015,
+    "terraria": 7777,
+    "ark": 7777,
+    "palworld": 8211,
+}
+
+TIER_RESOURCES = {
+    "small": {"cpu": "1", "memory": "2Gi"},
+    "starter": {"cpu": "1", "memory": "2Gi"},
+    "medium": {"cpu": "2", "memory": "4Gi"},
+    "large": {"cpu": "4", "memory": "8Gi"},
+}
+
+
+@dataclass
+class Server:
+    id: str
+    userId: str
+    name: str
+    gameType: str
+    plan: str = "small"
+    status: str = "running"
+    replicas: int = 1
+    ip: str = ""
+    port: int = 0
+    subscriptionId: Optional[str] = None
+    createdAt: float = field(default_factory=time.time)
+    readyAt: float = 0.0
+
+    def pod_state(self) -> Tuple[str, Optional[str]]:
+        """Kubernetes pod phase and waiting reason, advancing while the server boots"""
+        if not self.replicas:
+            return "Stopped", None
+        remaining = self.readyAt - time.time()
+        if remaining <= 0:
+            return "Running", None
+        booting = self.readyAt - self.createdAt
+        return "Pending", ("ContainerCreating" if remaining < booting * 2 / 3 else None)
+
+    def to_json(self) -> Dict[str, Any]:
+        phase, _ = self.pod_state()
+        data = asdict(self)
+        data["tier"] = self.plan
+        data["status"] = "provisioning" if phase == "Pending" else self.status
+        data["liveStatus"] = {"podPhase": phase}
+        return data
+
+
+@dataclass
+class Subscription:
+    id: str
+    userId: str
+    status: str = "active"
+    provider: str = "stripe"
+    tier: str = "small"
+    serverId: Optional[str] = None
+    cancelAtPeriodEnd: bool = False
+    mollieId: Optional[str] = None
+
+
+@dataclass
+class Backup:
+    id: str
+    serverId: str
+    url: str
+    createdAt: float = field(default_factory=time.time)
+    sizeBytes: int = 0
+
+
+@dataclass
+class CheckoutSession:
+    id: str
+    userId: str
+    email: str
+    gameType: str
+    tier: str
+    provider: str
+    checkoutUrl: str
+    serverName: str = ""
+    status: str = "open"
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FunctionsState:
+    """Thread-safe in-memory models behind the mock API"""
+
+    def __init__(self, boot_seconds: float = 0.0):
+        self.boot_seconds = boot_seconds
+        self.servers: Dict[str, Server] = {}
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.backups: Dict[str, Backup] = {}
+        self.sessions: Dict[str, CheckoutSession] = {}
+        self.auth_sessions: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.RLock()
+        self._ip_counter = 0
+
+    def _next_ip(self) -> str:
+        self._ip_counter += 1
+        return f"10.0.{self._ip_counter // 250}.{self._ip_counter % 250 + 2}"
+
+    # ==================== SEEDING ====================
+
+    def ensure_server(self, server_id: str, user_id: str = "test-user-123", game_type: str = "minecraft",
+                      status: str = "running", plan: str = "small") -> Server:
+        """Create or reset a server to a known state (used by Given steps)"""
+        with self.lock:
+            server = self.servers.get(server_id)
+            if server is None:
+                server = Server(id=server_id, userId=user_id, name=f"{game_type} server",
+                                gameType=game_type, ip=self._next_ip(), port=GAME_PORTS.get(game_type, 7777))
+                self.servers[server_id] = server
+            server.userId = user_id
+            server.gameType = game_type
+            server.plan = plan
+            server.status = status
+            server.replicas = 1 if status == "running" else 0
+            return server
+
+    def ensure_backup(self, server_id: str, backup_id: str) -> Backup:
+        with self.lock:
+            self.ensure_server(server_id)
+            backup = Backup(id=backup_id, serverId=server_id, url=f"https://mockblob/backups/{server_id}/{backup_id}.tar.gz")
+            self.backups[backup_id] = backup
+            return backup
+
+    def ensure_subscription(self, subscription_id: str, user_id: str = "test-user-123",
+                            status: str = "active", server_id: Optional[str] = None) -> Subscription:
+        with self.lock:
+            subscription = Subscription(id=subscription_id, userId=user_id, status=status, serverId=server_id,
+                                        mollieId=f"sub_{secrets.token_hex(5)}")
+            self.subscriptions[subscription_id] = subscription
+            if server_id is None:
+                server = self.ensure_server(f"server-{subscription_id}", user_id=user_id)
+            else:
+                server = self.servers.get(server_id)
+            if server is not None:
+                server.subscriptionId = subscription_id
+                subscription.serverId = server.id
+            return subscription
+
+    def ensure_user_servers(self, user_id: str, status: str = "running") -> List[Server]:
+        with self.lock:
+            owned = [s for s in self.servers.values() if s.userId == user_id]
+            if not owned:
+                owned = [self.ensure_server(f"server-{user_id}", user_id=user_id, status=status)]
+            return owned
+
+    def reset(self):
+        with self.lock:
+            self.servers.clear()
+            self.subscriptions.clear()
+            self.backups.clear()
+            self.sessions.clear()
+            self.auth_sessions.clear()
+
+    # ==================== OPERATIONS ====================
+
+    def server(self, server_id: str) -> Server:
+        server = self.servers.get(server_id)
+        if server is None:
+            raise ApiError(404, f"Server not found: {server_id}")
+        return server
+
+    def create_checkout(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        for key in ("userId", "email", "gameType"):
+            if not body.get(key):
+                raise ApiError(400, f"Missing required field: {key}")
+        self._check_game_type(body["gameType"])
+        session_id = f"cs_test_{secrets.token_hex(12)}"
+        provider = body.get("provider", "stripe")
+        session = CheckoutSession(
+            id=session_id, userId=body["userId"], email=body["email"], gameType=body["gameType"],
+            tier=body.get("tier") or body.get("plan") or "small", provider=provider,
+            serverName=body.get("serverName", ""),
+            checkoutUrl=f"https://checkout.{provider}.mock/pay/{session_id}",
+        )
+        with self.lock:
+            self.sessions[session_id] = session
+        return {"sessionId": session_id, "checkoutUrl": session.checkoutUrl, "provider": provider}
+
+    def provision(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        game_type = body.get("gameType", "")
+        self._check_game_type(game_type)
+        user_id = body.get("userId") or "anonymous"
+        plan = body.get("tier") or body.get("plan") or "small"
+        with self.lock:
+            server = Server(
+                id=f"srv-{secrets.token_hex(6)}", userId=user_id, name=body.get("serverName") or f"{game_type} server",
+                gameType=game_type, plan=plan, ip=self._next_ip(), port=GAME_PORTS[game_type],
+                subscriptionId=body.get("subscriptionId"),
+            )
+            server.readyAt = server.createdAt + self.boot_seconds
+            self.servers[server.id] = server
+            if server.subscriptionId:
+                subscription = self.subscriptions.get(server.subscriptionId)
+                if subscription is None:
+                    subscription = Subscription(id=server.subscriptionId, userId=user_id, tier=plan,
+                                                mollieId=f"sub_{secrets.token_hex(5)}")
+                    self.subscriptions[subscription.id] = subscription
+                subscription.serverId = server.id
+        return {"serverId": server.id, "id": server.id, "ip": server.ip, "port": server.port,
+                "status": server.to_json()["status"]}
+
+    @staticmethod
+    def _check_game_type(game_type: str):
+        if game_type not in GAME_PORTS:
+            raise ApiError(400, f"Unknown game type: {game_type}")
+
+    def list_servers(self, user_id: Optional[str]) -> Dict[str, Any]:
+        with self.lock:
+            servers = [s.to_json() for s in self.servers.values() if not user_id or s.userId == user_id]
+        return {"servers": servers, "count": len(servers)}
+
+    def server_details(self, server_id: str) -> Dict[str, Any]:
+        server = self.server(server_id)
+        phase, reason = server.pod_state()
+        return {
+            "server": server.to_json(),
+            "kubernetes": {
+                "deployment": f"gs-{server.id}",
+                "replicas": server.replicas,
+                "resources": TIER_RESOURCES.get(server.plan, TIER_RESOURCES["small"]),
+                "pod": {"phase": phase, "reason": reason, "status": "found" if server.replicas else "not_found"},
+            },
+            "network": {"ip": server.ip, "port": server.port, "host": f"{server.ip}:{server.port}"},
+        }
+
+    def update_server(self, server_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            server = self.server(server_id)
+            changes = []
+            plan = body.get("tier") or body.get("plan")
+            if plan and plan != server.plan:
+                server.plan = plan
+                changes.append("plan")
+            if body.get("name") and body["name"] != server.name:
+                server.name = body["name"]
+                changes.append("name")
+        return {"server": server.to_json(), "changes": changes, "needsRestart": "plan" in changes}
+
+    def delete_server(self, server_id: str) -> Dict[str, Any]:
+        with self.lock:
+            self.server(server_id)
+            del self.servers[server_id]
+        return {"deleted": True, "serverId": server_id}
+
+    def scale(self, server_id: str, replicas: int) -> Dict[str, Any]:
+        with self.lock:
+            server = self.server(server_id)
+            server.replicas = replicas
+            server.status = "running" if replicas else "stopped"
+        return {"success": True, "replicas": replicas, "status": server.status}
+
+    def command(self, server_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        server = self.server(server_id)
+        if not server.replicas:
+            raise ApiError(409, "Server is not running")
+        command = body.get("command", "")
+        if server.gameType == "minecraft" and command == "list":
+            output = "There are 0 of a max of 20 players online:"
+        elif command.startswith("say "):
+            output = f"[Server] {command[4:]}"
+        else:
+            output = f"Executed: {command}"
+        return {"output": output, "command": command}
+
+    def backup(self, server_id: str) -> Dict[str, Any]:
+        with self.lock:
+            self.server(server_id)
+            backup_id = f"backup-{secrets.token_hex(6)}"
+            backup = Backup(id=backup_id, serverId=server_id, sizeBytes=random.randint(10, 500) * 1024 * 1024,
+                            url=f"https://mockblob/backups/{server_id}/{backup_id}.tar.gz")
+            self.backups[backup_id] = backup
+        return {"backupId": backup.id, "url": backup.url, "sizeBytes": backup.sizeBytes}
+
+    def restore(self, server_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.server(server_id)
+        backup = self.backups.get(body.get("backupId", ""))
+        if backup is None or backup.serverId != server_id:
+            raise ApiError(404, f"Backup not found: {body.get('backupId')}")
+        return {"restored": True, "backupId": backup.id, "serverId": server_id}
+
+    def subscription(self, subscription_id: str) -> Subscription:
+        subscription = self.subscriptions.get(subscription_id)
+        if subscription is None:
+            raise ApiError(404, f"Subscription not found: {subscription_id}")
+        return subscription
+
+    def subscription_details(self, subscription_id: str) -> Dict[str, Any]:
+        with self.lock:
+            return {"subscription": asdict(self.subscription(subscription_id))}
+
+    def cancel_subscription(self, subscription_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            subscription = self.subscription(subscription_id)
+            immediate = str(body.get("immediate", False)).lower() == "true"
+            if immediate:
+                subscription.status = "canceled"
+                if subscription.serverId in self.servers:
+                    self.scale(subscription.serverId, 0)
+            else:
+                subscription.status = "canceling"
+                subscription.cancelAtPeriodEnd = True
+        return {"subscription": asdict(subscription), "status": subscription.status}
+
+    def invoice(self, subscription_id: str, paid: bool) -> Dict[str, Any]:
+        """Apply an invoice.paid / invoice.payment_failed webhook: suspend or resume the server"""
+        with self.lock:
+            subscription = self.subscription(subscription_id)
+            subscription.status = "active" if paid else "past_due"
+            if subscription.serverId in self.servers:
+                self.scale(subscription.serverId, 1 if paid else 0)
+                if not paid:
+                    self.servers[subscription.serverId].status = "suspended"
+        return {"subscription": asdict(subscription), "status": subscription.status}
+
+    # ==================== AUTH ====================
+
+    def create_auth_session(self, claims: Dict[str, Any], lifetime: int = 3600) -> str:
+        token = secrets.token_urlsafe(32)
+        with self.lock:
+            self.auth_sessions[token] = {"claims": claims, "expires_at": time.time() + lifetime}
+        return token
+
+    def auth_me(self, token: Optional[str]) -> List[Dict[str, Any]]:
+        if not token:
+            raise ApiError(401, "No session token provided")
+        session = self.auth_sessions.get(token)
+        if session is None or session["expires_at"] <= time.time():
+            raise ApiError(401, "Invalid session token")
+        claims = session["claims"]
+        user_claims = [
+            {"typ": "email", "val": claims.get("email", "")},
+            {"typ": "preferred_username", "val": claims.get("preferred_username", "")},
+            {"typ": "name", "val": claims.get("name", "")},
+        ] + [{"typ": "role", "val": role} for role in claims.get("roles", [])]
+        return [{
+            "user_id": claims.get("oid") or claims.get("sub", ""),
+            "provider_name": "aad",
+            "user_claims": user_claims,
+        }]
+
+    def session_user_id(self, token: Optional[str]) -> Optional[str]:
+        session = self.auth_sessions.get(token or "")
+        if session is None:
+            return None
+        return session["claims"].get("oid") or session["claims"].get("sub")
+
+
+class MockFunctionsApi:
+    """Serves FunctionsState over HTTP from a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: int = 0,
+                 latency_jitter_ms: int = 0, error_rate: float = 0.0, boot_seconds: float = 0.0, idp=None):
+        self.state = FunctionsState(boot_seconds=boot_seconds)
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.idp = idp
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def from_env(cls, idp=None) -> "MockFunctionsApi":
+        return cls(
+            port=int(os.getenv("MOCK_FUNCTIONS_PORT", "0")),
+            latency_ms=int(os.getenv("MOCK_FUNCTIONS_LATENCY_MS", "0")),
+            latency_jitter_ms=int(os.getenv("MOCK_FUNCTIONS_LATENCY_JITTER_MS", "0")),
+            error_rate=float(os.getenv("MOCK_FUNCTIONS_ERROR_RATE", "0")),
+            boot_seconds=float(os.getenv("MOCK_FUNCTIONS_BOOT_SECONDS", "0")),
+            idp=idp,
+        )
+
+    def start(self) -> "MockFunctionsApi":
+        api = self
+
+        class Handler(_FunctionsRequestHandler):
+            mock = api
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="mock-functions", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # ==================== SSO ====================
+
+    def login_redirect(self, query: Dict[str, str]) -> str:
+        """Send the browser to the identity provider's authorize endpoint"""
+        if self.idp is None:
+            raise ApiError(503, "No identity provider configured for the mock Functions API")
+        params = {
+            "client_id": "realm-functions-mock",
+            "response_type": "code",
+            "scope": "openid profile email",
+            "redirect_uri": f"{self.url}/api/auth/callback",
+            "state": query.get("post_login_redirect_uri", f"{self.url}/api/health"),
+            "nonce": secrets.token_hex(8),
+        }
+        return f"{self.idp.discovery()['authorization_endpoint']}?{urlencode(params)}"
+
+    def complete_login(self, query: Dict[str, str]) -> Tuple[str, str]:
+        """Exchange the authorization code and return (session token, final redirect)"""
+        if self.idp is None:
+            raise ApiError(503, "No identity provider configured for the mock Functions API")
+        if "code" not in query:
+            raise ApiError(401, f"Login failed: {query.get('error', 'no code')}")
+        form = {"grant_type": "authorization_code", "code": query["code"],
+                "redirect_uri": f"{self.url}/api/auth/callback"}
+        request = urllib.request.Request(self.idp.discovery()["token_endpoint"], data=urlencode(form).encode())
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                tokens = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise ApiError(401, f"Token exchange failed: {e.read().decode()}")
+        claims = self.idp.verify_token(tokens["id_token"])
+        if claims is None:
+            raise ApiError(401, "Invalid id_token")
+        token = self.state.create_auth_session(claims)
+        redirect = query.get("state") or f"{self.url}/api/health"
+        separator = "&" if "?" in redirect else "?"
+        return token, f"{redirect}{separator}{urlencode({'auth_token': token})}"
+
+
+# ==================== HTTP ====================
+
+Route = Tuple[str, "re.Pattern", Callable]
+
+
+class _FunctionsRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs
+    # add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+    mock: MockFunctionsApi = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # -------- plumbing --------
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload: Any):
+        self._send(status, json.dumps(payload).encode())
+
+    def _body(self) -> Dict[str, Any]:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise ApiError(400, "Invalid Content-Length")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ApiError(400, "Invalid JSON body")
+        if not isinstance(body, dict):
+            raise ApiError(400, "JSON body must be an object")
+        return body
+
+    def _token(self) -> Optional[str]:
+        auth = self.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            return auth[7:]
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "session_token":
+                return value
+        return None
+
+    def _dispatch(self, method: str):
+        mock = self.mock
+        with mock._count_lock:
+            mock.request_count += 1
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+
+        if mock.latency_ms or mock.latency_jitter_ms:
+            time.sleep((mock.latency_ms + random.uniform(0, mock.latency_jitter_ms)) / 1000)
+
+        try:
+            body = self._body() if method in ("POST", "PATCH", "PUT") else {}
+            if mock.error_rate and path != "/api/health" and random.random() < mock.error_rate:
+                raise ApiError(503, "Injected failure (MOCK_FUNCTIONS_ERROR_RATE)")
+            for route_method, pattern, handler in ROUTES:
+                if route_method != method:
+                    continue
+                match = pattern.fullmatch(path)
+                if match:
+                    handler(self, query, body, *match.groups())
+                    return
+            raise ApiError(404, f"No route for {method} {path}")
+        except ApiError as e:
+            self._json(e.status, {"success": False, "error": e.message})
+        except Exception as e:
+            # A handler bug answers 500 instead of killing the connection's thread
+            self._json(500, {"success": False, "error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # -------- handlers --------
+
+    def ok(self, data: Any, status: int = 200):
+        self._json(status, {"success": True, "data": data})
+
+    def health(self, query, body):
+        self._json(200, {"status": "healthy", "mode": "mock"})
+
+    def checkout_create(self, query, body):
+        self.ok(self.mock.state.create_checkout(body))
+
+    def servers_provision(self, query, body):
+        self.ok(self.mock.state.provision(body))
+
+    def servers_list(self, query, body):
+        self.ok(self.mock.state.list_servers(query.get("userId")))
+
+    def server_get(self, query, body, server_id):
+        self.ok(self.mock.state.server_details(server_id))
+
+    def server_patch(self, query, body, server_id):
+        self.ok(self.mock.state.update_server(server_id, body))
+
+    def server_delete(self, query, body, server_id):
+        self.ok(self.mock.state.delete_server(server_id))
+
+    def server_action(self, query, body, server_id, action):
+        state = self.mock.state
+        if action == "stop":
+            self.ok(state.scale(server_id, 0))
+        elif action == "start":
+            self.ok(state.scale(server_id, 1))
+        elif action == "command":
+            self.ok(state.command(server_id, body))
+        elif action == "backup":
+            self.ok(state.backup(server_id))
+        elif action == "restore":
+            self.ok(state.restore(server_id, body))
+        else:
+            raise ApiError(404, f"Unknown server action: {action}")
+
+    def subscription_get(self, query, body, subscription_id):
+        self.ok(self.mock.state.subscription_details(subscription_id))
+
+    def subscription_cancel(self, query, body, subscription_id):
+        self.ok(self.mock.state.cancel_subscription(subscription_id, body))
+
+    def auth_me(self, query, body):
+        self._json(200, self.mock.state.auth_me(self._token()))
+
+    def auth_login(self, query, body):
+        self._send(302, b"", headers={"Location": self.mock.login_redirect(query)})
+
+    def auth_callback(self, query, body):
+        token, location = self.mock.complete_login(query)
+        self._send(302, b"", headers={
+            "Location": location,
+            "Set-Cookie": f"session_token={token}; Path=/; HttpOnly; SameSite=Lax",
+        })
+
+    def auth_logout(self, query, body):
+        token = self._token()
+        with self.mock.state.lock:
+            self.mock.state.auth_sessions.pop(token or "", None)
+        target = query.get("post_login_redirect_uri") or f"{self.mock.url}/api/health?logged_out=true"
+        self._send(302, b"", headers={
+            "Location": target,
+            "Set-Cookie": "session_token=; Path=/; Max-Age=0",
+        })
+
+    def game_servers(self, query, body):
+        user_id = self.mock.state.session_user_id(self._token())
+        if user_id is None:
+            raise ApiError(401, "No session token provided")
+        self.ok(self.mock.state.list_servers(user_id))
+
+    def game_server_restart(self, query, body, server_id):
+        if self.mock.state.session_user_id(self._token()) is None:
+            raise ApiError(401, "No session token provided")
+        self.mock.state.server(server_id)
+        self.ok({"restarting": True, "serverId": server_id}, status=202)
+
+    def legacy_server_list(self, query, body):
+        user_id = self.mock.state.session_user_id(self._token())
+        if user_id is None:
+            raise ApiError(401, "No session token provided")
+        self._json(200, {"servers": self.mock.state.list_servers(user_id)["servers"]})
+
+
+def _route(method: str, pattern: str, handler: Callable) -> Route:
+    return method, re.compile(pattern), handler
+
+
+H = _FunctionsRequestHandler
+ROUTES: List[Route] = [
+    _route("GET", r"/api/health", H.health),
+    _route("POST", r"/api/checkout/create", H.checkout_create),
+    _route("POST", r"/api/servers/provision", H.servers_provision),
+    _route("GET", r"/api/servers", H.servers_list),
+    _route("GET", r"/api/servers/([^/]+)", H.server_get),
+    _route("PATCH", r"/api/servers/([^/]+)", H.server_patch),
+    _route("DELETE", r"/api/servers/([^/]+)", H.server_delete),
+    _route("POST", r"/api/servers/([^/]+)/(stop|start|command|backup|restore)", H.server_action),
+    _route("GET", r"/api/subscriptions/([^/]+)", H.subscription_get),
+    _route("POST", r"/api/subscriptions/([^/]+)/cancel", H.subscription_cancel),
+    _route("GET", r"/api/auth/me", H.auth_me),
+    _route("GET", r"/api/auth/login/aad", H.auth_login),
+    _route("GET", r"/api/auth/callback", H.auth_callback),
+    _route("GET", r"/api/auth/logout", H.auth_logout),
+    _route("GET", r"/api/game-servers", H.game_servers),
+    _route("POST", r"/api/game-servers/([^/]+)/restart", H.game_server_restart),
+    _route("GET", r"/api/server/list", H.legacy_server_list),
+]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the mock realm-functions API")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_FUNCTIONS_PORT", "7072")))
+    args = parser.parse_args()
+
+    os.environ["MOCK_FUNCTIONS_PORT"] = str(args.port)
+    api = MockFunctionsApi.from_env().start()
+    print(f"⚙️  Mock Functions API: {api.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        api.stop()
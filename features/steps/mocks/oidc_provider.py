@@ -0,0 +1,450 @@
+"""
+Local OpenID Connect identity provider standing in for Azure AD.
+
+Serves Azure-AD-shaped authorize, token, discovery and JWKS endpoints from a
+background thread, with configurable users and roles, HS256-signed tokens and
+the optional "Stay signed in?" and consent prompts. The login pages use the
+same form fields as login.microsoftonline.com, so AzureADProvider drives them
+unchanged once SSO_IDP_URL points here.
+
+Run standalone for a local Functions host:
+    python features/steps/mocks/oidc_provider.py --port 8400
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import html
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+DEFAULT_CLIENT_ID = "realm-e2e-mock-client"
+DEFAULT_TENANT = "mock-tenant"
+DEFAULT_SIGNING_KEY = "realm-e2e-mock-idp-signing-key"
+
+
+@dataclass
+class IdpUser:
+    """A user the mock identity provider can sign in"""
+    email: str
+    password: str
+    name: str = "Test User"
+    roles: List[str] = field(default_factory=list)
+    oid: str = ""
+
+    def __post_init__(self):
+        if not self.oid:
+            self.oid = hashlib.sha256(self.email.lower().encode()).hexdigest()[:32]
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class MockOidcProvider:
+    """In-process OIDC/OAuth2 provider for offline SSO scenarios"""
+
+    def __init__(self, users: Optional[List[IdpUser]] = None, host: str = "127.0.0.1", port: int = 0,
+                 signing_key: str = DEFAULT_SIGNING_KEY, tenant: str = DEFAULT_TENANT,
+                 stay_signed_in_prompt: bool = True, consent_prompt: bool = False,
+                 token_lifetime: int = 3600, latency_ms: int = 0):
+        self.users = {u.email.lower(): u for u in (users or [])}
+        self.host = host
+        self.port = port
+        self.signing_key = signing_key.encode()
+        self.kid = hashlib.sha256(self.signing_key).hexdigest()[:16]
+        self.tenant = tenant
+        self.stay_signed_in_prompt = stay_signed_in_prompt
+        self.consent_prompt = consent_prompt
+        self.token_lifetime = token_lifetime
+        self.latency_ms = latency_ms
+
+        self._flows: Dict[str, Dict[str, Any]] = {}
+        self._codes: Dict[str, Dict[str, Any]] = {}
+        self._consents = set()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> "MockOidcProvider":
+        """Build from MOCK_IDP_* settings; users from MOCK_IDP_USERS (JSON file) or the SSO test user"""
+        users_file = os.getenv("MOCK_IDP_USERS")
+        if users_file:
+            with open(users_file) as f:
+                users = [IdpUser(**u) for u in json.load(f)]
+        else:
+            users = [IdpUser(
+                email=os.getenv("SSO_TEST_USER_EMAIL", "test.sso.user@xevolve.io"),
+                password=os.getenv("SSO_TEST_USER_PASSWORD", ""),
+                name="SSO Test User",
+                roles=["user"],
+            )]
+        return cls(
+            users=users,
+            port=int(os.getenv("MOCK_IDP_PORT", "0")),
+            signing_key=os.getenv("MOCK_IDP_SIGNING_KEY", DEFAULT_SIGNING_KEY),
+            stay_signed_in_prompt=os.getenv("MOCK_IDP_STAY_SIGNED_IN", "true").lower() == "true",
+            consent_prompt=os.getenv("MOCK_IDP_CONSENT", "false").lower() == "true",
+            token_lifetime=int(os.getenv("MOCK_IDP_TOKEN_LIFETIME", "3600")),
+            latency_ms=int(os.getenv("MOCK_IDP_LATENCY_MS", "0")),
+        )
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self) -> "MockOidcProvider":
+        provider = self
+
+        class Handler(_OidcRequestHandler):
+            idp = provider
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-oidc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def issuer(self) -> str:
+        return f"{self.url}/{self.tenant}/v2.0"
+
+    def add_user(self, user: IdpUser):
+        self.users[user.email.lower()] = user
+
+    # ==================== TOKENS ====================
+
+    def issue_token(self, user: IdpUser, audience: str, nonce: Optional[str] = None,
+                    lifetime: Optional[int] = None) -> str:
+        """Sign an Azure-AD-shaped JWT for the user"""
+        now = int(time.time())
+        claims = {
+            "iss": self.issuer,
+            "aud": audience,
+            "sub": user.oid,
+            "oid": user.oid,
+            "tid": self.tenant,
+            "email": user.email,
+            "preferred_username": user.email,
+            "name": user.name,
+            "roles": user.roles,
+            "iat": now,
+            "nbf": now,
+            "exp": now + (lifetime or self.token_lifetime),
+            "ver": "2.0",
+        }
+        if nonce:
+            claims["nonce"] = nonce
+        header = {"alg": "HS256", "typ": "JWT", "kid": self.kid}
+        signing_input = f"{_b64url(json.dumps(header).encode())}.{_b64url(json.dumps(claims).encode())}"
+        signature = hmac.new(self.signing_key, signing_input.encode(), hashlib.sha256).digest()
+        return f"{signing_input}.{_b64url(signature)}"
+
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the claims of a token this provider signed and that has not expired"""
+        try:
+            header, payload, signature = token.split(".")
+        except (AttributeError, ValueError):
+            return None
+        expected = hmac.new(self.signing_key, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        try:
+            if not hmac.compare_digest(expected, _b64url_decode(signature)):
+                return None
+            claims = json.loads(_b64url_decode(payload))
+        except (ValueError, binascii.Error):
+            # Not base64url or not JSON: a malformed token, not a server error
+            return None
+        if not isinstance(claims, dict) or claims.get("exp", 0) <= time.time():
+            return None
+        return claims
+
+    def _token_response(self, user: IdpUser, client_id: str, nonce: Optional[str], scope: str) -> Dict[str, Any]:
+        return {
+            "token_type": "Bearer",
+            "scope": scope,
+            "expires_in": self.token_lifetime,
+            "access_token": self.issue_token(user, client_id),
+            "id_token": self.issue_token(user, client_id, nonce=nonce),
+            "refresh_token": secrets.token_urlsafe(24),
+        }
+
+    def jwks(self) -> Dict[str, Any]:
+        return {"keys": [{"kty": "oct", "use": "sig", "alg": "HS256", "kid": self.kid, "k": _b64url(self.signing_key)}]}
+
+    def discovery(self) -> Dict[str, Any]:
+        base = f"{self.url}/{self.tenant}"
+        return {
+            "issuer": self.issuer,
+            "authorization_endpoint": f"{base}/oauth2/v2.0/authorize",
+            "token_endpoint": f"{base}/oauth2/v2.0/token",
+            "end_session_endpoint": f"{base}/oauth2/v2.0/logout",
+            "jwks_uri": f"{base}/discovery/v2.0/keys",
+            "response_types_supported": ["code"],
+            "grant_types_supported": ["authorization_code", "password", "refresh_token"],
+            "subject_types_supported": ["pairwise"],
+            "id_token_signing_alg_values_supported": ["HS256"],
+            "scopes_supported": ["openid", "profile", "email", "offline_access"],
+        }
+
+    # ==================== LOGIN FLOW ====================
+
+    def begin_flow(self, params: Dict[str, str]) -> str:
+        flow_id = secrets.token_urlsafe(16)
+        with self._lock:
+            self._flows[flow_id] = {"params": params, "user": None}
+        return flow_id
+
+    def advance_flow(self, flow_id: str, form: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Apply one submitted login page and decide what comes next.
+
+        Returns {"page": name, ...} for another page or {"redirect": url}.
+        """
+        with self._lock:
+            flow = self._flows.get(flow_id)
+        if flow is None:
+            return {"page": "error", "message": "This sign-in session has expired. Please start again."}
+
+        step = form.get("step")
+        if step == "email":
+            user = self.users.get(form.get("login", "").strip().lower())
+            if user is None:
+                return {"page": "email", "error": "This username may be incorrect."}
+            with self._lock:
+                flow["user"] = user
+            return {"page": "password", "email": user.email}
+
+        with self._lock:
+            user = flow["user"]
+        if user is None:
+            return {"page": "email"}
+
+        if step == "password":
+            if form.get("passwd", "") != user.password:
+                return {"page": "password", "email": user.email,
+                        "error": "Your account or password is incorrect."}
+            if self.stay_signed_in_prompt:
+                return {"page": "stay_signed_in"}
+        elif step == "consent":
+            if form.get("choice") != "Accept":
+                return {"redirect": self._error_redirect(flow, "consent_required")}
+            with self._lock:
+                self._consents.add((user.email.lower(), flow["params"].get("client_id")))
+
+        client_id = flow["params"].get("client_id", DEFAULT_CLIENT_ID)
+        with self._lock:
+            consented = (user.email.lower(), client_id) in self._consents
+        if self.consent_prompt and step != "consent" and not consented:
+            return {"page": "consent"}
+
+        return {"redirect": self._code_redirect(flow_id, flow)}
+
+    def _code_redirect(self, flow_id: str, flow: Dict[str, Any]) -> str:
+        params = flow["params"]
+        code = secrets.token_urlsafe(24)
+        with self._lock:
+            self._flows.pop(flow_id, None)
+            self._codes[code] = {
+                "user": flow["user"],
+                "client_id": params.get("client_id", DEFAULT_CLIENT_ID),
+                "redirect_uri": params.get("redirect_uri"),
+                "nonce": params.get("nonce"),
+                "scope": params.get("scope", "openid"),
+            }
+        query = {"code": code}
+        if params.get("state"):
+            query["state"] = params["state"]
+        return self._append_query(params["redirect_uri"], query)
+
+    def _error_redirect(self, flow: Dict[str, Any], error: str) -> str:
+        params = flow["params"]
+        query = {"error": error}
+        if params.get("state"):
+            query["state"] = params["state"]
+        return self._append_query(params["redirect_uri"], query)
+
+    @staticmethod
+    def _append_query(url: str, query: Dict[str, str]) -> str:
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}{urlencode(query)}"
+
+    def exchange(self, form: Dict[str, str]) -> Dict[str, Any]:
+        """Token endpoint: authorization_code, password and refresh_token grants"""
+        grant = form.get("grant_type")
+        if grant == "authorization_code":
+            with self._lock:
+                grant_data = self._codes.pop(form.get("code", ""), None)
+            if grant_data is None:
+                return {"error": "invalid_grant", "error_description": "Code is invalid or was already used"}
+            if form.get("redirect_uri") and form["redirect_uri"] != grant_data["redirect_uri"]:
+                return {"error": "invalid_grant", "error_description": "redirect_uri does not match"}
+            return self._token_response(grant_data["user"], grant_data["client_id"],
+                                        grant_data["nonce"], grant_data["scope"])
+        if grant == "password":
+            user = self.users.get(form.get("username", "").lower())
+            if user is None or user.password != form.get("password", ""):
+                return {"error": "invalid_grant", "error_description": "Invalid username or password"}
+            return self._token_response(user, form.get("client_id", DEFAULT_CLIENT_ID), None,
+                                        form.get("scope", "openid"))
+        if grant == "refresh_token":
+            return {"error": "invalid_grant", "error_description": "Refresh tokens are not persisted by the mock"}
+        return {"error": "unsupported_grant_type"}
+
+
+# ==================== HTTP ====================
+
+_PAGE = """<!DOCTYPE html>
+<html><head><title>Sign in to your account</title></head>
+<body><main>
+<form method="post" action="{action}">
+<input type="hidden" name="flow" value="{flow}">
+<input type="hidden" name="step" value="{step}">
+{body}
+</form>
+</main></body></html>"""
+
+_BODIES = {
+    "email": """<h1>Sign in</h1>{error}
+<input type="email" name="login" placeholder="Email, phone, or Skype" autofocus>
+<input type="submit" id="idSIButton9" value="Next">""",
+    "password": """<h1>Enter password</h1><div>{email}</div>{error}
+<input type="password" name="passwd" placeholder="Password" autofocus>
+<input type="submit" id="idSIButton9" value="Sign in">""",
+    "stay_signed_in": """<h1>Stay signed in?</h1>
+<p>Do this to reduce the number of times you are asked to sign in.</p>
+<input type="submit" id="idBtn_Back" name="choice" value="No">
+<input type="submit" id="idSIButton9" name="choice" value="Yes">""",
+    "consent": """<h1>Permissions requested</h1>
+<p>This application would like to sign you in and read your profile.</p>
+<input type="submit" id="idBtn_Back" name="choice" value="Cancel">
+<input type="submit" id="idSIButton9" name="choice" value="Accept">""",
+    "error": """<h1>Sorry, but we're having trouble signing you in.</h1><p>{message}</p>""",
+}
+
+
+class _OidcRequestHandler(BaseHTTPRequestHandler):
+    idp: MockOidcProvider = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        if self.idp.latency_ms:
+            time.sleep(self.idp.latency_ms / 1000)
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8",
+              headers: Optional[Dict[str, str]] = None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        self._send(status, json.dumps(payload), "application/json")
+
+    def _redirect(self, location: str):
+        self._send(302, "", headers={"Location": location})
+
+    def _render(self, flow_id: str, page: str, **values: str):
+        escaped = {k: html.escape(v or "") for k, v in values.items()}
+        if escaped.get("error"):
+            escaped["error"] = f'<div role="alert" id="usernameError">{escaped["error"]}</div>'
+        body = _BODIES[page].format(**{"error": "", "email": "", "message": "", **escaped})
+        action = f"/{self.idp.tenant}/oauth2/v2.0/authorize/flow"
+        self._send(200, _PAGE.format(action=action, flow=html.escape(flow_id), step=page, body=body))
+
+    def _form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode() if length else ""
+        return {k: v[0] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if path.endswith("/.well-known/openid-configuration"):
+            self._send_json(200, self.idp.discovery())
+        elif path.endswith("/discovery/v2.0/keys"):
+            self._send_json(200, self.idp.jwks())
+        elif path.endswith("/oauth2/v2.0/authorize"):
+            if not query.get("redirect_uri"):
+                self._send(400, "redirect_uri is required", "text/plain")
+                return
+            flow_id = self.idp.begin_flow(query)
+            hint = query.get("login_hint", "").lower()
+            if hint in self.idp.users:
+                self.idp.advance_flow(flow_id, {"step": "email", "login": hint})
+                self._render(flow_id, "password", email=hint)
+            else:
+                self._render(flow_id, "email")
+        elif path.endswith("/oauth2/v2.0/logout"):
+            target = query.get("post_logout_redirect_uri")
+            if target:
+                self._redirect(target)
+            else:
+                self._send(200, "<h1>You signed out of your account</h1>")
+        else:
+            self._send(404, "Not found", "text/plain")
+
+    def do_POST(self):
+        self._delay()
+        path = urlparse(self.path).path.rstrip("/")
+        form = self._form()
+
+        if path.endswith("/oauth2/v2.0/authorize/flow"):
+            flow_id = form.get("flow", "")
+            outcome = self.idp.advance_flow(flow_id, form)
+            if "redirect" in outcome:
+                self._redirect(outcome["redirect"])
+            else:
+                page = outcome.pop("page")
+                self._render(flow_id, page, **outcome)
+        elif path.endswith("/oauth2/v2.0/token"):
+            payload = self.idp.exchange(form)
+            self._send_json(400 if "error" in payload else 200, payload)
+        else:
+            self._send(404, "Not found", "text/plain")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the mock OIDC identity provider")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_IDP_PORT", "8400")))
+    args = parser.parse_args()
+
+    os.environ["MOCK_IDP_PORT"] = str(args.port)
+    idp = MockOidcProvider.from_env().start()
+    print(f"🔐 Mock identity provider: {idp.issuer}")
+    print(f"   Discovery: {idp.issuer}/.well-known/openid-configuration")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        idp.stop()
@@ -0,0 +1,21 @@
+"""Perf package - timing history and performance instrumentation for the harness"""
+import os
+import sys
+
+# Ensure this directory is in path
+_dir = os.path.dirname(__file__)
+if _dir not in sys.path:
+    sys.path.insert(0, _dir)
+
+from timing_history import TimingHistory, scenario_key
+from provisioning_metrics import ProvisioningMetrics, percentile
+from api_timings import ScenarioApiTimings
+from baseline_store import BaselineStore, samples_from_report
+from spans import Span, SpanRecorder
+from wait_budget import Wait, WaitAccountant, combine_wait_reports, print_wait_summary, wait_accounting_enabled
+from regression import Budget, MetricComparison, compare, load_budgets, mann_whitney_greater
+
+__all__ = ["TimingHistory", "scenario_key", "ProvisioningMetrics", "percentile", "ScenarioApiTimings",
+           "BaselineStore", "samples_from_report", "Budget", "MetricComparison", "compare", "load_budgets",
+           "mann_whitney_greater", "Span", "SpanRecorder", "Wait", "WaitAccountant", "combine_wait_reports",
+           "print_wait_summary", "wait_accounting_enabled"]
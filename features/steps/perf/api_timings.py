@@ -0,0 +1,66 @@
+"""
+Per-scenario API timings.
+
+Listens to the FunctionsClient and keeps the calls a scenario makes, so the
+latency steps can assert on them and the hooks can attach each step's calls
+to the JSON report. Only calls from the scenario's own thread are kept;
+background work (readiness watchers, pool resets) runs on other threads.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+from provisioning_metrics import percentile
+
+
+class ScenarioApiTimings:
+    """API calls made by one scenario, as recorded by the client"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls: List[Any] = []
+        self._thread = threading.get_ident()
+        self._step_start = 0
+
+    def start(self) -> "ScenarioApiTimings":
+        self.client.add_listener(self._on_call)
+        return self
+
+    def stop(self):
+        self.client.remove_listener(self._on_call)
+
+    def _on_call(self, call):
+        if threading.get_ident() == self._thread:
+            self.calls.append(call)
+
+    # ==================== STEPS ====================
+
+    def mark_step(self):
+        """Start counting calls for the next step"""
+        self._step_start = len(self.calls)
+
+    def step_calls(self) -> List[Any]:
+        return self.calls[self._step_start:]
+
+    # ==================== REPORTING ====================
+
+    def timings(self, calls: Optional[List[Any]] = None) -> List[float]:
+        return [call.elapsed_ms for call in (self.calls if calls is None else calls)]
+
+    def summary(self, calls: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Percentiles and individual calls, as embedded in the JSON report"""
+        calls = self.calls if calls is None else calls
+        timings = self.timings(calls) or [0.0]
+        return {
+            "count": len(calls),
+            "p50_ms": round(percentile(timings, 50), 1),
+            "p95_ms": round(percentile(timings, 95), 1),
+            "p99_ms": round(percentile(timings, 99), 1),
+            "max_ms": round(max(timings), 1),
+            "calls": [{
+                "method": call.method,
+                "path": call.path,
+                "status": call.status,
+                "elapsed_ms": round(call.elapsed_ms, 1),
+                **({"error": call.error} if call.error else {}),
+            } for call in calls],
+        }
@@ -0,0 +1,170 @@
+"""
+Performance baseline store.
+
+Timings from each run's Behave JSON report are kept in a local SQLite
+database, keyed by git SHA and environment, so later runs can be compared
+against a rolling baseline of earlier ones. A sample is a (kind, name,
+metric, value) row:
+
+    scenario  features/web/dashboard.feature::Open dashboard   duration_ms
+    step      <scenario key>::When I open the dashboard        duration_ms
+    endpoint  POST /api/servers/provision                      elapsed_ms
+    page      /dashboard                                       lcp, fcp, ttfb, cls, tbt
+"""
+import base64
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from timing_history import scenario_key
+
+
+DEFAULT_DB_FILE = ".perf-baseline.db"
+
+# Web Vitals kept per page, as collected by browser/web_vitals.py
+PAGE_METRICS = ("ttfb", "fcp", "lcp", "cls", "tbt")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_environment ON runs (environment, id);
+CREATE INDEX IF NOT EXISTS samples_by_run ON samples (run_id);
+"""
+
+Sample = Tuple[str, str, str, float]
+MetricKey = Tuple[str, str, str]
+
+
+def _embedded(step: Dict[str, Any], key: str) -> Iterable[Any]:
+    """JSON payloads the hooks attached to a step under the given key"""
+    for embedding in step.get("embeddings", []):
+        if embedding.get("mime_type") != "application/json":
+            continue
+        try:
+            payload = json.loads(base64.b64decode(embedding["data"]))
+        except (ValueError, KeyError):
+            continue
+        if key in payload:
+            yield payload[key]
+
+
+def _page_name(url: str) -> str:
+    """'https://dev.realmgrid.com/dashboard?tab=1' -> '/dashboard'"""
+    path = url.split("://", 1)[-1]
+    path = "/" + path.split("/", 1)[1] if "/" in path else "/"
+    return path.split("?", 1)[0].split("#", 1)[0]
+
+
+def samples_from_report(features: List[Dict[str, Any]]) -> List[Sample]:
+    """Timing samples from a Behave JSON report (plain or merged by the parallel runner)"""
+    # Imported here so the store can be used without the api package on the path
+    from functions_client import endpoint_name
+
+    samples: List[Sample] = []
+    for feature in features:
+        for element in feature.get("elements", []):
+            if element.get("type") == "background":
+                continue
+            filename = element.get("location", feature.get("location", "")).rsplit(":", 1)[0]
+            key = scenario_key(filename, element.get("name", ""))
+            steps = element.get("steps", [])
+            results = [step.get("result", {}) for step in steps]
+            if not steps or any(result.get("status") != "passed" for result in results):
+                continue  # Failed or skipped scenarios say nothing about speed
+
+            samples.append(("scenario", key, "duration_ms",
+                            sum(result.get("duration", 0.0) for result in results) * 1000))
+            for step, result in zip(steps, results):
+                samples.append(("step", f"{key}::{step['keyword'].strip()} {step['name']}", "duration_ms",
+                                result.get("duration", 0.0) * 1000))
+                for timings in _embedded(step, "api_timings"):
+                    for call in timings.get("calls", []):
+                        if call.get("status") and call["status"] < 400:
+                            samples.append(("endpoint", endpoint_name(call["method"], call["path"]),
+                                            "elapsed_ms", call["elapsed_ms"]))
+                for vitals in _embedded(step, "web_vitals"):
+                    for metric in PAGE_METRICS:
+                        if vitals.get(metric) is not None:
+                            samples.append(("page", _page_name(vitals["url"]), metric, vitals[metric]))
+    return samples
+
+
+class BaselineStore:
+    """Timing samples of past runs, in a local SQLite database"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("PERF_BASELINE_DB", DEFAULT_DB_FILE)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ==================== RECORDING ====================
+
+    def record_run(self, sha: str, environment: str, samples: List[Sample],
+                   source: Optional[str] = None) -> int:
+        """Store one run's samples; returns the run ID"""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (sha, environment, recorded_at, source) VALUES (?, ?, ?, ?)",
+                (sha, environment, time.time(), source))
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO samples (run_id, kind, name, metric, value) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, *sample) for sample in samples])
+        return run_id
+
+    def prune(self, environment: str, keep: int):
+        """Drop all but the newest runs of an environment"""
+        with self.db:
+            self.db.execute(
+                "DELETE FROM runs WHERE environment = ? AND id NOT IN "
+                "(SELECT id FROM runs WHERE environment = ? ORDER BY id DESC LIMIT ?)",
+                (environment, environment, keep))
+
+    # ==================== QUERIES ====================
+
+    def runs(self, environment: str, limit: int, before: Optional[int] = None,
+             sha: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest runs of an environment, optionally before a run or for one SHA"""
+        query = "SELECT id, sha, environment, recorded_at, source FROM runs WHERE environment = ?"
+        args: List[Any] = [environment]
+        if before is not None:
+            query += " AND id < ?"
+            args.append(before)
+        if sha:
+            query += " AND sha LIKE ?"
+            args.append(f"{sha}%")
+        query += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        columns = ("id", "sha", "environment", "recorded_at", "source")
+        return [dict(zip(columns, row)) for row in self.db.execute(query, args)]
+
+    def samples(self, run_ids: List[int]) -> Dict[MetricKey, List[float]]:
+        """Sample values of the given runs, per (kind, name, metric)"""
+        grouped: Dict[MetricKey, List[float]] = {}
+        if not run_ids:
+            return grouped
+        placeholders = ",".join("?" * len(run_ids))
+        rows = self.db.execute(
+            f"SELECT kind, name, metric, value FROM samples WHERE run_id IN ({placeholders})", run_ids)
+        for kind, name, metric, value in rows:
+            grouped.setdefault((kind, name, metric), []).append(value)
+        return grouped
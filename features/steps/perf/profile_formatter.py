@@ -0,0 +1,85 @@
+"""
+Profiling formatter: where the suite's time goes.
+
+Records a span per feature, scenario and step, with the Playwright actions,
+expect() waits, sleeps and HTTP calls of each step nested inside (see
+spans.py). At the end of the run it writes Chrome trace-event JSON to the
+formatter's output file and collapsed stacks next to it (.folded), ready for
+flamegraph.pl, speedscope or Perfetto:
+
+    behave -f profile -o reports/profile.json -f pretty
+"""
+import json
+import os
+
+from behave.formatter.base import Formatter
+
+from spans import SpanRecorder
+
+
+DEFAULT_TRACE_FILE = os.path.join("reports", "profile.json")
+
+
+class ProfileFormatter(Formatter):
+    """Writes a hierarchical timing profile of the run"""
+
+    name = "profile"
+    description = "Chrome trace and flamegraph profile of features, scenarios, steps and their actions"
+
+    def __init__(self, stream_opener, config):
+        super().__init__(stream_opener, config)
+        self.recorder = SpanRecorder().start()
+
+    # ==================== MODEL EVENTS ====================
+
+    def feature(self, feature):
+        self.recorder.end_category("feature")
+        self.recorder.begin(f"Feature: {feature.name}", "feature", location=str(feature.location))
+
+    def background(self, background):
+        pass
+
+    def scenario(self, scenario):
+        self.recorder.end_category("scenario")
+        self.recorder.begin(f"Scenario: {scenario.name}", "scenario", location=str(scenario.location))
+
+    def step(self, step):
+        pass
+
+    def match(self, match):
+        # Called right before the step runs (hooks included)
+        self.recorder.end_category("step")
+        self.recorder.begin("step", "step", location=str(getattr(match, "location", "")))
+
+    def result(self, step):
+        span = self.recorder.current
+        while span is not None and span.category != "step":
+            span = span.parent
+        if span is None:
+            return  # Skipped or undefined: never matched, nothing ran
+        span.name = f"{step.keyword} {step.name}"
+        self.recorder.end(span, status=step.status.name)
+
+    def eof(self):
+        self.recorder.end_category("feature")
+
+    # ==================== OUTPUT ====================
+
+    def close(self):
+        self.recorder.stop()
+        if self.stdout_mode:
+            os.makedirs(os.path.dirname(DEFAULT_TRACE_FILE), exist_ok=True)
+            trace_path = DEFAULT_TRACE_FILE
+            with open(trace_path, "w") as f:
+                json.dump({"traceEvents": self.recorder.trace_events(), "displayTimeUnit": "ms"}, f)
+        else:
+            trace_path = self.stream_opener.name
+            stream = self.open()
+            json.dump({"traceEvents": self.recorder.trace_events(), "displayTimeUnit": "ms"}, stream)
+            self.close_stream()
+
+        folded_path = os.path.splitext(trace_path)[0] + ".folded"
+        with open(folded_path, "w") as f:
+            for stack, micros in sorted(self.recorder.collapsed_stacks().items()):
+                f.write(f"{stack} {micros}\n")
+        print(f"🔥 Profile: {trace_path} (Chrome trace), {folded_path} (collapsed stacks)")
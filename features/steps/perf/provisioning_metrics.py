@@ -0,0 +1,78 @@
+"""
+Provisioning-latency metrics.
+
+Every watched provision is appended to an NDJSON file (one line per server,
+safe for concurrent parallel workers), so the time to each pod phase builds
+up a distribution across runs.
+"""
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_METRICS_FILE = "reports/provisioning.ndjson"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ProvisioningMetrics:
+    """Records provisioning timelines and summarizes them"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("PROVISIONING_METRICS_FILE", DEFAULT_METRICS_FILE)
+        self.recorded: List[Dict[str, Any]] = []
+
+    def record(self, timeline, **labels: Any):
+        """Append one timeline (see api/readiness.py) with labels such as game type and tier"""
+        entry = {
+            "timestamp": time.time(),
+            "server_id": timeline.server_id,
+            "provision_seconds": timeline.provision_seconds,
+            "phases": timeline.phases,
+            "ready": timeline.ready,
+            "polls": timeline.polls,
+            "error": timeline.error,
+            **labels,
+        }
+        self.recorded.append(entry)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Every entry recorded so far, across runs"""
+        try:
+            with open(self.path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def summary(self, entries: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/max seconds to each phase"""
+        entries = self.load() if entries is None else entries
+        by_phase: Dict[str, List[float]] = {}
+        for entry in entries:
+            for phase, seconds in entry.get("phases", {}).items():
+                by_phase.setdefault(phase, []).append(seconds)
+        return {
+            phase: {"count": len(values), "p50": percentile(values, 50),
+                    "p95": percentile(values, 95), "max": max(values)}
+            for phase, values in by_phase.items()
+        }
+
+    def print_summary(self):
+        if not self.recorded:
+            return
+        failed = sum(1 for entry in self.recorded if not entry["ready"])
+        print(f"🚀 Provisioned {len(self.recorded)} servers ({failed} not ready); time to phase across runs:")
+        for phase, s in self.summary().items():
+            print(f"   {phase}: p50 {s['p50']:.1f}s, p95 {s['p95']:.1f}s, max {s['max']:.1f}s (n={s['count']})")
@@ -0,0 +1,160 @@
+"""
+Regression detection against a performance baseline.
+
+Each metric of the current run is compared with the same metric over a
+rolling window of earlier runs using a one-sided Mann-Whitney U test (exact
+for small tie-free samples, normal approximation otherwise). A metric is a
+regression when the slowdown is both significant and large enough to matter;
+budgets are absolute limits on the p95 of the current run.
+"""
+import fnmatch
+import json
+import math
+import statistics
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from provisioning_metrics import percentile
+
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_CHANGE = 0.2
+# Milliseconds; keeps jitter on very fast calls from counting (not applied to CLS)
+DEFAULT_MIN_DELTA_MS = 10.0
+
+# Largest n1 * n2 for which the exact U distribution is computed
+EXACT_LIMIT = 400
+
+
+@lru_cache(maxsize=None)
+def _u_counts(n1: int, n2: int) -> Tuple[int, ...]:
+    """Number of orderings giving each U statistic 0..n1*n2 (no ties)"""
+    # counts[i][j]: the largest of i + j values is either from the first sample
+    # (U grows by j) or from the second; built row by row
+    previous = [(1,)] * (n2 + 1)
+    for i in range(1, n1 + 1):
+        row = [(1,)]
+        for j in range(1, n2 + 1):
+            first = (0,) * j + previous[j]
+            second = row[j - 1] + (0,) * i
+            row.append(tuple(a + b for a, b in zip(first, second)))
+        previous = row
+    return previous[n2]
+
+
+def _midranks(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """One-sided p-value that current values tend to be larger than baseline values"""
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = current + baseline
+    ranks = _midranks(combined)
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+    tie_sizes = [count for count in Counter(combined).values() if count > 1]
+    if not tie_sizes and n1 * n2 <= EXACT_LIMIT:
+        counts = _u_counts(min(n1, n2), max(n1, n2))
+        return sum(counts[math.ceil(u):]) / math.comb(n1 + n2, n1)
+
+    n = n1 + n2
+    tie_term = sum(t ** 3 - t for t in tie_sizes) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# ==================== BUDGETS ====================
+
+@dataclass
+class Budget:
+    """Upper limit on the p95 of matching metrics; name is an fnmatch pattern"""
+    kind: str
+    name: str
+    metric: str
+    max: float
+
+    def matches(self, kind: str, name: str, metric: str) -> bool:
+        return self.kind == kind and self.metric == metric and fnmatch.fnmatchcase(name, self.name)
+
+
+def load_budgets(path: str) -> List[Budget]:
+    """Budgets from a JSON file ({"budgets": [{"kind", "name", "metric", "max"}]})"""
+    try:
+        with open(path) as f:
+            return [Budget(**entry) for entry in json.load(f).get("budgets", [])]
+    except FileNotFoundError:
+        return []
+
+
+# ==================== COMPARISON ====================
+
+@dataclass
+class MetricComparison:
+    """One metric of the current run against its baseline"""
+    kind: str
+    name: str
+    metric: str
+    current_median: float
+    current_p95: float
+    baseline_median: Optional[float] = None
+    baseline_count: int = 0
+    p_value: Optional[float] = None
+    regression: bool = False
+    budget: Optional[float] = None
+
+    @property
+    def change(self) -> Optional[float]:
+        if not self.baseline_median:
+            return None
+        return self.current_median / self.baseline_median - 1
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.current_p95 > self.budget
+
+    def to_json(self) -> Dict[str, Any]:
+        return {**self.__dict__, "change": self.change, "over_budget": self.over_budget}
+
+
+def compare(current: Dict[Tuple[str, str, str], List[float]],
+            baseline: Dict[Tuple[str, str, str], List[float]],
+            budgets: List[Budget], alpha: float = DEFAULT_ALPHA,
+            min_change: float = DEFAULT_MIN_CHANGE, min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+            min_baseline: int = 5) -> List[MetricComparison]:
+    """Compare every metric of the current run with the baseline and the budgets"""
+    results = []
+    for (kind, name, metric), values in sorted(current.items()):
+        result = MetricComparison(kind, name, metric,
+                                  current_median=statistics.median(values),
+                                  current_p95=percentile(values, 95))
+        history = baseline.get((kind, name, metric), [])
+        if len(history) >= min_baseline:
+            result.baseline_median = statistics.median(history)
+            result.baseline_count = len(history)
+            result.p_value = mann_whitney_greater(values, history)
+            min_delta = 0.0 if metric == "cls" else min_delta_ms
+            result.regression = (result.p_value < alpha and result.change is not None
+                                 and result.change >= min_change
+                                 and result.current_median - result.baseline_median >= min_delta)
+        budget = next((b for b in budgets if b.matches(kind, name, metric)), None)
+        result.budget = budget.max if budget else None
+        results.append(result)
+    return results
@@ -0,0 +1,272 @@
+"""
+Hierarchical timing spans for the scenario thread.
+
+A SpanRecorder keeps a tree of spans (feature, scenario, step and whatever
+runs inside a step). While a recorder is active, Playwright actions and
+expect() assertions, time.sleep and HTTP calls made through requests are
+timed as child spans of the current step; calls from background threads are
+ignored. The tree can be exported as Chrome trace events or as collapsed
+stacks for flamegraph tools.
+"""
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Span:
+    """One timed operation and the operations inside it"""
+    name: str
+    category: str
+    start: float
+    end: Optional[float] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+    parent: Optional["Span"] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def self_time(self) -> float:
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+    def walk(self) -> Iterator["Span"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class SpanRecorder:
+    """Span tree of the thread that runs the scenarios"""
+
+    # The recorder the instrumentation reports to, if any
+    active: Optional["SpanRecorder"] = None
+
+    def __init__(self, keep_tree: bool = True):
+        # Without the tree, spans are only reported to listeners once closed
+        self.keep_tree = keep_tree
+        self.origin = time.perf_counter()
+        self.roots: List[Span] = []
+        self.current: Optional[Span] = None
+        self.listeners: List[Callable[[Span], None]] = []
+        self._thread = threading.get_ident()
+
+    def start(self) -> "SpanRecorder":
+        """Instrument Playwright, sleeps and HTTP, and record on this thread"""
+        instrument()
+        self._thread = threading.get_ident()
+        SpanRecorder.active = self
+        return self
+
+    def stop(self):
+        while self.current is not None:
+            self.end()
+        if SpanRecorder.active is self:
+            SpanRecorder.active = None
+
+    def on_thread(self) -> bool:
+        return threading.get_ident() == self._thread
+
+    # ==================== SPANS ====================
+
+    def begin(self, name: str, category: str, **args: Any) -> Span:
+        span = Span(name, category, time.perf_counter(), args=args, parent=self.current)
+        if self.current is not None:
+            self.current.children.append(span)
+        elif self.keep_tree:
+            self.roots.append(span)
+        self.current = span
+        return span
+
+    def end(self, span: Optional[Span] = None, **args: Any):
+        """End the given span (and any still open inside it), or the current one"""
+        target = span or self.current
+        while self.current is not None:
+            closing = self.current
+            closing.end = time.perf_counter()
+            self.current = closing.parent
+            for listener in self.listeners:
+                listener(closing)
+            if closing is target:
+                closing.args.update(args)
+                break
+
+    def end_category(self, category: str):
+        """End the innermost open span of a category, if any"""
+        span = self.current
+        while span is not None and span.category != category:
+            span = span.parent
+        if span is not None:
+            self.end(span)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any):
+        span = self.begin(name, category, **args)
+        try:
+            yield span
+        except BaseException as e:
+            span.args["error"] = type(e).__name__
+            raise
+        finally:
+            self.end(span)
+
+    # ==================== EXPORT ====================
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Chrome trace-event 'complete' events (chrome://tracing, Perfetto, speedscope)"""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "behave"}}]
+        for root in self.roots:
+            for span in root.walk():
+                events.append({
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((span.start - self.origin) * 1e6, 1),
+                    "dur": round(span.duration * 1e6, 1),
+                    "pid": pid,
+                    "tid": 0,
+                    "args": span.args,
+                })
+        return events
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """Self time in microseconds per stack, in Brendan Gregg's collapsed format"""
+        stacks: Dict[str, int] = {}
+
+        def visit(span: Span, prefix: str):
+            frame = span.name.replace(";", ",").replace("\n", " ")
+            stack = f"{prefix};{frame}" if prefix else frame
+            micros = int(span.self_time * 1e6)
+            if micros:
+                stacks[stack] = stacks.get(stack, 0) + micros
+            for child in span.children:
+                visit(child, stack)
+
+        for root in self.roots:
+            visit(root, "")
+        return stacks
+
+
+# ==================== INSTRUMENTATION ====================
+
+# Locator builders and event plumbing return immediately and would only add noise
+UNTIMED_METHODS = {
+    "locator", "nth", "filter", "and_", "or_", "frame_locator", "content_frame", "owner",
+    "on", "once", "remove_listener", "is_closed", "set_default_timeout",
+    "set_default_navigation_timeout", "main_frame", "frames", "frame", "context",
+}
+_SELECTOR = re.compile(r"selector='(.*)'>$")
+_LIBRARY_DIRS = (os.path.dirname(os.path.abspath(__file__)) + os.sep, os.sep + "site-packages" + os.sep)
+_instrumented = False
+_lock = threading.Lock()
+
+
+def caller_location() -> str:
+    """file:line of the harness code that made the current call"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if not any(directory in filename for directory in _LIBRARY_DIRS):
+            return f"{os.path.relpath(filename)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "?"
+
+
+def _span_args(target: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    args: Dict[str, Any] = {"source": caller_location()}
+    if "timeout" in kwargs:
+        args["timeout"] = kwargs["timeout"]
+    if type(target).__name__ == "Locator":
+        match = _SELECTOR.search(repr(target))
+        if match:
+            args["selector"] = match.group(1)
+    return args
+
+
+def _timed_method(owner: type, attr: str, category: str):
+    original = owner.__dict__[attr]
+    name = f"{owner.__name__}.{attr}"
+
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        recorder = SpanRecorder.active
+        if recorder is None or not recorder.on_thread():
+            return original(self, *args, **kwargs)
+        with recorder.span(name, category, **_span_args(self, kwargs)):
+            return original(self, *args, **kwargs)
+
+    setattr(owner, attr, wrapper)
+
+
+def _instrument_playwright():
+    from playwright import sync_api
+
+    classes = {
+        "playwright": ("Page", "Frame", "Locator", "BrowserContext", "Keyboard", "Mouse"),
+        "expect": ("LocatorAssertions", "PageAssertions", "APIResponseAssertions"),
+    }
+    for category, names in classes.items():
+        for class_name in names:
+            owner = getattr(sync_api, class_name, None)
+            if owner is None:
+                continue
+            for attr, value in list(vars(owner).items()):
+                if (attr.startswith(("_", "get_by_", "expect_")) or attr in UNTIMED_METHODS
+                        or not callable(value) or isinstance(value, (property, staticmethod, classmethod))):
+                    continue
+                _timed_method(owner, attr, category)
+
+
+def _instrument_sleep():
+    original = time.sleep
+
+    @functools.wraps(original)
+    def sleep(seconds):
+        recorder = SpanRecorder.active
+        if recorder is None or not recorder.on_thread():
+            return original(seconds)
+        with recorder.span(f"time.sleep({seconds:g}s)", "sleep", seconds=seconds, source=caller_location()):
+            return original(seconds)
+
+    time.sleep = sleep
+
+
+def _instrument_http():
+    import requests
+
+    original = requests.Session.request
+
+    @functools.wraps(original)
+    def request(self, method, url, *args, **kwargs):
+        recorder = SpanRecorder.active
+        if recorder is None or not recorder.on_thread():
+            return original(self, method, url, *args, **kwargs)
+        parts = urlsplit(url)
+        with recorder.span(f"{method.upper()} {parts.path}", "http", host=parts.netloc) as span:
+            response = original(self, method, url, *args, **kwargs)
+            span.args["status"] = response.status_code
+            return response
+
+    requests.Session.request = request
+
+
+def instrument():
+    """Patch Playwright, time.sleep and requests once per process"""
+    global _instrumented
+    with _lock:
+        if _instrumented:
+            return
+        _instrument_playwright()
+        _instrument_sleep()
+        _instrument_http()
+        _instrumented = True
@@ -0,0 +1,105 @@
+"""
+Per-scenario wall time history.
+
+Every run records how long each scenario took; the parallel runner reads the
+history to schedule the longest scenarios first. Entries are keyed by feature
+file and scenario name so they survive line-number changes in the feature.
+"""
+import json
+import os
+import statistics
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: history writes are not locked
+    fcntl = None
+
+
+DEFAULT_HISTORY_FILE = ".behave-timings.json"
+DEFAULT_ESTIMATE_SECONDS = 5.0
+
+# Weight of the newest run in the moving average
+SMOOTHING = 0.3
+
+
+def scenario_key(filename: str, name: str) -> str:
+    """Stable history key for a scenario"""
+    path = os.path.normpath(os.path.relpath(filename)).replace(os.sep, "/")
+    return f"{path}::{name}"
+
+
+class TimingHistory:
+    """Exponentially smoothed scenario durations stored in a local JSON file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BEHAVE_TIMINGS_FILE", DEFAULT_HISTORY_FILE)
+        self.entries: Dict[str, Dict[str, Any]] = self._read()
+        self._pending: Dict[str, List[float]] = {}
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    # ==================== RECORDING ====================
+
+    def record(self, key: str, seconds: float):
+        """Queue a measured duration; written by save()"""
+        self._pending.setdefault(key, []).append(seconds)
+
+    def save(self):
+        """Merge queued durations into the file (safe across parallel workers)"""
+        if not self._pending:
+            return
+        with self._locked():
+            entries = self._read()
+            for key, durations in self._pending.items():
+                for seconds in durations:
+                    entries[key] = self._updated(entries.get(key), seconds)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.entries = entries
+            self._pending = {}
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock on the history file while it is rewritten"""
+        with open(f"{self.path}.lock", "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _updated(entry: Optional[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+        if not entry:
+            return {"mean": round(seconds, 3), "last": round(seconds, 3), "max": round(seconds, 3), "runs": 1}
+        mean = SMOOTHING * seconds + (1 - SMOOTHING) * entry["mean"]
+        return {
+            "mean": round(mean, 3),
+            "last": round(seconds, 3),
+            "max": round(max(entry.get("max", seconds), seconds), 3),
+            "runs": entry.get("runs", 0) + 1,
+        }
+
+    # ==================== ESTIMATES ====================
+
+    def default_estimate(self) -> float:
+        """Estimate for scenarios without history: the median known duration"""
+        means = [entry["mean"] for entry in self.entries.values()]
+        return statistics.median(means) if means else DEFAULT_ESTIMATE_SECONDS
+
+    def estimate(self, key: str, default: Optional[float] = None) -> float:
+        entry = self.entries.get(key)
+        if entry:
+            return entry["mean"]
+        return self.default_estimate() if default is None else default
@@ -0,0 +1,183 @@
+"""
+Wasted-wait accounting.
+
+Listens to the span instrumentation (spans.py) for time the scenarios spend
+waiting without learning anything: explicit sleeps (time.sleep,
+page.wait_for_timeout) and Playwright waits or expect() assertions that ran
+into their timeout, including those a step catches and ignores. Each wait is
+attributed to the scenario, step and source line that made it; the run ends
+with a report of the costliest sources. An optional per-scenario budget turns
+an over-spending scenario into a failure. Accounting is off unless asked for
+(WAIT_REPORT=true or a WAIT_BUDGET_SECONDS budget), since it needs the
+instrumentation running.
+"""
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from spans import Span, SpanRecorder
+
+
+DEFAULT_REPORT_FILE = os.path.join("reports", "waits.json")
+
+EXPLICIT_WAITS = {"Page.wait_for_timeout", "Frame.wait_for_timeout"}
+TIMEOUT_ERRORS = {"TimeoutError", "AssertionError"}
+
+# Waits listed in the printed summary
+TOP_SOURCES = 10
+
+
+def wait_accounting_enabled() -> bool:
+    return os.getenv("WAIT_REPORT", "false").lower() == "true" or bool(os.getenv("WAIT_BUDGET_SECONDS"))
+
+
+@dataclass
+class Wait:
+    """One wasted wait"""
+    kind: str  # "sleep" or "timeout"
+    call: str
+    source: str
+    seconds: float
+    scenario: str
+    step: str
+
+
+class WaitAccountant:
+    """Attributes sleeps and timed-out waits to scenarios, steps and source lines"""
+
+    def __init__(self, recorder: Optional[SpanRecorder], budget_seconds: Optional[float] = None,
+                 report_path: Optional[str] = None):
+        self.recorder = recorder
+        budget = os.getenv("WAIT_BUDGET_SECONDS")
+        self.budget_seconds = budget_seconds if budget_seconds is not None else (float(budget) if budget else None)
+        self.report_path = report_path or os.getenv("WAIT_REPORT_FILE", DEFAULT_REPORT_FILE)
+        self.waits: List[Wait] = []
+        self.scenario = ""
+        self.step = ""
+        self.scenario_seconds = 0.0
+        self.scenario_totals: Dict[str, float] = {}
+        self.over_budget: Dict[str, float] = {}
+        # Without a recorder nothing is reported and every hook is a no-op
+        if recorder is not None:
+            recorder.listeners.append(self._on_span)
+
+    # ==================== SCENARIO TRACKING ====================
+
+    def begin_scenario(self, name: str):
+        self.scenario = name
+        self.step = ""
+        self.scenario_seconds = 0.0
+
+    def begin_step(self, name: str):
+        self.step = name
+
+    def end_scenario(self):
+        if self.scenario_seconds:
+            self.scenario_totals[self.scenario] = self.scenario_seconds
+
+    def check_budget(self):
+        """Fail the scenario once its waits exceed the budget (reported once per scenario)"""
+        if self.budget_seconds is None or self.scenario_seconds <= self.budget_seconds:
+            return
+        if self.scenario in self.over_budget:
+            return
+        self.over_budget[self.scenario] = self.scenario_seconds
+        sources = sorted((w for w in self.waits if w.scenario == self.scenario), key=lambda w: -w.seconds)
+        worst = ", ".join(f"{w.call} at {w.source} ({w.seconds:.1f}s)" for w in sources[:3])
+        raise AssertionError(f"Scenario spent {self.scenario_seconds:.1f}s in sleeps and timed-out waits, "
+                             f"budget {self.budget_seconds:g}s: {worst}")
+
+    # ==================== CLASSIFICATION ====================
+
+    def _on_span(self, span: Span):
+        if span.category == "sleep" or span.name in EXPLICIT_WAITS:
+            kind = "sleep"
+        elif span.category in ("playwright", "expect") and span.args.get("error") in TIMEOUT_ERRORS:
+            kind = "timeout"
+        else:
+            return
+        call = span.name
+        if "timeout" in span.args:
+            call += f"(timeout={span.args['timeout']})"
+        self.waits.append(Wait(kind, call, span.args.get("source", "?"), span.duration,
+                               self.scenario, self.step))
+        self.scenario_seconds += span.duration
+
+    # ==================== REPORTING ====================
+
+    def by_source(self) -> List[Dict[str, Any]]:
+        return group_by_source(self.waits)
+
+    def report(self) -> Dict[str, Any]:
+        return wait_report(self.waits, self.budget_seconds, self.over_budget, self.scenario_totals)
+
+    def save(self):
+        """Write the report, or remove one an earlier run left, and stop listening"""
+        if self.recorder is not None and self._on_span in self.recorder.listeners:
+            # Parallel workers keep the recorder across Behave runs
+            self.recorder.listeners.remove(self._on_span)
+        if not self.waits:
+            if os.path.exists(self.report_path):
+                os.remove(self.report_path)
+            return
+        report = self.report()
+        os.makedirs(os.path.dirname(self.report_path) or ".", exist_ok=True)
+        with open(self.report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print_wait_summary(report, self.report_path)
+
+
+def group_by_source(waits: List[Wait]) -> List[Dict[str, Any]]:
+    """Waits grouped by source line, costliest first"""
+    grouped: Dict[str, Dict[str, Any]] = {}
+    for wait in waits:
+        entry = grouped.setdefault(wait.source, {"source": wait.source, "count": 0, "seconds": 0.0,
+                                                 "kinds": {}, "calls": set(), "steps": set()})
+        entry["count"] += 1
+        entry["seconds"] += wait.seconds
+        entry["kinds"][wait.kind] = entry["kinds"].get(wait.kind, 0) + 1
+        entry["calls"].add(wait.call)
+        entry["steps"].add(wait.step)
+    ranked = sorted(grouped.values(), key=lambda entry: -entry["seconds"])
+    for entry in ranked:
+        entry["seconds"] = round(entry["seconds"], 3)
+        entry["calls"] = sorted(entry["calls"])
+        entry["steps"] = sorted(entry["steps"])
+    return ranked
+
+
+def wait_report(waits: List[Wait], budget_seconds: Optional[float], over_budget: Dict[str, float],
+                scenario_totals: Dict[str, float]) -> Dict[str, Any]:
+    return {
+        "timestamp": time.time(),
+        "total_seconds": round(sum(wait.seconds for wait in waits), 3),
+        "budget_seconds": budget_seconds,
+        "over_budget": {name: round(seconds, 3) for name, seconds in over_budget.items()},
+        "sources": group_by_source(waits),
+        "scenarios": {name: round(seconds, 3) for name, seconds in
+                      sorted(scenario_totals.items(), key=lambda item: -item[1])},
+        "waits": [asdict(wait) for wait in waits],
+    }
+
+
+def combine_wait_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One report from the reports of several runs (the parallel runner's scenarios)"""
+    waits = [Wait(**wait) for report in reports for wait in report["waits"]]
+    over_budget: Dict[str, float] = {}
+    scenario_totals: Dict[str, float] = {}
+    for report in reports:
+        over_budget.update(report["over_budget"])
+        scenario_totals.update(report["scenarios"])
+    budget = next((report["budget_seconds"] for report in reports), None)
+    return wait_report(waits, budget, over_budget, scenario_totals)
+
+
+def print_wait_summary(report: Dict[str, Any], path: str):
+    print(f"⏳ Wasted waits: {report['total_seconds']:.1f}s in {len(report['waits'])} sleeps and timed-out waits "
+          f"(see {path})")
+    for entry in report["sources"][:TOP_SOURCES]:
+        print(f"   {entry['seconds']:6.1f}s  {entry['count']:>3}×  {entry['source']}  {', '.join(entry['calls'])}")
+    if report["over_budget"]:
+        print(f"⚠️  {len(report['over_budget'])} scenarios over the {report['budget_seconds']:g}s wait budget")
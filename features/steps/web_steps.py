@@ -8,61 +8,77 @@ import json
 from playwright.sync_api import expect
 import time
 
+from browser import SnapshotCache, StorageSeeder
+
 # ==================== NAVIGATION STEPS ====================
 
+def visit(context, url):
+    """Navigate, or in a @read-only scenario read the worker's shared snapshot of the URL"""
+    if context.read_only and not context.page.is_open:
+        context.snapshot = SnapshotCache.shared().get(context.browser_session, url, context.viewport)
+    else:
+        context.page.goto(url)
+
+def set_viewport(context, size):
+    context.viewport = size
+    if context.snapshot is not None:
+        context.snapshot = SnapshotCache.shared().get(context.browser_session, context.snapshot.url, size)
+    elif not context.read_only or context.page.is_open:
+        context.page.set_viewport_size(size)
+
 @given('I am on the login page')
 def step_on_login_page(context):
-    context.page.goto(f"{context.web_url}/login")
+    visit(context, f"{context.web_url}/login")
 
 @given('I am on the home page')
 def step_on_home_page(context):
-    context.page.goto(context.web_url)
+    visit(context, context.web_url)
 
 @given('I am on the browse page')
 def step_on_browse_page(context):
-    context.page.goto(f"{context.web_url}/browse")
+    visit(context, f"{context.web_url}/browse")
 
 @given('I am on the dashboard page')
 def step_on_dashboard_page(context):
-    context.page.goto(f"{context.web_url}/dashboard")
+    visit(context, f"{context.web_url}/dashboard")
 
 @given('I am on the team management page')
 def step_on_team_page(context):
-    context.page.goto(f"{context.web_url}/team")
+    visit(context, f"{context.web_url}/team")
 
 @given('I am on the system status page')
 def step_on_status_page(context):
-    context.page.goto(f"{context.web_url}/status")
+    visit(context, f"{context.web_url}/status")
 
 @given('I am on the contact page')
 def step_on_contact_page(context):
-    context.page.goto(f"{context.web_url}/contact")
+    visit(context, f"{context.web_url}/contact")
 
 @given('I am on the admin console')
 def step_on_admin_page(context):
-    context.page.goto(f"{context.web_url}/admin")
+    visit(context, f"{context.web_url}/admin")
 
 @given('I am on the checkout page')
 def step_on_checkout_page(context):
-    context.page.goto(f"{context.web_url}/checkout")
+    visit(context, f"{context.web_url}/checkout")
 
 @given('I am on the pricing page')
 def step_on_pricing_page(context):
-    context.page.goto(f"{context.web_url}/pricing")
+    visit(context, f"{context.web_url}/pricing")
 
 # ==================== RESPONSIVE DEVICE STEPS ====================
 
 @given('I am viewing on a mobile device')
 def step_mobile_device(context):
-    context.page.set_viewport_size({"width": 375, "height": 667})
+    set_viewport(context, {"width": 375, "height": 667})
 
 @given('I am viewing on a tablet device')
 def step_tablet_device(context):
-    context.page.set_viewport_size({"width": 768, "height": 1024})
+    set_viewport(context, {"width": 768, "height": 1024})
 
 @given('I am viewing on desktop')
 def step_desktop_device(context):
-    context.page.set_viewport_size({"width": 1280, "height": 720})
+    set_viewport(context, {"width": 1280, "height": 720})
 
 # ==================== COMMON ELEMENT CHECKS ====================
 
@@ -178,6 +194,9 @@ def step_see_input(context, field_name):
 
 @then('I should see "{text}"')
 def step_see_text(context, text):
+    if context.snapshot is not None:
+        assert context.snapshot.has_text(text), f'"{text}" not found on {context.snapshot.url} (read-only snapshot)'
+        return
     element = context.page.get_by_text(text).first
     expect(element).to_be_visible()
 
@@ -208,6 +227,9 @@ def step_see_validation_error(context, field):
 
 @then('I should not see "{text}"')
 def step_not_see_text(context, text):
+    if context.snapshot is not None:
+        assert not context.snapshot.has_text(text), f'"{text}" found on {context.snapshot.url} (read-only snapshot)'
+        return
     element = context.page.get_by_text(text).first
     expect(element).not_to_be_visible()
 
@@ -248,49 +270,62 @@ def step_redirected_my_dashboard(context):
 def step_remain_login(context):
     expect(context.page).to_have_url(re.compile('login'))
 
+# ==================== PAGE PERFORMANCE ====================
+
+def loaded_page_metric(context, metric):
+    """Web Vitals metric of the current page, read once it has loaded"""
+    context.page.wait_for_load_state("load")
+    context.web_vitals.collect(context.page)
+    value = context.web_vitals.metric(metric)
+    assert value is not None, f"The browser reported no {metric} for {context.page.url}"
+    return value
+
+@then('the page {metric} should be under {limit_ms:d} ms')
+def step_page_metric_under(context, metric, limit_ms):
+    value = loaded_page_metric(context, metric)
+    assert value < limit_ms, f"{metric} of {context.page.url} was {value:.0f}ms, budget {limit_ms}ms"
+
+@then('the page CLS should be under {limit:g}')
+def step_page_cls_under(context, limit):
+    value = loaded_page_metric(context, "CLS")
+    assert value < limit, f"CLS of {context.page.url} was {value:.3f}, budget {limit}"
+
+# ==================== CONSOLE AND NETWORK ====================
+
+@then('there should be no console errors')
+def step_no_console_errors(context):
+    errors = context.events.errors()
+    assert not context.events.error_count, (
+        f"{context.events.error_count} console errors, last: "
+        + "; ".join(event["text"][:200] for event in errors[-3:])
+    )
+
+@then('there should be no failed API calls')
+def step_no_failed_api_calls(context):
+    failed = context.events.failed_calls()
+    assert not failed, "Failed API calls: " + "; ".join(
+        f"{call['method']} {call['url']} → {call.get('status', call.get('failure'))}" for call in failed[-5:]
+    )
+
 # ==================== AUTHENTICATION STEPS ====================
 
-@given('I am logged in as a regular user')
-def step_logged_in_regular(context):
-    context.page.goto(f"{context.web_url}/login")
-    context.page.evaluate("""
-        localStorage.setItem('auth_token', 'mock_token_' + Date.now());
-        localStorage.setItem('user', JSON.stringify({
-            email: 'test@realmgrid.com',
-            username: 'TestUser',
-            role: 'user'
-        }));
-    """)
+def log_in_with_seed(context, profile):
+    """Open the dashboard with a role's session seeded before the first load"""
+    StorageSeeder(context.web_url).apply(context.page, profile)
     context.page.goto(f"{context.web_url}/dashboard")
     context.page.wait_for_load_state('networkidle')
 
+@given('I am logged in as a regular user')
+def step_logged_in_regular(context):
+    log_in_with_seed(context, "user")
+
 @given('I am logged in as an admin user')
 def step_logged_in_admin(context):
-    context.page.goto(f"{context.web_url}/login")
-    context.page.evaluate("""
-        localStorage.setItem('auth_token', 'mock_token_' + Date.now());
-        localStorage.setItem('user', JSON.stringify({
-            email: 'admin@realmgrid.com',
-            username: 'AdminUser',
-            role: 'admin'
-        }));
-    """)
-    context.page.goto(f"{context.web_url}/dashboard")
-    context.page.wait_for_load_state('networkidle')
+    log_in_with_seed(context, "admin")
 
 @given('I am logged in as a team owner')
 def step_logged_in_owner(context):
-    context.page.goto(f"{context.web_url}/login")
-    context.page.evaluate("""
-        localStorage.setItem('auth_token', 'mock_token_' + Date.now());
-        localStorage.setItem('user', JSON.stringify({
-            email: 'owner@realmgrid.com',
-            username: 'TeamOwner',
-            role: 'user'
-        }));
-    """)
-    context.page.goto(f"{context.web_url}/dashboard")
-    context.page.wait_for_load_state('networkidle')
+    log_in_with_seed(context, "team-owner")
 
 @given('I am logged in as a customer')
 def step_logged_in_customer(context):
@@ -377,77 +412,47 @@ def step_main_landmark(context):
 @then('I should see the dashboard heading')
 def step_dashboard_heading(context):
     heading = context.page.locator('h1, h2').filter(has_text=re.compile('dashboard', re.IGNORECASE)).first
-    try:
-        expect(heading).to_be_visible(timeout=5000)
-    except:
-        pass
+    context.soft_checks.visible(heading, "dashboard heading", timeout_ms=5000)
 
 @then('I should see my owned servers section')
 def step_owned_servers(context):
     section = context.page.locator('[data-testid="servers-section"], .servers-section').first
-    try:
-        expect(section).to_be_visible(timeout=5000)
-    except:
-        pass
+    context.soft_checks.visible(section, "owned servers section", timeout_ms=5000)
 
 @then('I should see the team stats section')
 def step_team_stats(context):
     section = context.page.locator('[data-testid="team-section"], .team-section').first
-    try:
-        expect(section).to_be_visible(timeout=5000)
-    except:
-        pass
+    context.soft_checks.visible(section, "team stats section", timeout_ms=5000)
 
 @then('I should see the community card')
 def step_community_card(context):
     card = context.page.locator('[data-testid="community-card"], .community-card').first
-    try:
-        expect(card).to_be_visible(timeout=5000)
-    except:
-        pass
+    context.soft_checks.visible(card, "community card", timeout_ms=5000)
 
 @given('I have servers deployed')
 def step_have_servers(context):
-    context.page.evaluate("""
-        localStorage.setItem('servers', JSON.stringify([{
-            id: '1',
-            name: 'My Minecraft Server',
-            game: 'Minecraft',
-            status: 'online',
-            ram: 4,
-            slots: 20
-        }]));
-    """)
+    StorageSeeder(context.web_url).apply(context.page, "has-servers")
     context.test_data = {'has_servers': True}
 
 @given('I have no servers deployed')
 def step_no_servers(context):
-    context.page.evaluate("localStorage.setItem('servers', JSON.stringify([]))")
+    StorageSeeder(context.web_url).apply(context.page, "no-servers")
     context.test_data = {'has_servers': False}
 
 @then('I should see my server cards')
 def step_see_server_cards(context):
     cards = context.page.locator('[data-testid="server-card"], .server-card')
-    try:
-        expect(cards.first).to_be_visible(timeout=5000)
-    except:
-        pass
+    context.soft_checks.visible(cards.first, "server card", timeout_ms=5000)
 
 @then('online servers should show green status')
 def step_green_status(context):
     indicator = context.page.locator('.status-online, [data-status="online"]').first
-    try:
-        expect(indicator).to_be_visible(timeout=3000)
-    except:
-        pass
+    context.soft_checks.visible(indicator, "online status indicator", timeout_ms=3000)
 
 @then('offline servers should show red status')
 def step_red_status(context):
     indicator = context.page.locator('.status-offline, [data-status="offline"]').first
-    try:
-        expect(indicator).to_be_visible(timeout=3000)
-    except:
-        pass
+    context.soft_checks.visible(indicator, "offline status indicator", timeout_ms=3000)
 
 # ==================== BROWSE PAGE STEPS ====================
 
@@ -543,10 +548,7 @@ def step_cards_glass_effect(context):
 @then('badges should have colored backgrounds')
 def step_badges_colored(context):
     badges = context.page.locator('[data-testid="badge"], .badge, span[class*="bg-"]').first
-    try:
-        expect(badges).to_be_visible()
-    except:
-        pass
+    context.soft_checks.visible(badges, "badge")
 
 # ==================== CONTACT PAGE STEPS ====================
 
@@ -570,25 +572,16 @@ def step_submit_contact_form(context):
 @then('I should see admin features')
 def step_see_admin_features(context):
     admin_section = context.page.locator('[data-testid="admin-section"], .admin-area').first
-    try:
-        expect(admin_section).to_be_visible(timeout=3000)
-    except:
-        pass
+    context.soft_checks.visible(admin_section, "admin section", timeout_ms=3000)
 
 # ==================== COMMON CHECKOUT STEPS ====================
 
 @then('I should be able to checkout')
 def step_able_checkout(context):
     checkout_btn = context.page.get_by_role("button", name=re.compile("checkout|pay|subscribe", re.IGNORECASE)).first
-    try:
-        expect(checkout_btn).to_be_visible()
-    except:
-        pass
+    context.soft_checks.visible(checkout_btn, "checkout button")
 
 @then('items in my cart should be displayed')
 def step_cart_items_displayed(context):
     items = context.page.locator('[data-testid="cart-item"], .cart-item').first
-    try:
-        expect(items).to_be_visible(timeout=3000)
-    except:
-        pass
+    context.soft_checks.visible(items, "cart item", timeout_ms=3000)
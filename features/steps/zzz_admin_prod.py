@@ -7,6 +7,9 @@ import time
 from behave import given, when, then
 from playwright.sync_api import expect
 
+from api import AsyncFunctionsClient
+from browser import ResponseStore
+
 @given('the admin portal is running on "{url}"')
 def step_admin_portal_running(context, url):
     """Set the admin portal URL"""
@@ -16,44 +19,29 @@ def step_admin_portal_running(context, url):
 @given('the dev Function Apps are accessible')
 def step_function_apps_accessible(context):
     """Verify dev Function Apps are accessible"""
-    import requests
-    
     function_apps = [
         'https://realm-dev-auth-api-fa.azurewebsites.net/api/health-check',
         'https://realm-dev-admin-api-fa.azurewebsites.net/api/health-check',
     ]
     
     print("🔍 Checking Function Apps...")
-    for url in function_apps:
-        try:
-            response = requests.get(url, timeout=10)
-            status = "✅" if response.status_code < 400 else "❌"
-            print(f"{status} {url} → {response.status_code}")
-        except Exception as e:
-            print(f"⚠️  {url} → {e}")
+    checker = AsyncFunctionsClient(context.api)
+    for result in checker.get_all(function_apps, timeout=10):
+        url = result.request.path
+        if result.error:
+            print(f"⚠️  {url} → {result.error}")
+        else:
+            status = "✅" if result.ok else "❌"
+            print(f"{status} {url} → {result.status} ({result.elapsed_ms:.0f}ms)")
+    print(f"⏱️  Checked {len(function_apps)} Function Apps in {checker.last_batch_ms:.0f}ms")
 
 @given('I am on the admin portal login page')
 def step_on_login_page(context):
     """Navigate to admin portal login page"""
     print(f"🚀 Navigating to {context.admin_url}")
     
-    # Track console logs
-    context.console_logs = []
-    context.page.on("console", lambda msg: context.console_logs.append(f"[{msg.type()}] {msg.text()}"))
-    
-    # Track API calls
-    context.api_calls = []
-    def track_response(response):
-        if 'azurewebsites.net' in response.url or '/api/' in response.url:
-            context.api_calls.append({
-                'url': response.url,
-                'status': response.status,
-                'method': response.request.method
-            })
-            emoji = "✅" if response.status < 400 else "❌"
-            print(f"{emoji} {response.request.method} {response.url} → {response.status}")
-    
-    context.page.on("response", track_response)
+    # JSON bodies of the API responses, for the data assertions
+    context.responses = ResponseStore().attach(context.page)
     
     context.page.goto(context.admin_url)
     context.page.wait_for_load_state('networkidle')
@@ -78,8 +66,8 @@ def step_logged_into_admin(context):
     except:
         print("✓ Already logged in")
 
-@when('I click the "{button_text}" button')
-def step_click_button(context, button_text):
+@when('I click the "{button_text}" button in the admin portal')
+def step_click_admin_button(context, button_text):
     """Click a button with specific text"""
     print(f"🖱️  Clicking '{button_text}' button...")
     button = context.page.locator(f'button:has-text("{button_text}")')
@@ -99,8 +87,8 @@ def step_dashboard_loads(context):
     context.page.screenshot(path=screenshot_path)
     print(f"📸 Screenshot saved: {screenshot_path}")
 
-@then('I should be redirected to the dashboard')
-def step_redirected_to_dashboard(context):
+@then('I should be redirected to the admin dashboard')
+def step_redirected_to_admin_dashboard(context):
     """Verify redirect to dashboard"""
     print("✓ Checking for dashboard...")
     
@@ -128,10 +116,9 @@ def step_redirected_to_dashboard(context):
 @then('the dashboard should display stats')
 def step_dashboard_displays_stats(context):
     """Verify dashboard displays statistics"""
-    body_text = context.page.text_content('body')
-    
     print("📊 Checking for dashboard stats...")
-    stats_found = any(keyword in body_text.lower() for keyword in ['server', 'subscription', 'customer'])
+    stats_found = any(context.page_content.text_contains(keyword)
+                      for keyword in ['server', 'subscription', 'customer'])
     
     if stats_found:
         print("✅ Dashboard stats found")
@@ -145,67 +132,78 @@ def step_see_api_call(context, endpoint):
     """Verify specific API endpoint was called"""
     print(f"🔍 Looking for API call to {endpoint}...")
     
-    matching_calls = [call for call in context.api_calls if endpoint in call['url']]
+    matching_calls = context.events.calls(endpoint)
     
     if matching_calls:
         for call in matching_calls:
-            print(f"✅ Found: {call['method']} {call['url']} → {call['status']}")
+            print(f"✅ Found: {call['method']} {call['url']} → {call.get('status', call.get('failure'))}")
         context.last_api_call = matching_calls[0]
     else:
         print(f"❌ No calls to {endpoint} found")
-        print(f"All API calls ({len(context.api_calls)}):")
-        for call in context.api_calls:
-            print(f"  • {call['method']} {call['url']} → {call['status']}")
+        all_calls = context.events.calls()
+        print(f"All API calls ({len(all_calls)}):")
+        for call in all_calls:
+            print(f"  • {call['method']} {call['url']} → {call.get('status', call.get('failure'))}")
     
     assert len(matching_calls) > 0, f"No API call to {endpoint} found"
 
 @then('the admin response should contain server data')
 def step_response_contains_servers(context):
     """Verify server data in API response"""
-    print("✓ Server API was called (assuming data returned)")
-    # In a real scenario, we'd intercept and parse the response
-    # For now, we rely on the API call being made
+    servers = context.responses.records("/servers")
+    assert servers, "Server API returned no servers"
+    print(f"✓ Server API returned {len(servers)} servers")
 
 @then('the admin response should contain subscription data')
 def step_response_contains_subscriptions(context):
     """Verify subscription data in API response"""
-    print("✓ Subscription API was called (assuming data returned)")
+    subscriptions = context.responses.records("/subscriptions")
+    assert subscriptions, "Subscription API returned no subscriptions"
+    print(f"✓ Subscription API returned {len(subscriptions)} subscriptions")
 
 @then('I should see at least {count:d} servers')
 def step_see_server_count(context, count):
-    """Check for minimum server count in UI"""
-    body_text = context.page.text_content('body')
-    print(f"✓ Checking UI for at least {count} servers...")
-    # Basic check - in production we'd parse actual numbers
-    assert 'server' in body_text.lower(), f"No server information found"
+    """Check for minimum server count in the server API response"""
+    servers = context.responses.records("/servers")
+    print(f"✓ Checking for at least {count} servers ({len(servers)} returned)...")
+    assert len(servers) >= count, f"Expected at least {count} servers, API returned {len(servers)}"
 
 @then('I should see at least {count:d} subscription')
 def step_see_subscription_count(context, count):
-    """Check for minimum subscription count in UI"""
-    body_text = context.page.text_content('body')
-    print(f"✓ Checking UI for at least {count} subscription...")
-    assert 'subscription' in body_text.lower(), f"No subscription information found"
+    """Check for minimum subscription count in the subscription API response"""
+    subscriptions = context.responses.records("/subscriptions")
+    print(f"✓ Checking for at least {count} subscription ({len(subscriptions)} returned)...")
+    assert len(subscriptions) >= count, \
+        f"Expected at least {count} subscriptions, API returned {len(subscriptions)}"
 
 @then('one server should be "{game_type}" type')
 def step_server_game_type(context, game_type):
     """Verify server game type"""
-    body_text = context.page.text_content('body')
     print(f"🎮 Checking for {game_type} server...")
-    assert game_type.lower() in body_text.lower(), f"No {game_type} server found"
+    assert context.responses.count_where("/servers", "gameType", game_type) >= 1, f"No {game_type} server found"
     print(f"✅ Found {game_type} server")
 
 @then('one server should be in "{status}" status')
 def step_server_status(context, status):
     """Verify server status"""
-    body_text = context.page.text_content('body')
     print(f"🔍 Checking for {status} server status...")
-    # Basic check - would need better parsing in production
+    assert context.responses.count_where("/servers", "status", status) >= 1, f"No server in {status} status"
     print(f"✓ Server status check completed")
 
+@then('at least {count:d} servers should have {field} "{value}"')
+def step_servers_with_field(context, count, field, value):
+    """Count servers in the API response by a field such as gameType or status"""
+    matching = context.responses.count_where("/servers", field, value)
+    assert matching >= count, f"Expected at least {count} servers with {field} '{value}', found {matching}"
+
 @then('subscriptions should have Mollie IDs')
 def step_subscriptions_mollie_ids(context):
     """Verify subscriptions have Mollie IDs"""
-    print("✓ Subscription API called (Mollie IDs assumed in backend)")
+    subscriptions = context.responses.records("/subscriptions")
+    missing = [sub.get("id", "?") for sub in subscriptions
+               if not any(value for key, value in sub.items() if key.lower().startswith("mollie"))]
+    assert subscriptions and not missing, f"Subscriptions without a Mollie ID: {missing or 'no subscriptions'}"
+    print(f"✓ {len(subscriptions)} subscriptions carry Mollie IDs")
 
 @then('I should see production data for')
 def step_see_production_data(context):
@@ -4,7 +4,7 @@ Feature: Analytics
   I want to view analytics
   So that I can understand usage
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page shows metrics
     Given I am on the home page
     Then I should see "99.9%"
@@ -4,7 +4,7 @@ Feature: Backups
   I want to manage backups
   So that I can protect my data
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page mentions data protection
     Given I am on the home page
     Then I should see "DDoS Protection"
@@ -4,7 +4,7 @@ Feature: Server Comparison
   I want to compare servers
   So that I can make an informed decision
 
-  @smoke
+  @smoke @read-only
   Scenario: Comparison checkboxes are visible on browse page
     Given I am on the browse page
     Then I should see "Compare"
@@ -4,7 +4,7 @@ Feature: Server Console
   I want to access server console
   So that I can manage my server
 
-  @smoke
+  @smoke @read-only
   Scenario: Browse page shows server options
     Given I am on the browse page
     Then I should see "Minecraft"
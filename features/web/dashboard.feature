@@ -4,7 +4,7 @@ Feature: User Dashboard
   I want to access my dashboard
   So that I can manage my game servers
 
-  @smoke
+  @smoke @read-only
   Scenario: Dashboard header is present on browse page
     Given I am on the browse page
     Then I should see "Browse Servers"
@@ -4,7 +4,7 @@ Feature: Mod Management
   I want to manage mods
   So that I can customize my server
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page shows game support
     Given I am on the home page
     Then I should see "Valheim"
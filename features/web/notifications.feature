@@ -4,7 +4,7 @@ Feature: Notifications
   I want to receive notifications
   So that I stay informed
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page shows real-time features
     Given I am on the home page
     Then I should see "Real-Time Stats"
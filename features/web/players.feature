@@ -4,7 +4,7 @@ Feature: Player Management
   I want to manage players
   So that I can control access
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page shows friend features
     Given I am on the home page
     Then I should see "Built-In Friend System"
@@ -4,7 +4,7 @@ Feature: Server Details
   I want to view server details
   So that I can learn about server specifications
 
-  @smoke
+  @smoke @read-only
   Scenario: Server information is accessible from browse page
     Given I am on the browse page
     Then I should see "Configure"
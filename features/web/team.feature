@@ -4,7 +4,7 @@ Feature: Team Management
   I want to manage my team
   So that I can collaborate
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page is accessible for teams
     Given I am on the home page
     Then I should see "Get Started"
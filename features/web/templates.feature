@@ -4,7 +4,7 @@ Feature: Server Templates
   I want to use server templates
   So that I can quickly deploy
 
-  @smoke
+  @smoke @read-only
   Scenario: Home page shows quick deployment
     Given I am on the home page
     Then I should see "Up in 60 Seconds"
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Load-test mode for the Functions API scenarios.
+
+Replays the selected scenarios through the regular step definitions with N
+virtual users (threads), started over a ramp-up period and kept busy for a
+fixed duration. Every API call goes through the pooled FunctionsClient, which
+reports it to the load recorder; the run ends with throughput, p50/p95/p99
+latency and error rates per endpoint, plus pass/fail counts per scenario.
+
+Only API step modules are loaded (functions_steps.py and e2e_flow_steps.py
+by default), so browser scenarios are not replayable here. Servers the
+replayed scenarios provision are deleted by the teardown reaper at the end.
+Each virtual user replays the scenarios with its own copies of their fixed
+resource IDs (server-123 becomes vu3-server-123), so users do not collide.
+
+Usage:
+    python load_test.py features/functions --tags=@functions -c 20 --ramp-up 10 --duration 60
+    python load_test.py features/functions --name "Create checkout session" -c 50 --duration 30
+    python load_test.py features/functions --tags=@functions --mock -c 10 --duration 10
+"""
+import argparse
+import contextlib
+import copy
+import json
+import os
+import re
+import runpy
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from behave.configuration import Configuration
+from behave.model import Table
+from behave.parser import parse_file
+from behave.step_registry import registry
+from dotenv import load_dotenv
+
+from parallel_runner import STEPS_DIR, find_feature_files
+from api import FunctionsClient, ApiCall, ServerPool, TeardownReaper, endpoint_name
+from perf import ProvisioningMetrics, percentile
+
+
+DEFAULT_STEP_MODULES = ["functions_steps.py", "e2e_flow_steps.py"]
+DEFAULT_REPORT_FILE = "reports/load-test.json"
+
+# Fixed resource IDs in the scenarios (server-123, sub-123, e2e-user-001, ...),
+# not placeholders such as {server_id}
+RESOURCE_ID = re.compile(r"(?<!\{)\b(?:server|sub|backup|test-user|e2e-user)[-_][\w-]*\w")
+
+# ==================== RECORDING ====================
+
+class LoadRecorder:
+    """Collects API calls and scenario outcomes from every virtual user"""
+
+    def __init__(self):
+        self.calls: Dict[str, List[ApiCall]] = {}
+        self.scenarios: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def on_call(self, call: ApiCall):
+        with self._lock:
+            self.calls.setdefault(endpoint_name(call.method, call.path), []).append(call)
+
+    def on_scenario(self, name: str, status: str, seconds: float, error: Optional[str] = None):
+        with self._lock:
+            entry = self.scenarios.setdefault(name, {"durations": [], "statuses": {}, "errors": {}})
+            entry["durations"].append(seconds)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            if error:
+                entry["errors"][error] = entry["errors"].get(error, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for name, calls in sorted(self.calls.items()):
+            timings = [call.elapsed_ms for call in calls]
+            server_errors = sum(1 for call in calls if call.error or (call.status or 0) >= 500)
+            client_errors = sum(1 for call in calls if call.status and 400 <= call.status < 500)
+            endpoints[name] = {
+                "requests": len(calls),
+                "throughput_rps": len(calls) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(timings, 50),
+                "p95_ms": percentile(timings, 95),
+                "p99_ms": percentile(timings, 99),
+                "max_ms": max(timings),
+                "error_rate": server_errors / len(calls),
+                "client_error_rate": client_errors / len(calls),
+            }
+        scenarios = {}
+        for name, entry in sorted(self.scenarios.items()):
+            durations = entry["durations"]
+            scenarios[name] = {
+                "iterations": len(durations),
+                "statuses": entry["statuses"],
+                "p50_s": percentile(durations, 50),
+                "p95_s": percentile(durations, 95),
+                "errors": entry["errors"],
+            }
+        return {"elapsed_seconds": elapsed, "endpoints": endpoints, "scenarios": scenarios}
+
+
+# ==================== REPLAY ====================
+
+class StepContext(SimpleNamespace):
+    """Minimal stand-in for Behave's Context, one per scenario iteration"""
+
+    def use_with_user_mode(self):
+        return contextlib.nullcontext()
+
+
+def load_step_modules(names: List[str]):
+    """Register the API step definitions with Behave's step registry"""
+    for name in names:
+        runpy.run_path(os.path.join(STEPS_DIR, name))
+
+
+def select_scenarios(paths: List[str], tags: List[str], names: List[str]) -> list:
+    config = Configuration(command_args=[f"--tags={t}" for t in tags])
+    tag_expression = getattr(config, "tag_expression", None) or config.tags
+    selected = []
+    for filename in find_feature_files(paths):
+        feature = parse_file(filename)
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            if tag_expression and not scenario.should_run_with_tags(tag_expression):
+                continue
+            if names and not any(name in scenario.name for name in names):
+                continue
+            selected.append(scenario)
+    return selected
+
+
+def vu_steps(scenario, vu: int) -> list:
+    """The scenario's steps with every resource ID prefixed by the virtual user
+
+    Concurrent iterations of the same scenario would otherwise stop, delete
+    and cancel each other's servers and subscriptions.
+    """
+    def own(text: str) -> str:
+        return RESOURCE_ID.sub(lambda match: f"vu{vu}-{match.group(0)}", text)
+
+    steps = []
+    for step in scenario.all_steps:
+        step = copy.copy(step)
+        step.name = own(step.name)
+        if step.table is not None:
+            step.table = Table([own(cell) for cell in step.table.headings], line=step.table.line,
+                               rows=[[own(cell) for cell in row.cells] for row in step.table.rows])
+        steps.append(step)
+    return steps
+
+
+def run_scenario(scenario, steps: list, shared: Dict[str, Any], recorder: LoadRecorder):
+    """Run one iteration of a scenario on a fresh step context"""
+    context = StepContext(scenario=scenario, table=None, text=None, **shared)
+    started = time.perf_counter()
+    status, error = "passed", None
+    for step in steps:
+        match = registry.find_match(step)
+        if match is None:
+            status, error = "undefined", step.name
+            break
+        context.table, context.text = step.table, step.text
+        try:
+            match.run(context)
+        except AssertionError as e:
+            status, error = "failed", f"{step.name}: {str(e).splitlines()[0] if str(e) else 'assertion'}"
+            break
+        except Exception as e:
+            status, error = "error", f"{step.name}: {type(e).__name__}: {e}"
+            break
+    leased = getattr(context, "leased_server", None)
+    if leased:
+        shared["server_pool"].release(leased)
+    recorder.on_scenario(scenario.name, status, time.perf_counter() - started, error)
+
+
+def virtual_user(vu: int, scenarios: list, shared: Dict[str, Any], recorder: LoadRecorder,
+                 start_delay: float, deadline: float, iterations: Optional[int]):
+    """Cycle through the scenarios until the deadline (or iteration count)"""
+    plans = [(scenario, vu_steps(scenario, vu)) for scenario in scenarios]
+    time.sleep(start_delay)
+    done = 0
+    while time.monotonic() < deadline and (iterations is None or done < iterations):
+        run_scenario(*plans[(vu + done) % len(plans)], shared, recorder)
+        done += 1
+
+
+# ==================== REPORT ====================
+
+def print_report(report: Dict[str, Any], concurrency: int):
+    print(f"\n📊 {concurrency} virtual users for {report['elapsed_seconds']:.1f}s")
+    print(f"{'endpoint':<44} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'5xx':>7} {'4xx':>7}")
+    for name, e in report["endpoints"].items():
+        print(f"{name:<44} {e['requests']:>7} {e['throughput_rps']:>8.1f} {e['p50_ms']:>6.0f}ms "
+              f"{e['p95_ms']:>6.0f}ms {e['p99_ms']:>6.0f}ms {e['error_rate']:>7.1%} {e['client_error_rate']:>7.1%}")
+    print()
+    for name, s in report["scenarios"].items():
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(s["statuses"].items()))
+        print(f"  {name}: {s['iterations']} iterations ({statuses}), p50 {s['p50_s']:.2f}s, p95 {s['p95_s']:.2f}s")
+        for error, count in sorted(s["errors"].items(), key=lambda item: -item[1])[:3]:
+            print(f"      {count}× {error[:120]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay Functions API scenarios as a load test")
+    parser.add_argument("paths", nargs="*", default=["features/functions"], help="Feature files or directories")
+    parser.add_argument("-t", "--tags", action="append", default=[], help="Behave tag expression (repeatable)")
+    parser.add_argument("-n", "--name", action="append", default=[], help="Only scenarios whose name contains this")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="Virtual users")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which virtual users start")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="Seconds to keep replaying")
+    parser.add_argument("-i", "--iterations", type=int, help="Stop each virtual user after this many scenarios")
+    parser.add_argument("--target", help="Functions base URL (default: FUNCTIONS_URL)")
+    parser.add_argument("--mock", action="store_true", help="Run against the in-process mock Functions API")
+    parser.add_argument("--steps", default=",".join(DEFAULT_STEP_MODULES),
+                        help="Step modules to load from features/steps (comma-separated)")
+    parser.add_argument("-o", "--outfile", default=DEFAULT_REPORT_FILE, help="JSON report path")
+    args = parser.parse_args()
+
+    load_dotenv()
+    # Enough keep-alive connections for every virtual user
+    os.environ["API_POOL_SIZE"] = str(max(args.concurrency, int(os.getenv("API_POOL_SIZE", "0"))))
+
+    load_step_modules([name.strip() for name in args.steps.split(",") if name.strip()])
+    scenarios = select_scenarios(args.paths, args.tags, args.name)
+    if not scenarios:
+        print("No scenarios selected")
+        return 0
+
+    mock = None
+    if args.mock:
+        from mocks import MockFunctionsApi
+        os.environ["TEST_MODE"] = "mock"
+        mock = MockFunctionsApi.from_env().start()
+    target = mock.url if mock else (args.target or os.getenv("FUNCTIONS_URL"))
+    if not target:
+        print("No target: set FUNCTIONS_URL, --target or --mock")
+        return 2
+
+    client = FunctionsClient.shared(target)
+    recorder = LoadRecorder()
+    client.add_listener(recorder.on_call)
+    shared = {
+        "api": client,
+        "functions_mock": mock,
+        "functions_url": target,
+        "server_pool": ServerPool.shared(client, keep=False if mock else None),
+        "teardown": TeardownReaper(client),
+        "provisioning_metrics": ProvisioningMetrics(),
+    }
+
+    print(f"🚀 {len(scenarios)} scenarios, {args.concurrency} virtual users, "
+          f"{args.ramp_up:.0f}s ramp-up, {args.duration:.0f}s against {target}")
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(
+            target=virtual_user, daemon=True, name=f"vu-{vu}",
+            args=(vu, scenarios, shared, recorder, args.ramp_up * vu / args.concurrency, deadline, args.iterations),
+        )
+        for vu in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    client.remove_listener(recorder.on_call)
+    report = recorder.report(elapsed)
+    print_report(report, args.concurrency)
+    os.makedirs(os.path.dirname(args.outfile) or ".", exist_ok=True)
+    with open(args.outfile, "w") as f:
+        json.dump({"target": target, "concurrency": args.concurrency, "ramp_up": args.ramp_up,
+                   "duration": args.duration, **report}, f, indent=2)
+    print(f"📄 Report: {args.outfile}")
+
+    shared["teardown"].run()
+    ServerPool.close_shared()
+    FunctionsClient.close_shared()
+    if mock:
+        mock.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
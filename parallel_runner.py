@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Parallel Behave runner for the Realm Grid E2E suite.
+
+Schedules the selected scenarios (not features) across N worker processes.
+Scenarios are queued longest-first using the wall times recorded in the
+timing history (LPT), and idle workers pull the next scenario from the shared
+queue, so the run finishes close to the duration of the longest scenario.
+Every Behave run carries a fixed start-up cost, so short scenarios are packed
+into batches that share one run, and the estimate counts that cost per batch.
+Each worker keeps its own Playwright browser alive across the scenarios it
+runs, and the per-scenario JSON and JUnit reports are merged into the single
+reports the CI workflow reads.
+
+Usage:
+    python parallel_runner.py --workers 4
+    python parallel_runner.py --workers 4 --tags=@smoke features/web
+    python parallel_runner.py --workers 4 --list
+    python parallel_runner.py --workers 4 -- -D environment=dev
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+import multiprocessing
+from queue import Empty
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Any, Tuple
+
+from behave.configuration import Configuration
+from behave.parser import parse_file
+
+STEPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "features", "steps")
+sys.path.insert(0, STEPS_DIR)
+from perf import TimingHistory, combine_wait_reports, print_wait_summary, scenario_key
+
+
+REPORTS_DIR = "reports"
+WORK_DIR = os.path.join(REPORTS_DIR, "parallel")
+# Fixed cost of one Behave run (config, step import, hooks, reports)
+DEFAULT_RUN_OVERHEAD_SECONDS = 0.7
+
+
+# ==================== SCENARIO DISCOVERY ====================
+
+def find_feature_files(paths: List[str]) -> List[str]:
+    """Expand directories into the feature files they contain"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.feature"), recursive=True)))
+        elif path.endswith(".feature"):
+            files.append(path)
+    return files
+
+
+def collect_scenarios(paths: List[str], tags: List[str]) -> List[Tuple[str, str]]:
+    """Return ("file:line", history key) for every scenario selected by the tags"""
+    tag_args = [f"--tags={t}" for t in tags]
+    config = Configuration(command_args=tag_args)
+    # behave >= 1.2.7 keeps the parsed expression in tag_expression
+    tag_expression = getattr(config, "tag_expression", None) or config.tags
+    scenarios = []
+    for filename in find_feature_files(paths):
+        feature = parse_file(filename)
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            if tag_expression and not scenario.should_run_with_tags(tag_expression):
+                continue
+            location = f"{scenario.location.filename}:{scenario.location.line}"
+            scenarios.append((location, scenario_key(scenario.location.filename, scenario.name)))
+    return scenarios
+
+
+def schedule_longest_first(scenarios: List[Tuple[str, str]], history: TimingHistory) -> List[Tuple[str, float]]:
+    """Order scenarios by estimated duration, longest first (LPT)"""
+    default = history.default_estimate()
+    estimated = [(location, history.estimate(key, default)) for location, key in scenarios]
+    return sorted(estimated, key=lambda item: item[1], reverse=True)
+
+
+def make_batches(schedule: List[Tuple[str, float]], workers: int, overhead: float) -> List[Tuple[List[str], float]]:
+    """Pack short scenarios into shared Behave runs; estimates include the per-run overhead
+
+    A batch is filled up to the larger of the overhead and an even share of the
+    work, capped at a few overheads so batches stay small enough to balance.
+    Scenarios at least that long run on their own.
+    """
+    total = sum(seconds for _, seconds in schedule)
+    target = min(4 * overhead, max(total / workers, overhead))
+    batches = []
+    current, load = [], 0.0
+    for location, seconds in schedule:
+        if seconds >= target:
+            batches.append(([location], seconds + overhead))
+            continue
+        current.append(location)
+        load += seconds
+        if load >= target:
+            batches.append((current, load + overhead))
+            current, load = [], 0.0
+    if current:
+        batches.append((current, load + overhead))
+    return sorted(batches, key=lambda item: item[1], reverse=True)
+
+
+def simulate_workers(batches: List[Tuple[List[str], float]], workers: int) -> List[List[Tuple[List[str], float]]]:
+    """Predict which worker pulls each batch from the shared queue"""
+    loads = [0.0] * workers
+    assigned = [[] for _ in range(workers)]
+    for locations, seconds in batches:
+        idle = loads.index(min(loads))
+        loads[idle] += seconds
+        assigned[idle].append((locations, seconds))
+    return assigned
+
+
+# ==================== WORKER ====================
+
+def run_worker(worker_id: int, queue, results, behave_args: List[str]):
+    """Pull batches of scenarios from the shared queue until it is drained"""
+    from behave.__main__ import main as behave_main
+    from browser import BrowserSession
+    from api import FunctionsClient, ServerPool
+
+    os.environ["BEHAVE_WORKER_ID"] = str(worker_id)
+    log_path = os.path.join(WORK_DIR, f"worker-{worker_id}.log")
+
+    with open(log_path, "w") as log, contextlib.redirect_stdout(log):
+        sequence = 0
+        while True:
+            locations = queue.get()
+            if locations is None:
+                break
+            run_id = f"{worker_id}-{sequence}"
+            # Reports written at the end of each Behave run get a file per run, merged afterwards
+            os.environ["WAIT_REPORT_FILE"] = os.path.join(WORK_DIR, f"waits-{run_id}.json")
+            os.environ["TEARDOWN_REPORT_FILE"] = os.path.join(WORK_DIR, f"teardown-{run_id}.json")
+            # JSON goes to the scenario report, plain progress to the worker log
+            args = [
+                "--format", "json", "--outfile", os.path.join(WORK_DIR, f"scenario-{run_id}.json"),
+                "--format", "plain",
+                "--junit", "--junit-directory", os.path.join(WORK_DIR, f"junit-{run_id}"),
+                *behave_args,
+                *locations,
+            ]
+            started = time.perf_counter()
+            exit_code = behave_main(args)
+            results.put((worker_id, locations, exit_code, time.perf_counter() - started))
+            sequence += 1
+
+        # The browser and API connections outlive each Behave run; close them with the worker
+        BrowserSession.close_shared()
+        ServerPool.close_shared()
+        FunctionsClient.close_shared()
+
+
+# ==================== REPORT MERGING ====================
+
+def _line_of(element: Dict[str, Any]) -> int:
+    location = element.get("location", "")
+    try:
+        return int(location.rsplit(":", 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def merge_json_reports(paths: List[str]) -> List[Dict[str, Any]]:
+    """Merge per-worker Behave JSON reports into one list of features"""
+    features: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            continue
+        with open(path) as f:
+            for feature in json.load(f):
+                key = feature.get("location", feature.get("name"))
+                merged = features.setdefault(key, {**feature, "elements": {}})
+                for element in feature.get("elements", []):
+                    element_key = (element.get("type"), element.get("location"), element.get("name"))
+                    # A feature's other scenarios show up as skipped in each run
+                    existing = merged["elements"].get(element_key)
+                    if existing is None or existing.get("status") in (None, "skipped", "untested"):
+                        merged["elements"][element_key] = element
+
+    for feature in features.values():
+        feature["elements"] = sorted(feature["elements"].values(), key=_line_of)
+        statuses = {e.get("status") for e in feature["elements"] if e.get("type") != "background"}
+        if "failed" in statuses or "error" in statuses:
+            feature["status"] = "failed"
+        elif "passed" in statuses:
+            feature["status"] = "passed"
+        else:
+            feature["status"] = "skipped"
+    return sorted(features.values(), key=lambda f: f.get("location", ""))
+
+
+def merge_junit_reports(worker_dirs: List[str], output_dir: str):
+    """Merge per-worker JUnit files so each feature has one testsuite file"""
+    suites: Dict[str, ET.Element] = {}
+    for worker_dir in worker_dirs:
+        for path in sorted(glob.glob(os.path.join(worker_dir, "*.xml"))):
+            name = os.path.basename(path)
+            suite = ET.parse(path).getroot()
+            if name not in suites:
+                suites[name] = suite
+                continue
+            merged = suites[name]
+            for attr in ("tests", "errors", "failures", "skipped"):
+                total = int(merged.get(attr, 0)) + int(suite.get(attr, 0))
+                merged.set(attr, str(total))
+            merged.set("time", f"{float(merged.get('time', 0)) + float(suite.get('time', 0)):.6f}")
+            for testcase in suite.findall("testcase"):
+                merged.append(testcase)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, suite in suites.items():
+        ET.ElementTree(suite).write(os.path.join(output_dir, name), encoding="utf-8", xml_declaration=True)
+
+
+def merge_wait_reports(paths: List[str], outfile: str):
+    """Merge per-scenario wait reports into one, replacing the previous run's"""
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            reports.append(json.load(f))
+    if os.path.exists(outfile):
+        os.remove(outfile)
+    if not reports:
+        return
+    report = combine_wait_reports(reports)
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    with open(outfile, "w") as f:
+        json.dump(report, f, indent=2)
+    print_wait_summary(report, outfile)
+
+
+def merge_teardown_reports(paths: List[str], outfile: str):
+    """Merge per-scenario teardown failures into one report, replacing the previous run's"""
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            reports.append(json.load(f))
+    if os.path.exists(outfile):
+        os.remove(outfile)
+    if not reports:
+        return
+    failures = [failure for report in reports for failure in report["failures"]]
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    with open(outfile, "w") as f:
+        json.dump({"functions_url": reports[0]["functions_url"], "timestamp": time.time(),
+                   "failures": failures}, f, indent=2)
+    print(f"⚠️  {len(failures)} resources left behind, see {outfile}")
+
+
+def count_scenarios(features: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for feature in features:
+        for element in feature["elements"]:
+            if element.get("type") == "background":
+                continue
+            status = element.get("status", "untested")
+            counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+# ==================== ENTRY POINT ====================
+
+def parse_args(argv: List[str]) -> Tuple[argparse.Namespace, List[str]]:
+    behave_args: List[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, behave_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description="Run Behave scenarios across worker processes")
+    parser.add_argument("paths", nargs="*", default=["features"], help="Feature files or directories")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 2, help="Number of worker processes")
+    parser.add_argument("-t", "--tags", action="append", default=[], help="Behave tag expression (repeatable)")
+    parser.add_argument("-o", "--outfile", default=os.path.join(REPORTS_DIR, "results.json"), help="Merged JSON report")
+    parser.add_argument("--junit-directory", default=os.path.join(REPORTS_DIR, "junit"), help="Merged JUnit directory")
+    parser.add_argument("--run-overhead", type=float,
+                        default=float(os.getenv("PARALLEL_RUN_OVERHEAD", DEFAULT_RUN_OVERHEAD_SECONDS)),
+                        help="Fixed seconds each Behave run costs, used to batch short scenarios")
+    parser.add_argument("--list", action="store_true", help="Print the scenario split and exit")
+    args = parser.parse_args(argv)
+    return args, behave_args
+
+
+def main(argv: List[str] = None) -> int:
+    args, behave_args = parse_args(sys.argv[1:] if argv is None else argv)
+    tag_args = [f"--tags={t}" for t in args.tags]
+
+    scenarios = collect_scenarios(args.paths, args.tags)
+    if not scenarios:
+        print("⚠️  No scenarios selected")
+        return 0
+
+    history = TimingHistory()
+    schedule = schedule_longest_first(scenarios, history)
+    workers = max(1, min(args.workers, len(schedule)))
+    batches = make_batches(schedule, workers, args.run_overhead)
+    workers = min(workers, len(batches))
+    predicted = simulate_workers(batches, workers)
+    makespan = max(sum(seconds for _, seconds in assigned) for assigned in predicted)
+    serial = sum(seconds for _, seconds in schedule) + args.run_overhead
+
+    if args.list:
+        for worker_id, assigned in enumerate(predicted):
+            load = sum(seconds for _, seconds in assigned)
+            print(f"Worker {worker_id}: {len(assigned)} runs, ~{load:.1f}s")
+            for locations, seconds in assigned:
+                print(f"  {seconds:7.1f}s  {' '.join(locations)}")
+        print(f"Estimated: {makespan:.1f}s on {workers} workers ({serial:.1f}s serial, "
+              f"{args.run_overhead:g}s overhead per run)")
+        return 0
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR, exist_ok=True)
+
+    print(f"🚀 Running {len(schedule)} scenarios in {len(batches)} runs on {workers} workers "
+          f"(estimated {makespan:.1f}s)")
+    started = time.perf_counter()
+
+    mp = multiprocessing.get_context("spawn")
+    queue = mp.Queue()
+    results = mp.Queue()
+    for locations, _ in batches:
+        queue.put(locations)
+    for _ in range(workers):
+        queue.put(None)
+
+    processes = [
+        mp.Process(target=run_worker, args=(worker_id, queue, results, tag_args + behave_args))
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    failed = []
+    done = 0
+    while done < len(batches):
+        try:
+            worker_id, locations, exit_code, seconds = results.get(timeout=5)
+        except Empty:
+            if not any(process.is_alive() for process in processes):
+                print("❌ All workers exited before the queue was drained")
+                break
+            continue
+        done += 1
+        status = "✅" if exit_code == 0 else "❌"
+        label = locations[0] if len(locations) == 1 else f"{locations[0]} +{len(locations) - 1} more"
+        print(f"{status} [{done}/{len(batches)}] worker {worker_id} {label} ({seconds:.1f}s)")
+        if exit_code != 0:
+            failed.extend(locations)
+
+    for process in processes:
+        process.join()
+
+    json_paths = sorted(glob.glob(os.path.join(WORK_DIR, "scenario-*.json")))
+    features = merge_json_reports(json_paths)
+    os.makedirs(os.path.dirname(args.outfile) or ".", exist_ok=True)
+    with open(args.outfile, "w") as f:
+        json.dump(features, f, indent=2)
+
+    junit_dirs = sorted(glob.glob(os.path.join(WORK_DIR, "junit-*")))
+    merge_junit_reports(junit_dirs, args.junit_directory)
+
+    wait_paths = sorted(glob.glob(os.path.join(WORK_DIR, "waits-*.json")))
+    merge_wait_reports(wait_paths, os.getenv("WAIT_REPORT_FILE", os.path.join(REPORTS_DIR, "waits.json")))
+
+    teardown_paths = sorted(glob.glob(os.path.join(WORK_DIR, "teardown-*.json")))
+    merge_teardown_reports(teardown_paths, os.getenv("TEARDOWN_REPORT_FILE", os.path.join(REPORTS_DIR, "teardown.json")))
+
+    counts = count_scenarios(features)
+    elapsed = time.perf_counter() - started
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"📊 {summary} in {elapsed:.1f}s (estimated {makespan:.1f}s, {serial:.1f}s serial)")
+    print(f"📄 Merged report: {args.outfile}")
+
+    incomplete = done < len(batches) or any(p.exitcode != 0 for p in processes)
+    return 1 if failed or incomplete else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Performance baseline: record run timings and compare them with earlier runs.
+
+`record` stores the per-scenario, per-step, per-endpoint and per-page timings
+of a Behave JSON report in a local SQLite database (.perf-baseline.db), keyed
+by git SHA and environment. `compare` checks the newest run of an environment
+against a rolling window of the runs before it: statistically significant
+slowdowns are flagged, and the command exits non-zero when a budget from
+perf-budgets.json is exceeded (or on any regression with --fail-on-regression).
+
+Usage:
+    python perf_baseline.py record reports/results.json
+    python perf_baseline.py compare --window 20
+    python perf_baseline.py compare --env test --sha 1a4da67 --fail-on-regression
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+STEPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "features", "steps")
+sys.path.insert(0, STEPS_DIR)
+import api  # noqa: F401  (puts the API helpers on the path for report parsing)
+from perf import BaselineStore, MetricComparison, compare, load_budgets, samples_from_report
+
+DEFAULT_REPORT = os.path.join("reports", "results.json")
+DEFAULT_BUDGETS = "perf-budgets.json"
+DEFAULT_OUTFILE = os.path.join("reports", "perf-comparison.json")
+DEFAULT_WINDOW = 20
+DEFAULT_KEEP_RUNS = 500
+
+
+def current_sha() -> str:
+    """Commit under test: GITHUB_SHA in CI, else the checkout's HEAD"""
+    if os.getenv("GITHUB_SHA"):
+        return os.environ["GITHUB_SHA"]
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ==================== COMMANDS ====================
+
+def cmd_record(args) -> int:
+    with open(args.report) as f:
+        samples = samples_from_report(json.load(f))
+    if not samples:
+        print(f"No passed scenarios with timings in {args.report}")
+        return 0
+    store = BaselineStore(args.db)
+    run_id = store.record_run(args.sha, args.env, samples, source=args.report)
+    store.prune(args.env, args.keep)
+    store.close()
+    print(f"📦 Recorded run {run_id} ({args.env} @ {args.sha[:10]}): {len(samples)} samples in {store.path}")
+    return 0
+
+
+def print_comparison(title: str, results: List[MetricComparison]):
+    if not results:
+        return
+    print(f"\n{title}")
+    for r in results:
+        unit = "" if r.metric == "cls" else "ms"
+        baseline = f"{r.baseline_median:.3g}{unit}" if r.baseline_median is not None else "-"
+        change = f"{r.change:+.0%}" if r.change is not None else "-"
+        budget = f", budget {r.budget:g}{unit}" if r.budget is not None else ""
+        p_value = f", p={r.p_value:.3f}" if r.p_value is not None else ""
+        print(f"  {r.kind:<8} {r.name} [{r.metric}]: median {r.current_median:.3g}{unit} vs {baseline} "
+              f"({change}{p_value}), p95 {r.current_p95:.3g}{unit}{budget}")
+
+
+def cmd_compare(args) -> int:
+    store = BaselineStore(args.db)
+    runs = store.runs(args.env, limit=1, sha=args.sha)
+    if not runs:
+        print(f"No recorded runs for {args.env}" + (f" at {args.sha}" if args.sha else ""))
+        store.close()
+        return 0
+    run = runs[0]
+    window = store.runs(args.env, limit=args.window, before=run["id"])
+    current = store.samples([run["id"]])
+    baseline = store.samples([r["id"] for r in window])
+    store.close()
+
+    results = compare(current, baseline, load_budgets(args.budgets), alpha=args.alpha,
+                      min_change=args.min_change, min_delta_ms=args.min_delta_ms,
+                      min_baseline=args.min_baseline)
+    regressions = [r for r in results if r.regression]
+    over_budget = [r for r in results if r.over_budget]
+
+    print(f"📊 Run {run['id']} ({args.env} @ {run['sha'][:10]}) against {len(window)} earlier runs: "
+          f"{len(results)} metrics, {len(regressions)} regressions, {len(over_budget)} over budget")
+    print_comparison("🐢 Significant slowdowns:", regressions)
+    print_comparison("💸 Over budget:", over_budget)
+
+    os.makedirs(os.path.dirname(args.outfile) or ".", exist_ok=True)
+    with open(args.outfile, "w") as f:
+        json.dump({"run": run, "baseline_runs": [r["id"] for r in window],
+                   "alpha": args.alpha, "min_change": args.min_change,
+                   "regressions": [r.to_json() for r in regressions],
+                   "over_budget": [r.to_json() for r in over_budget],
+                   "metrics": [r.to_json() for r in results]}, f, indent=2)
+    print(f"📄 Comparison: {args.outfile}")
+
+    if over_budget or (args.fail_on_regression and regressions):
+        return 1
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record and compare performance baselines")
+    parser.add_argument("--db", help="SQLite database (default: PERF_BASELINE_DB or .perf-baseline.db)")
+    parser.add_argument("--env", default=os.getenv("ENVIRONMENT", "dev"), help="Environment the run targeted")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Store the timings of a Behave JSON report")
+    record.add_argument("report", nargs="?", default=DEFAULT_REPORT, help="Behave JSON report")
+    record.add_argument("--sha", default=current_sha(), help="Git SHA of the run (default: HEAD)")
+    record.add_argument("--keep", type=int, default=DEFAULT_KEEP_RUNS, help="Runs kept per environment")
+    record.set_defaults(func=cmd_record)
+
+    check = commands.add_parser("compare", help="Compare the newest run with the rolling baseline")
+    check.add_argument("--sha", help="Compare the newest run of this SHA instead of the newest run")
+    check.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Earlier runs in the baseline")
+    check.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    check.add_argument("--min-change", type=float, default=0.2,
+                       help="Smallest median slowdown reported, as a fraction (0.2 = 20%%)")
+    check.add_argument("--min-delta-ms", type=float, default=10.0,
+                       help="Smallest median slowdown reported, in milliseconds")
+    check.add_argument("--min-baseline", type=int, default=5, help="Baseline samples needed to test a metric")
+    check.add_argument("--budgets", default=DEFAULT_BUDGETS, help="Budget file")
+    check.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero on slowdowns too")
+    check.add_argument("-o", "--outfile", default=DEFAULT_OUTFILE, help="JSON comparison report")
+    check.set_defaults(func=cmd_compare)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,14 @@ Quick E2E test for Admin Portal production data
 Uses Playwright directly without Behave to avoid step conflicts
 """
 import json
+import os
+import sys
 import time
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features", "steps"))
+from browser import EventCapture
+
 ADMIN_URL = "http://localhost:3003"
 
 def main():
@@ -20,20 +25,8 @@ def main():
         browser = p.chromium.launch(headless=False)
         page = browser.new_page()
         
-        # Track API calls
-        api_calls = []
-        def track_response(response):
-            if 'azurewebsites.net' in response.url or '/api/' in response.url:
-                call = {
-                    'url': response.url,
-                    'status': response.status,
-                    'method': response.request.method
-                }
-                api_calls.append(call)
-                emoji = "✅" if response.status < 400 else "❌"
-                print(f"{emoji} {call['method']} {response.url} → {call['status']}")
-        
-        page.on("response", track_response)
+        # Track console errors and API calls (bounded, printed at the end)
+        events = EventCapture().attach(page)
         
         # Navigate to admin portal
         print(f"\n🌐 Navigating to {ADMIN_URL}...")
@@ -82,7 +75,11 @@ def main():
         print(f"  • Minecraft mentioned: {has_minecraft}")
         
         # Check API calls
-        print(f"\n📡 API Calls: {len(api_calls)} total")
+        api_calls = events.calls()
+        for call in api_calls:
+            emoji = "✅" if call.get('status', 500) < 400 else "❌"
+            print(f"{emoji} {call['method']} {call['url']} → {call.get('status', call.get('failure'))}")
+        print(f"\n📡 API Calls: {len(api_calls)} total ({events.summary()})")
         servers_calls = [c for c in api_calls if '/servers' in c['url']]
         subs_calls = [c for c in api_calls if '/subscriptions' in c['url']]
         
@@ -103,6 +100,5 @@ def main():
         return True
 
 if __name__ == '__main__':
-    import sys
     success = main()
     sys.exit(0 if success else 1)
@@ -0,0 +1,28 @@
+"""
+Unit tests for the suite's helper modules (run with `python -m pytest`).
+The step packages use flat imports, so features/steps goes on sys.path.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "features", "steps"))
+
+import pytest
+
+from api import FunctionsClient
+from mocks import MockFunctionsApi
+
+
+@pytest.fixture
+def functions_api():
+    """In-process mock realm-functions API"""
+    mock = MockFunctionsApi().start()
+    yield mock
+    mock.stop()
+
+
+@pytest.fixture
+def client(functions_api):
+    return FunctionsClient(functions_api.url)
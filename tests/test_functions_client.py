@@ -0,0 +1,35 @@
+from behave.model import Table
+
+from api import endpoint_name, table_body
+
+
+# ==================== ENDPOINT NAMES ====================
+
+def test_endpoint_name_groups_ids_and_drops_query():
+    assert endpoint_name("POST", "/api/servers/srv-1/stop?code=x") == "POST /api/servers/{id}/stop"
+
+
+def test_endpoint_name_strips_host():
+    assert endpoint_name("POST", "https://api.example.com/api/subscriptions/sub-1/cancel") == \
+        "POST /api/subscriptions/{id}/cancel"
+
+
+def test_endpoint_name_keeps_named_routes():
+    assert endpoint_name("POST", "/api/servers/provision") == "POST /api/servers/provision"
+    assert endpoint_name("GET", "/api/servers") == "GET /api/servers"
+
+
+# ==================== STEP TABLES ====================
+
+def test_table_body_keeps_the_first_row():
+    # Behave parses the first row of a headerless table as its headings
+    table = Table(["userId", "test-user-123"])
+    table.add_row(["gameType", "minecraft"])
+    assert table_body(table) == {"userId": "test-user-123", "gameType": "minecraft"}
+
+
+def test_table_body_single_row_and_booleans():
+    assert table_body(Table(["immediate", "false"])) == {"immediate": False}
+    table = Table(["immediate", "TRUE"])
+    table.add_row(["reason", "no"])
+    assert table_body(table) == {"immediate": True, "reason": "no"}
@@ -0,0 +1,116 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from parallel_runner import (make_batches, merge_json_reports, merge_junit_reports, merge_teardown_reports,
+                             merge_wait_reports, simulate_workers)
+from wait_budget import Wait, wait_report
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def scenario(line, status):
+    return {"type": "scenario", "location": f"features/a.feature:{line}", "name": f"S{line}", "status": status}
+
+
+# ==================== SCHEDULING ====================
+
+def test_short_scenarios_share_a_run():
+    schedule = [("a:1", 0.05), ("a:2", 0.04), ("a:3", 0.01)]
+    [(locations, seconds)] = make_batches(schedule, workers=4, overhead=0.7)
+    assert locations == ["a:1", "a:2", "a:3"]
+    assert seconds == pytest.approx(0.8)
+
+
+def test_long_scenarios_run_alone_and_count_the_overhead():
+    schedule = [("a:1", 30.0), ("a:2", 20.0), ("a:3", 1.0), ("a:4", 1.0), ("a:5", 0.5)]
+    batches = make_batches(schedule, workers=2, overhead=0.5)
+    assert batches[0] == (["a:1"], 30.5)
+    assert batches[1] == (["a:2"], 20.5)
+    assert sorted(location for locations, _ in batches for location in locations) == \
+        ["a:1", "a:2", "a:3", "a:4", "a:5"]
+
+    predicted = simulate_workers(batches, 2)
+    loads = sorted(sum(seconds for _, seconds in assigned) for assigned in predicted)
+    assert loads[-1] == 30.5
+
+
+# ==================== REPORT MERGING ====================
+
+def test_merge_json_reports_keeps_the_run_that_executed_each_scenario(tmp_path):
+    feature = {"location": "features/a.feature:1", "name": "A"}
+    first = write_json(tmp_path / "scenario-0-0.json",
+                       [{**feature, "elements": [scenario(3, "passed"), scenario(9, "skipped")]}])
+    second = write_json(tmp_path / "scenario-1-0.json",
+                        [{**feature, "elements": [scenario(3, "skipped"), scenario(9, "failed")]}])
+    empty = tmp_path / "scenario-2-0.json"
+    empty.write_text("")
+
+    [merged] = merge_json_reports([first, second, str(empty)])
+    assert [(e["location"], e["status"]) for e in merged["elements"]] == [
+        ("features/a.feature:3", "passed"), ("features/a.feature:9", "failed")]
+    assert merged["status"] == "failed"
+
+
+def test_merge_junit_reports_sums_suites(tmp_path):
+    for run, (tests, failures) in enumerate([(2, 0), (1, 1)]):
+        run_dir = tmp_path / f"junit-{run}"
+        run_dir.mkdir()
+        suite = ET.Element("testsuite", tests=str(tests), errors="0", failures=str(failures),
+                           skipped="0", time="1.5")
+        for case in range(tests):
+            ET.SubElement(suite, "testcase", name=f"run{run}-case{case}")
+        ET.ElementTree(suite).write(run_dir / "TESTS-a.xml")
+
+    output = tmp_path / "junit"
+    merge_junit_reports([str(tmp_path / "junit-0"), str(tmp_path / "junit-1")], str(output))
+    merged = ET.parse(output / "TESTS-a.xml").getroot()
+    assert (merged.get("tests"), merged.get("failures"), merged.get("time")) == ("3", "1", "3.000000")
+    assert len(merged.findall("testcase")) == 3
+
+
+def test_merge_wait_reports(tmp_path):
+    reports = [
+        wait_report([Wait("sleep", "time.sleep(2)", "steps/a.py:10", 2.0, "S1", "step")], 5.0, {}, {"S1": 2.0}),
+        wait_report([Wait("timeout", "wait_for", "steps/b.py:20", 6.0, "S2", "step")], 5.0, {"S2": 6.0},
+                    {"S2": 6.0}),
+    ]
+    paths = [write_json(tmp_path / f"waits-{i}.json", report) for i, report in enumerate(reports)]
+    outfile = tmp_path / "waits.json"
+
+    merge_wait_reports(paths, str(outfile))
+    merged = json.loads(outfile.read_text())
+    assert merged["total_seconds"] == 8.0
+    assert merged["over_budget"] == {"S2": 6.0}
+    assert [source["source"] for source in merged["sources"]] == ["steps/b.py:20", "steps/a.py:10"]
+
+
+def test_merge_reports_remove_a_stale_report(tmp_path):
+    outfile = tmp_path / "waits.json"
+    outfile.write_text("{}")
+    merge_wait_reports([], str(outfile))
+    assert not outfile.exists()
+
+    outfile = tmp_path / "teardown.json"
+    outfile.write_text("{}")
+    merge_teardown_reports([], str(outfile))
+    assert not outfile.exists()
+
+
+def test_merge_teardown_reports(tmp_path):
+    failure = {"kind": "server", "id": "server-1", "source": "S1", "attempts": 3, "status": 500, "error": "x"}
+    paths = [
+        write_json(tmp_path / "teardown-0.json", {"functions_url": "http://api", "failures": [failure]}),
+        write_json(tmp_path / "teardown-1.json", {"functions_url": "http://api", "failures": [
+            {**failure, "id": "server-2"}]}),
+    ]
+    outfile = tmp_path / "teardown.json"
+    merge_teardown_reports(paths, str(outfile))
+    merged = json.loads(outfile.read_text())
+    assert merged["functions_url"] == "http://api"
+    assert [f["id"] for f in merged["failures"]] == ["server-1", "server-2"]
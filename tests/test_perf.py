@@ -0,0 +1,47 @@
+import math
+
+from perf import mann_whitney_greater, percentile
+
+
+# ==================== PERCENTILE ====================
+
+def test_percentile_nearest_rank():
+    values = list(range(10, 0, -1))
+    assert percentile(values, 50) == 5
+    assert percentile(values, 95) == 10
+    assert percentile(values, 100) == 10
+
+
+def test_percentile_low_ranks_take_the_smallest_value():
+    assert percentile([3, 1, 2], 0) == 1
+    assert percentile([3, 1, 2], 1) == 1
+
+
+def test_percentile_of_nothing_is_none():
+    assert percentile([], 95) is None
+
+
+# ==================== MANN-WHITNEY ====================
+
+def test_mann_whitney_exact_when_clearly_slower():
+    p = mann_whitney_greater([10, 11, 12, 13, 14], [1, 2, 3, 4, 5])
+    assert p == 1 / math.comb(10, 5)
+
+
+def test_mann_whitney_exact_when_faster():
+    assert mann_whitney_greater([1, 2, 3, 4, 5], [10, 11, 12, 13, 14]) == 1.0
+
+
+def test_mann_whitney_with_ties_uses_normal_approximation():
+    p = mann_whitney_greater([5, 5, 6, 7, 8, 9], [1, 2, 2, 3, 5, 5])
+    assert 0 < p < 0.05
+
+
+def test_mann_whitney_identical_samples_are_not_significant():
+    assert mann_whitney_greater([4, 4, 4], [4, 4, 4]) == 1.0
+    assert mann_whitney_greater([1, 2, 3, 4], [1, 2, 3, 4]) > 0.4
+
+
+def test_mann_whitney_without_samples():
+    assert mann_whitney_greater([], [1, 2]) == 1.0
+    assert mann_whitney_greater([1, 2], []) == 1.0
@@ -0,0 +1,34 @@
+import os
+import time
+
+from api import ServerPool
+from server_pool import PoolRegistry
+
+
+def make_pool(client, tmp_path):
+    registry = PoolRegistry(client.base_url, path=str(tmp_path / "pool.json"))
+    registry.update(lambda entries: entries.update({"server-gone": {
+        "gameType": "minecraft", "tier": "small", "owner": os.getpid(), "leased": False,
+        "lastUsed": time.time(), "ip": None, "port": None,
+    }}))
+    return ServerPool(client, sizes={}, user_id="pool-user", keep=True, registry=registry), registry
+
+
+def registered(registry):
+    return registry.update(lambda entries: sorted(entries))
+
+
+def test_adopt_prunes_servers_deleted_elsewhere(client, tmp_path):
+    pool, registry = make_pool(client, tmp_path)
+    pool._adopt()
+    assert registered(registry) == []
+
+
+def test_registry_is_left_alone_when_servers_cannot_be_listed(functions_api, client, tmp_path):
+    pool, registry = make_pool(client, tmp_path)
+    functions_api.error_rate = 1.0
+
+    pool._adopt()
+    assert registered(registry) == ["server-gone"]
+    assert pool.reap() == []
+    assert registered(registry) == ["server-gone"]
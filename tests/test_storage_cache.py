@@ -0,0 +1,27 @@
+import base64
+import json
+
+import auth  # noqa: F401  (puts the auth modules on sys.path)
+from storage_cache import token_expiry
+
+
+def make_token(claims) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def test_token_expiry_reads_exp_without_padding():
+    assert token_expiry(make_token({"exp": 1700000000, "sub": "u"})) == 1700000000.0
+
+
+def test_token_expiry_without_exp():
+    assert token_expiry(make_token({"sub": "u"})) is None
+    assert token_expiry(make_token({"exp": "tomorrow"})) is None
+    assert token_expiry(make_token(["not", "claims"])) is None
+
+
+def test_token_expiry_of_non_jwt():
+    assert token_expiry("") is None
+    assert token_expiry(None) is None
+    assert token_expiry("opaque-session-token") is None
+    assert token_expiry("a.!!!.c") is None
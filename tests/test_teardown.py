@@ -0,0 +1,25 @@
+import json
+
+from api import TeardownReaper
+
+
+def test_zero_retries_still_attempts_each_resource(functions_api, client, tmp_path):
+    functions_api.state.ensure_server("server-teardown-1")
+    reaper = TeardownReaper(client, retries=0, report_path=str(tmp_path / "teardown.json"))
+    reaper.track_server("server-teardown-1", source="S1")
+
+    assert reaper.run() == []
+    assert "server-teardown-1" not in functions_api.state.servers
+
+
+def test_failures_are_reported_after_one_attempt(functions_api, client, tmp_path):
+    functions_api.state.ensure_server("server-teardown-2")
+    functions_api.error_rate = 1.0
+    report_path = tmp_path / "teardown.json"
+    reaper = TeardownReaper(client, retries=0, report_path=str(report_path))
+    reaper.track_server("server-teardown-2", source="S2")
+
+    [failure] = reaper.run()
+    assert (failure["id"], failure["source"], failure["attempts"], failure["status"]) == \
+        ("server-teardown-2", "S2", 1, 503)
+    assert json.loads(report_path.read_text())["failures"] == [failure]